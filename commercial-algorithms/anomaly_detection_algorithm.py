@@ -1,6 +1,17 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
+@diagram(category="commercial-algorithms", filename="anomaly_detection_algorithm", tags=("anomaly",))
 def create_anomaly_detection_algorithm(filename: str, outformat: str) -> None:
     with Diagram("智能异常检测算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         # 数据源层
@@ -290,5 +301,4 @@ def create_anomaly_detection_algorithm(filename: str, outformat: str) -> None:
         monitoring >> Edge(label="告警") >> alerting
 
 if __name__ == "__main__":
-    create_anomaly_detection_algorithm(filename="anomaly_detection_algorithm", outformat="png")
-    create_anomaly_detection_algorithm(filename="anomaly_detection_algorithm", outformat="pdf")
+    create_anomaly_detection_algorithm(filename="anomaly_detection_algorithm", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
+@diagram(category="commercial-algorithms", filename="customer_segmentation_algorithm", tags=("customer",))
 def create_customer_segmentation_algorithm(filename: str, outformat: str) -> None:
     with Diagram("智能客户细分算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         # 数据源层
@@ -231,5 +242,4 @@ def create_customer_segmentation_algorithm(filename: str, outformat: str) -> Non
         monitoring >> Edge(label="告警") >> alerting
 
 if __name__ == "__main__":
-    create_customer_segmentation_algorithm(filename="customer_segmentation_algorithm", outformat="png")
-    create_customer_segmentation_algorithm(filename="customer_segmentation_algorithm", outformat="pdf")
+    create_customer_segmentation_algorithm(filename="customer_segmentation_algorithm", outformat=["png", "pdf"])
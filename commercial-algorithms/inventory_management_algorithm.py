@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="commercial-algorithms", filename="inventory_management_algorithm", tags=("inventory",))
 def create_inventory_management_algorithm(filename: str, outformat: str) -> None:
     with Diagram("智能库存管理算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         # 数据采集层
@@ -195,5 +206,4 @@ def create_inventory_management_algorithm(filename: str, outformat: str) -> None
 
 
 if __name__ == "__main__":
-    create_inventory_management_algorithm(filename="inventory_management_algorithm", outformat="png")
-    create_inventory_management_algorithm(filename="inventory_management_algorithm", outformat="pdf")
\ No newline at end of file
+    create_inventory_management_algorithm(filename="inventory_management_algorithm", outformat=["png", "pdf"])
\ No newline at end of file
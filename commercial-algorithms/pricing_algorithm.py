@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="commercial-algorithms", filename="pricing_algorithm", tags=("pricing",))
 def create_pricing_algorithm(filename: str, outformat: str) -> None:
     with Diagram("动态定价算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         # 数据输入层
@@ -183,5 +194,4 @@ def create_pricing_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_pricing_algorithm(filename="pricing_algorithm", outformat="png")
-    create_pricing_algorithm(filename="pricing_algorithm", outformat="pdf")
\ No newline at end of file
+    create_pricing_algorithm(filename="pricing_algorithm", outformat=["png", "pdf"])
\ No newline at end of file
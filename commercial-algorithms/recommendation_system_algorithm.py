@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="commercial-algorithms", filename="recommendation_system_algorithm", tags=("recommendation",))
 def create_recommendation_system_algorithm(filename: str, outformat: str) -> None:
     with Diagram("推荐系统算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         # 用户层
@@ -145,5 +156,4 @@ def create_recommendation_system_algorithm(filename: str, outformat: str) -> Non
 
 
 if __name__ == "__main__":
-    create_recommendation_system_algorithm(filename="recommendation_system_algorithm", outformat="png")
-    create_recommendation_system_algorithm(filename="recommendation_system_algorithm", outformat="pdf")
\ No newline at end of file
+    create_recommendation_system_algorithm(filename="recommendation_system_algorithm", outformat=["png", "pdf"])
\ No newline at end of file
@@ -1,7 +1,18 @@
+import os
+import sys
+
 
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
+@diagram(category="commercial-algorithms", filename="supply_chain_optimization_algorithm", tags=("supply",))
 def create_supply_chain_optimization_algorithm(filename: str, outformat: str) -> None:
     with Diagram("智能供应链优化算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         # 数据源层
@@ -227,5 +238,4 @@ def create_supply_chain_optimization_algorithm(filename: str, outformat: str) ->
         monitoring >> Edge(label="告警") >> alerting
 
 if __name__ == "__main__":
-    create_supply_chain_optimization_algorithm(filename="supply_chain_optimization_algorithm", outformat="png")
-    create_supply_chain_optimization_algorithm(filename="supply_chain_optimization_algorithm", outformat="pdf")
+    create_supply_chain_optimization_algorithm(filename="supply_chain_optimization_algorithm", outformat=["png", "pdf"])
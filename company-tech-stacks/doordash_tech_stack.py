@@ -1,4 +1,7 @@
-from diagrams import Diagram, Cluster, Edge
+import os
+import sys
+
+from diagrams import Diagram, Cluster
 from diagrams.onprem.compute import Server
 from diagrams.onprem.client import Users, User
 from diagrams.onprem.network import Internet
@@ -26,7 +29,15 @@ from diagrams.gcp.compute import ComputeEngine
 from diagrams.gcp.database import Bigtable
 from diagrams.gcp.storage import GCS
 
+try:
+    from diagramkit import connect, diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import connect, diagram
+
 
+@diagram(category="company-tech-stacks", filename="doordash_tech_stack", tags=("doordash", "ecommerce"))
 def create_doordash_tech_stack_diagram(filename: str, outformat: str) -> None:
     with Diagram("DoorDash 技术栈架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         
@@ -353,170 +364,171 @@ def create_doordash_tech_stack_diagram(filename: str, outformat: str) -> None:
                 eslint = Server("ESLint")
                 black = Server("Black")
 
-        # 连接关系
-        # 客户端到前端技术
-        users >> doordash_consumer
-        users >> doordash_merchant
-        users >> doordash_dasher
-        users >> doordash_ios
-        users >> doordash_android
-        
-        doordash_consumer >> react_native
-        doordash_merchant >> react
-        doordash_dasher >> swift_ios
-        doordash_ios >> kotlin_android
-        doordash_android >> java_android
-
-        # 前端技术到后端技术
-        react >> django
-        vue_js >> flask
-        typescript >> spring_boot
-        react_native >> gin
-        next_js >> express
-
-        # 后端技术到数据存储
-        python >> django
-        java >> spring_boot
-        go_lang >> gin
-        django >> postgresql
-        spring_boot >> mongodb
-        rest_apis >> redis
-        graphql >> elasticsearch
-
-        # 数据存储连接
-        postgresql >> mysql
-        mysql >> aurora
-        mongodb >> cassandra
-        cassandra >> dynamodb
-        redis >> memcached
-        memcached >> elasticache
-        elasticsearch >> solr
-        redshift >> snowflake
-        snowflake >> bigquery
-
-        # 配送和物流连接
-        order_management >> order_tracking
-        order_tracking >> order_fulfillment
-        order_fulfillment >> inventory_management
-        delivery_scheduling >> route_optimization
-        route_optimization >> driver_matching
-        driver_matching >> eta_calculation
-        real_time_tracking >> gps_tracking
-        gps_tracking >> location_updates
-        location_updates >> delivery_status
-        geocoding >> reverse_geocoding
-        reverse_geocoding >> distance_calculation
-        distance_calculation >> traffic_data
-
-        # 支付和风控连接
-        payment_gateway >> payment_processing
-        payment_processing >> payment_methods
-        payment_methods >> refund_processing
-        fraud_detection >> risk_assessment
-        risk_assessment >> transaction_monitoring
-        transaction_monitoring >> chargeback_management
-        accounting >> billing
-        billing >> invoicing
-        invoicing >> tax_calculation
-        pci_compliance >> kyc
-        kyc >> aml
-        aml >> regulatory_reporting
-
-        # 推荐和AI连接
-        recommendation_engine >> restaurant_recommendation
-        restaurant_recommendation >> food_recommendation
-        food_recommendation >> personalized_search
-        tensorflow >> pytorch
-        pytorch >> scikit_learn
-        scikit_learn >> xgboost
-        nlp_models >> text_analysis
-        text_analysis >> sentiment_analysis
-        sentiment_analysis >> review_analysis
-        image_recognition >> food_detection
-        food_detection >> quality_assessment
-        quality_assessment >> ocr
-
-        # 大数据分析连接
-        hadoop >> spark
-        spark >> kafka
-        kafka >> flink
-        real_time_analytics >> user_behavior_analysis
-        user_behavior_analysis >> delivery_performance
-        delivery_performance >> restaurant_analytics
-        superset >> grafana
-        grafana >> tableau
-        ab_testing >> feature_flags
-        feature_flags >> experiment_platform
-
-        # 基础设施连接
-        docker >> kubernetes
-        kubernetes >> helm
-        istio >> linkerd
-        nginx >> haproxy
-        haproxy >> envoy
-        etcd_config >> consul_config
-        consul_config >> vault
-
-        # 云服务连接
-        ec2 >> lambda_aws
-        lambda_aws >> ecs
-        ecs >> fargate
-        rds >> aurora_cloud
-        aurora_cloud >> s3
-        s3 >> dynamodb_cloud
-        cloudfront >> route53
-        route53 >> elb
-        kinesis >> glue
-        glue >> emr
-        cloudwatch >> prometheus
-
-        # 监控连接
-        prometheus >> grafana_monitoring
-        grafana_monitoring >> datadog
-        datadog >> new_relic
-        elasticsearch_logs >> logstash
-        logstash >> kibana
-        kibana >> fluentd
-        zipkin >> jaeger
-        jaeger >> x_ray
-
-        # 安全连接
-        oauth >> openid_connect
-        openid_connect >> jwt
-        jwt >> sso
-        rbac >> abac
-        abac >> api_gateway
-        encryption >> key_management
-        key_management >> data_masking
-        data_masking >> privacy_controls
-        waf >> ddos_protection
-        ddos_protection >> ssl_tls
-        ssl_tls >> vpn
-
-        # 开发工具连接
-        git >> github
-        github >> gitlab
-        jenkins >> gitlab_ci
-        gitlab_ci >> github_actions
-        github_actions >> circleci
-        pytest >> junit
-        junit >> selenium
-        selenium >> cypress
-        sonarqube >> pylint
-        pylint >> eslint
-        eslint >> black
-
-        # 跨层连接
-        kubernetes >> Edge(label="容器编排") >> fargate
-        redis >> Edge(label="缓存加速") >> postgresql
-        order_management >> Edge(label="订单处理") >> delivery_scheduling
-        oauth >> Edge(label="身份认证") >> rbac
-        jenkins >> Edge(label="CI/CD") >> kubernetes
-        prometheus >> Edge(label="监控") >> grafana_monitoring
-        kafka >> Edge(label="实时数据") >> spark
-        recommendation_engine >> Edge(label="智能推荐") >> tensorflow
+        # 连接关系：每行是 (起点, 终点[, 标签])
+        connect([
+            # 客户端到前端技术
+            (users, doordash_consumer),
+            (users, doordash_merchant),
+            (users, doordash_dasher),
+            (users, doordash_ios),
+            (users, doordash_android),
+
+            (doordash_consumer, react_native),
+            (doordash_merchant, react),
+            (doordash_dasher, swift_ios),
+            (doordash_ios, kotlin_android),
+            (doordash_android, java_android),
+
+            # 前端技术到后端技术
+            (react, django),
+            (vue_js, flask),
+            (typescript, spring_boot),
+            (react_native, gin),
+            (next_js, express),
+
+            # 后端技术到数据存储
+            (python, django),
+            (java, spring_boot),
+            (go_lang, gin),
+            (django, postgresql),
+            (spring_boot, mongodb),
+            (rest_apis, redis),
+            (graphql, elasticsearch),
+
+            # 数据存储连接
+            (postgresql, mysql),
+            (mysql, aurora),
+            (mongodb, cassandra),
+            (cassandra, dynamodb),
+            (redis, memcached),
+            (memcached, elasticache),
+            (elasticsearch, solr),
+            (redshift, snowflake),
+            (snowflake, bigquery),
+
+            # 配送和物流连接
+            (order_management, order_tracking),
+            (order_tracking, order_fulfillment),
+            (order_fulfillment, inventory_management),
+            (delivery_scheduling, route_optimization),
+            (route_optimization, driver_matching),
+            (driver_matching, eta_calculation),
+            (real_time_tracking, gps_tracking),
+            (gps_tracking, location_updates),
+            (location_updates, delivery_status),
+            (geocoding, reverse_geocoding),
+            (reverse_geocoding, distance_calculation),
+            (distance_calculation, traffic_data),
+
+            # 支付和风控连接
+            (payment_gateway, payment_processing),
+            (payment_processing, payment_methods),
+            (payment_methods, refund_processing),
+            (fraud_detection, risk_assessment),
+            (risk_assessment, transaction_monitoring),
+            (transaction_monitoring, chargeback_management),
+            (accounting, billing),
+            (billing, invoicing),
+            (invoicing, tax_calculation),
+            (pci_compliance, kyc),
+            (kyc, aml),
+            (aml, regulatory_reporting),
+
+            # 推荐和AI连接
+            (recommendation_engine, restaurant_recommendation),
+            (restaurant_recommendation, food_recommendation),
+            (food_recommendation, personalized_search),
+            (tensorflow, pytorch),
+            (pytorch, scikit_learn),
+            (scikit_learn, xgboost),
+            (nlp_models, text_analysis),
+            (text_analysis, sentiment_analysis),
+            (sentiment_analysis, review_analysis),
+            (image_recognition, food_detection),
+            (food_detection, quality_assessment),
+            (quality_assessment, ocr),
+
+            # 大数据分析连接
+            (hadoop, spark),
+            (spark, kafka),
+            (kafka, flink),
+            (real_time_analytics, user_behavior_analysis),
+            (user_behavior_analysis, delivery_performance),
+            (delivery_performance, restaurant_analytics),
+            (superset, grafana),
+            (grafana, tableau),
+            (ab_testing, feature_flags),
+            (feature_flags, experiment_platform),
+
+            # 基础设施连接
+            (docker, kubernetes),
+            (kubernetes, helm),
+            (istio, linkerd),
+            (nginx, haproxy),
+            (haproxy, envoy),
+            (etcd_config, consul_config),
+            (consul_config, vault),
+
+            # 云服务连接
+            (ec2, lambda_aws),
+            (lambda_aws, ecs),
+            (ecs, fargate),
+            (rds, aurora_cloud),
+            (aurora_cloud, s3),
+            (s3, dynamodb_cloud),
+            (cloudfront, route53),
+            (route53, elb),
+            (kinesis, glue),
+            (glue, emr),
+            (cloudwatch, prometheus),
+
+            # 监控连接
+            (prometheus, grafana_monitoring),
+            (grafana_monitoring, datadog),
+            (datadog, new_relic),
+            (elasticsearch_logs, logstash),
+            (logstash, kibana),
+            (kibana, fluentd),
+            (zipkin, jaeger),
+            (jaeger, x_ray),
+
+            # 安全连接
+            (oauth, openid_connect),
+            (openid_connect, jwt),
+            (jwt, sso),
+            (rbac, abac),
+            (abac, api_gateway),
+            (encryption, key_management),
+            (key_management, data_masking),
+            (data_masking, privacy_controls),
+            (waf, ddos_protection),
+            (ddos_protection, ssl_tls),
+            (ssl_tls, vpn),
+
+            # 开发工具连接
+            (git, github),
+            (github, gitlab),
+            (jenkins, gitlab_ci),
+            (gitlab_ci, github_actions),
+            (github_actions, circleci),
+            (pytest, junit),
+            (junit, selenium),
+            (selenium, cypress),
+            (sonarqube, pylint),
+            (pylint, eslint),
+            (eslint, black),
+
+            # 跨层连接
+            (kubernetes, fargate, "容器编排"),
+            (redis, postgresql, "缓存加速"),
+            (order_management, delivery_scheduling, "订单处理"),
+            (oauth, rbac, "身份认证"),
+            (jenkins, kubernetes, "CI/CD"),
+            (prometheus, grafana_monitoring, "监控"),
+            (kafka, spark, "实时数据"),
+            (recommendation_engine, tensorflow, "智能推荐"),
+        ])
 
 
 if __name__ == "__main__":
-    create_doordash_tech_stack_diagram(filename="doordash_tech_stack", outformat="png")
-    create_doordash_tech_stack_diagram(filename="doordash_tech_stack", outformat="pdf")
+    create_doordash_tech_stack_diagram(filename="doordash_tech_stack", outformat=["png", "pdf"])
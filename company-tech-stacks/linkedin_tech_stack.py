@@ -1,3 +1,6 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 from diagrams.onprem.client import Users, User
@@ -26,7 +29,15 @@ from diagrams.gcp.compute import ComputeEngine
 from diagrams.gcp.database import Bigtable
 from diagrams.gcp.storage import GCS
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="company-tech-stacks", filename="linkedin_tech_stack", tags=("linkedin", "social"))
 def create_linkedin_tech_stack_diagram(filename: str, outformat: str) -> None:
     with Diagram("LinkedIn 技术栈架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         
@@ -352,5 +363,4 @@ def create_linkedin_tech_stack_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_linkedin_tech_stack_diagram(filename="linkedin_tech_stack", outformat="png")
-    create_linkedin_tech_stack_diagram(filename="linkedin_tech_stack", outformat="pdf")
+    create_linkedin_tech_stack_diagram(filename="linkedin_tech_stack", outformat=["png", "pdf"])
@@ -1,3 +1,6 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 from diagrams.onprem.client import Users, User
@@ -34,6 +37,14 @@ from diagrams.saas.identity import Auth0
 from diagrams.saas.logging import Datadog
 from diagrams.saas.chat import Slack
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
+@diagram(category="company-tech-stacks", filename="sap_tech_stack", tags=("sap", "enterprise"))
 def create_sap_tech_stack_diagram(filename: str, outformat: str) -> None:
     # 创建SAP技术栈图表
     with Diagram("SAP技术栈", filename=filename, show=False, outformat=outformat, direction="TB"):
@@ -382,5 +393,4 @@ def create_sap_tech_stack_diagram(filename: str, outformat: str) -> None:
         master_data_hub >> data_unification
 
 if __name__ == "__main__":
-    create_sap_tech_stack_diagram(filename="sap_tech_stack", outformat="png")
-    create_sap_tech_stack_diagram(filename="sap_tech_stack", outformat="pdf")
+    create_sap_tech_stack_diagram(filename="sap_tech_stack", outformat=["png", "pdf"])
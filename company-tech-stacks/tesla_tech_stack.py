@@ -1,3 +1,6 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 from diagrams.onprem.client import Users, User
@@ -30,6 +33,14 @@ from diagrams.gcp.database import Bigtable, Firestore, Spanner, SQL
 from diagrams.gcp.storage import GCS
 from diagrams.gcp.analytics import BigQuery, Dataflow, PubSub, Dataproc
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
+@diagram(category="company-tech-stacks", filename="tesla_tech_stack", tags=("tesla", "tech-giants"))
 def create_tesla_tech_stack_diagram(filename: str, outformat: str) -> None: 
     # 创建特斯拉技术栈图表
     with Diagram("特斯拉技术栈", filename=filename, show=False, outformat=outformat, direction="TB"):
@@ -243,5 +254,4 @@ def create_tesla_tech_stack_diagram(filename: str, outformat: str) -> None:
         codedeploy >> kubernetes
 
 if __name__ == "__main__":
-    create_tesla_tech_stack_diagram(filename="tesla_tech_stack", outformat="png")
-    create_tesla_tech_stack_diagram(filename="tesla_tech_stack", outformat="pdf")
\ No newline at end of file
+    create_tesla_tech_stack_diagram(filename="tesla_tech_stack", outformat=["png", "pdf"])
\ No newline at end of file
@@ -1,3 +1,6 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 from diagrams.onprem.client import Users, User
@@ -29,7 +32,15 @@ from diagrams.gcp.analytics import BigQuery, Dataflow, PubSub, Dataproc
 from diagrams.gcp.network import LoadBalancing, CDN, VPC
 from diagrams.gcp.ml import AIPlatform, AutoML, VideoIntelligenceAPI
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="company-tech-stacks", filename="youtube_tech_stack", tags=("youtube", "social"))
 def create_youtube_tech_stack_diagram(filename: str, outformat: str) -> None:
     with Diagram("YouTube 技术栈架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         
@@ -452,5 +463,4 @@ def create_youtube_tech_stack_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_youtube_tech_stack_diagram(filename="youtube_tech_stack", outformat="png")
-    create_youtube_tech_stack_diagram(filename="youtube_tech_stack", outformat="pdf")
+    create_youtube_tech_stack_diagram(filename="youtube_tech_stack", outformat=["png", "pdf"])
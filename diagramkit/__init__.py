@@ -0,0 +1,24 @@
+"""diagrams 图表构建工具集。
+
+各分类目录下的脚本用 `@diagram(...)` 把 `create_*` 函数登记到注册表；
+本包在 `diagrams` 之上提供注册、构建、渲染等公共能力，供 Makefile 与
+命令行统一调用。
+"""
+
+from diagramkit.edges import connect
+from diagramkit.registry import diagram
+
+__all__ = ["connect", "diagram", "fragment", "include", "install", "render_formats"]
+
+
+def __getattr__(name: str):
+    # 按需导入 render 与 fragments，使 `import diagramkit.lazy` 等子模块不必先加载 diagrams
+    if name in ("install", "render_formats"):
+        from diagramkit import render
+
+        return getattr(render, name)
+    if name in ("fragment", "include"):
+        from diagramkit import fragments
+
+        return getattr(fragments, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
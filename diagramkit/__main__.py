@@ -0,0 +1,504 @@
+"""命令行入口：python3 -m diagramkit <command> ..."""
+
+import argparse
+import json
+import runpy
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from diagramkit import bench, build, dryrun, engines, fragments, importtime, lazy, passes, registry, static, synthetic, trace, watch
+from diagramkit.cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, ArtifactCache
+from diagramkit.layout import DEFAULT_LAYOUT_CACHE_DIR, LayoutCache
+from diagramkit.render import install, render_graph
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    install()
+    for script in args.scripts:
+        runpy.run_path(script, run_name="__main__")
+    return 0
+
+
+def _select(args: argparse.Namespace) -> List[registry.Target]:
+    # 先装上延迟加载，导入全部脚本完成注册时不必加载用不到的 provider 模块
+    lazy.install()
+    return registry.select(registry.discover(args.category or registry.CATEGORIES), args.targets)
+
+
+def _add_selection(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("targets", nargs="*", help="分类、脚本名、输出文件名或标签；为空时选择全部")
+    parser.add_argument(
+        "-c", "--category", action="append", choices=registry.CATEGORIES, help="只在指定分类中选择，可重复指定"
+    )
+
+
+def _add_passes(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-p", "--pass", dest="passes", action="append", choices=list(passes.PASSES), metavar="NAME",
+        help=f"对选中的图表在布局前应用改写，可重复指定（{'、'.join(passes.PASSES)}）",
+    )
+    parser.add_argument("--no-passes", action="store_true", help="不应用图表在 @diagram 中声明的改写")
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    for target in _select(args):
+        print(f"{target.name:<60} {' '.join(target.tags)}")
+    return 0
+
+
+def cmd_clean(args: argparse.Namespace) -> int:
+    removed = 0
+    for target in _select(args):
+        for fmt in args.formats or build.DEFAULT_FORMATS:
+            path = target.output.with_name(f"{target.filename}.{fmt}")
+            if path.exists():
+                path.unlink()
+                removed += 1
+    print(f"已删除 {removed} 个输出文件")
+    return 0
+
+
+def cmd_build(args: argparse.Namespace) -> int:
+    tracer = None
+    if args.trace:
+        # 在导入脚本之前启用，导入阶段也计入 trace
+        tracer = trace.Tracer()
+        trace.activate(tracer)
+    targets = _select(args)
+    # 各图表用到的片段来自静态解析索引，不必执行脚本
+    scripts = static.index(args.category or registry.CATEGORIES)
+    uses = {t.name: s.uses[t.name] for s in scripts for t in s.targets}
+    files = static.fragment_files()
+    stamps = fragments.Stamps()
+    if args.fragments_changed:
+        targets = stamps.stale(targets, uses, files)
+        if not targets:
+            print("片段没有变化，无需重新构建")
+            return 0
+    if not targets:
+        print("没有匹配的图表")
+        return 1
+    cache = None
+    if args.incremental or args.force:
+        cache = ArtifactCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024, force=args.force)
+    layouts = None
+    if args.layout_cache:
+        layouts = LayoutCache(args.layout_cache, max_bytes=args.layout_cache_size * 1024 * 1024)
+    results = build.build(
+        targets,
+        formats=args.formats or build.DEFAULT_FORMATS,
+        jobs=args.jobs,
+        keep_going=args.keep_going,
+        cache=cache,
+        layouts=layouts,
+        tracing=tracer is not None,
+        coprocesses=args.coprocess,
+        in_memory=args.in_memory,
+        extra_passes=args.passes or (),
+        own_passes=not args.no_passes,
+        fallback_nodes=args.fallback_nodes,
+        layout_budget=args.layout_budget,
+        split_layout=args.split_layout,
+    )
+    stamps.record([r.target for r in results if r.ok], uses, files)
+    stamps.save()
+    failed = sum(not r.ok for r in results)
+    cached = sum(r.cached for r in results)
+    skipped = len(targets) - len(results)
+    degraded = sum(r.degraded for r in results)
+    print(
+        f"共 {len(targets)} 张：成功 {len(results) - failed}（缓存命中 {cached}，降级 {degraded}），"
+        f"失败 {failed}，跳过 {skipped}"
+    )
+    if layouts is not None:
+        layout_hits = sum(r.layout_cached for r in results)
+        laid_out = len(results) - failed - cached - layout_hits
+        print(
+            f"布局缓存：命中 {layout_hits}，未命中 {laid_out}，"
+            f"共 {len(layouts.entries())} 条 / {layouts.size() / 1024 / 1024:.1f} MB"
+        )
+    if tracer is not None:
+        spans = tracer.drain() + [s for r in results for s in r.spans]
+        summary_path = trace.write(spans, args.trace)
+        print(f"trace 已写入 {args.trace}，汇总见 {summary_path}")
+    return 1 if failed or skipped else 0
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    history = bench.History(args.history)
+    try:
+        if args.runs:
+            for run in history.runs():
+                print(
+                    f"{run['id']:4d}  {run['created']}  {run['label'] or '-':<16} {run['revision'] or '-':<10} "
+                    f"{run['diagrams']:3d} 张 x{run['repeat']}"
+                )
+            return 0
+        try:
+            baseline_id = history.resolve(args.baseline)
+        except ValueError as e:
+            print(e)
+            return 1
+        targets = _select(args)
+        if not targets:
+            print("没有匹配的图表")
+            return 1
+        print(f"{'layout':>11} {'total':>11}  diagram（中位数）")
+        samples = bench.run_benchmark(
+            targets, formats=args.formats or build.DEFAULT_FORMATS, repeat=args.repeat, warmup=args.warmup
+        )
+        comparisons = []
+        if baseline_id is not None:
+            comparisons = bench.compare(history.samples(baseline_id), samples, threshold=args.threshold)
+        if not args.no_save:
+            run_id = history.save(samples, label=args.label or "", repeat=args.repeat, warmup=args.warmup)
+            print(f"已保存为第 {run_id} 次运行（{history.path}）")
+    finally:
+        history.close()
+    print()
+    print(bench.category_table(samples, comparisons), end="")
+    if baseline_id is None:
+        print("没有可比较的基线运行")
+        return 0
+    print(f"\n与第 {baseline_id} 次运行比较（阈值 {args.threshold:.0%}）：")
+    print(bench.regression_report(comparisons), end="")
+    return 1 if any(c.significant for c in comparisons) else 0
+
+
+def _spec(args: argparse.Namespace) -> synthetic.GraphSpec:
+    return synthetic.GraphSpec(
+        nodes=args.nodes, depth=args.depth, branching=args.branching, cluster_size=args.cluster_size,
+        fan_out=args.fan_out, skew=args.skew, locality=args.locality, labelled=args.labelled,
+        direction=args.direction, seed=args.seed,
+    )
+
+
+def _add_spec(parser: argparse.ArgumentParser) -> None:
+    defaults = synthetic.GraphSpec()
+    parser.add_argument("-n", "--nodes", type=int, default=defaults.nodes, help="节点数")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="集群嵌套深度，0 表示不分集群")
+    parser.add_argument("--branching", type=int, default=defaults.branching, help="每个集群的子集群数")
+    parser.add_argument("--cluster-size", type=int, default=defaults.cluster_size, help="最内层集群的平均节点数")
+    parser.add_argument("--fan-out", type=float, default=defaults.fan_out, help="平均出度")
+    parser.add_argument("--skew", type=float, default=defaults.skew, help="入度集中程度（Zipf 指数）")
+    parser.add_argument("--locality", type=float, default=defaults.locality, help="集群内部边的比例")
+    parser.add_argument("--labelled", type=float, default=defaults.labelled, help="带标签边的比例")
+    parser.add_argument("--direction", default=defaults.direction, choices=("LR", "RL", "TB", "BT"))
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="随机种子")
+    parser.add_argument("--direct", action="store_true", help="不经 diagrams 对象，由中间表示直接生成 DOT")
+
+
+def cmd_synth(args: argparse.Namespace) -> int:
+    install()
+    spec = _spec(args)
+    if args.direct:
+        ir, graph = synthetic.synthetic_graph(spec)
+        render_graph(ir, args.output, args.formats or ["svg"])
+    else:
+        graph = synthetic.create_synthetic_diagram(spec, args.output, args.formats or ["svg"])
+    print(f"{args.output}: {spec.nodes} 个节点，{len(graph.edges)} 条边，{graph.clusters} 个集群")
+    return 0
+
+
+def cmd_sweep(args: argparse.Namespace) -> int:
+    sizes = [int(n) for n in args.sizes.split(",")]
+    rows = synthetic.sweep(
+        _spec(args), sizes, formats=args.formats or ["svg"], repeat=args.repeat, timeout=args.timeout, direct=args.direct
+    )
+    print()
+    print(synthetic.chart(rows, "layout_s", "秒"))
+    print(synthetic.chart(rows, "dot_rss_mb", "MB"))
+    exponent = synthetic.scaling_exponent([r for r in rows if "timeout" not in r])
+    if exponent is not None:
+        print(f"布局耗时约随节点数的 {exponent:.2f} 次方增长")
+    limit = synthetic.impractical_size(rows, args.limit)
+    if limit is None:
+        print(f"所测规模的布局耗时都在 {args.limit:g} 秒以内")
+    else:
+        print(f"从 {limit} 个节点起布局超过 {args.limit:g} 秒")
+    if args.json:
+        args.json.write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    lazy.install()
+    watch.watch(
+        categories=args.category or registry.CATEGORIES,
+        patterns=args.targets,
+        port=None if args.no_server else args.port,
+        formats=args.formats or build.DEFAULT_FORMATS,
+        preview_only=args.preview_only,
+        dpi=args.dpi,
+    )
+    return 0
+
+
+def cmd_check(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    lazy.install()
+    targets, failures = dryrun.discover(args.category or registry.CATEGORIES)
+    targets = registry.select(targets, args.targets)
+    for path, error in failures:
+        print(f"{'FAIL':<6} {path.parent.name}/{path.name}\n       {error}")
+    reports = dryrun.validate_all(targets)
+    warned = 0
+    for report in reports:
+        nodes = sum(len(g.nodes) for g in report.graphs)
+        edges = sum(len(g.edges) for g in report.graphs)
+        clusters = sum(len(g.clusters) for g in report.graphs)
+        status = "FAIL" if not report.ok else "warn" if report.warnings else "ok"
+        warned += bool(report.warnings)
+        # 默认只列出失败的图表；警告（如孤立节点）在 -v 或 --strict 时列出
+        if status == "FAIL" or args.verbose or (args.strict and report.warnings):
+            print(f"{status:<6} {nodes:5d} 节点 {edges:5d} 连线 {clusters:4d} 集群  {report.target.name}")
+            for message in report.errors + report.warnings:
+                print(f"       {message}")
+    failed = sum(not r.ok for r in reports)
+    print(
+        f"共 {len(reports)} 张：通过 {len(reports) - failed}，失败 {failed}，有警告 {warned}；"
+        f"导入失败的脚本 {len(failures)} 个（{time.perf_counter() - start:.2f}s）"
+    )
+    return 1 if failed or failures or (args.strict and warned) else 0
+
+
+def cmd_importtime(args: argparse.Namespace) -> int:
+    targets = _select(args)
+    rows = []
+    print(f"{'eager':>9} {'lazy':>9} {'saving':>9}  script")
+    for target in targets:
+        eager = importtime.measure_import_time(target.path, lazy=False, repeat=args.repeat)
+        deferred = importtime.measure_import_time(target.path, lazy=True, repeat=args.repeat)
+        rows.append((eager, deferred))
+        print(f"{eager * 1000:7.1f}ms {deferred * 1000:7.1f}ms {(eager - deferred) * 1000:7.1f}ms  {target.name}", flush=True)
+    if rows:
+        eager_total = sum(r[0] for r in rows)
+        lazy_total = sum(r[1] for r in rows)
+        print(f"{eager_total * 1000:7.1f}ms {lazy_total * 1000:7.1f}ms {(eager_total - lazy_total) * 1000:7.1f}ms  合计 {len(rows)} 个脚本")
+    return 0
+
+
+def cmd_compile(args: argparse.Namespace) -> int:
+    # 只给了 --synthetic 时不比较脚本图表
+    scripts = args.targets or args.category or not args.synthetic
+    targets = _select(args) if scripts else []
+    specs = [synthetic.GraphSpec(nodes=n) for n in args.synthetic or ()]
+    if not targets and not specs:
+        print("没有匹配的图表")
+        return 1
+    rows = bench.construction_benchmark(targets, specs, repeat=args.repeat)
+    print(bench.construction_table(rows), end="")
+    if rows:
+        diagrams_ms = sum(r.diagrams_ms for r in rows)
+        direct_ms = sum(r.direct_ms for r in rows)
+        print(f"合计 {len(rows)} 张：diagrams {diagrams_ms:.1f} ms，直接编译 {direct_ms:.1f} ms（{diagrams_ms / direct_ms:.1f}x）")
+    different = [r.name for r in rows if not r.identical]
+    for name in different:
+        print(f"DOT 不一致：{name}")
+    return 1 if different else 0
+
+
+def cmd_passes(args: argparse.Namespace) -> int:
+    targets = _select(args)
+    rows = bench.pass_benchmark(targets, args.passes or (), repeat=args.repeat, layout=not args.no_layout)
+    changed = [r for r in rows if r.notes]
+    if not changed:
+        print("没有被改写的图表")
+        return 0
+    print(bench.pass_table(changed), end="")
+    timed = [r for r in changed if r.saving is not None]
+    if timed:
+        before = sum(r.before_ms for r in timed)
+        after = sum(r.after_ms for r in timed)
+        print(f"合计 {len(timed)} 张：布局 {before:.1f} ms -> {after:.1f} ms（{(1 - after / before) * 100:.1f}% 节省）")
+        sized = [r for r in timed if r.area_change is not None]
+        if sized:
+            area_before = sum(r.canvas_before[0] * r.canvas_before[1] for r in sized)
+            area_after = sum(r.canvas_after[0] * r.canvas_after[1] for r in sized)
+            print(f"画布面积合计 {area_before:.0f} -> {area_after:.0f} 平方英寸（{(area_after / area_before - 1) * 100:+.1f}%）")
+    elif not args.no_layout:
+        print("未能运行 dot，只报告改写内容")
+    return 0
+
+
+def cmd_engines(args: argparse.Namespace) -> int:
+    targets = _select(args)
+    try:
+        rows = bench.engine_benchmark(targets, args.engines or engines.CANDIDATES, repeat=args.repeat)
+    except ValueError as e:
+        print(e)
+        return 2
+    if not rows:
+        print("没有可比较的图表")
+        return 1
+    print(bench.engine_table(rows), end="")
+    chosen = [(row.target, row.best.choice) for row in rows if row.best is not None]
+    if not chosen:
+        print("未能运行 Graphviz，没有可用的测量结果")
+        return 1
+    changed = [(target, choice) for target, choice in chosen if (target.engine or engines.DEFAULT) != choice]
+    print(f"合计 {len(chosen)} 张：{len(changed)} 张的最佳布局方式与当前不同")
+    if args.record:
+        written = sum(engines.record(target, choice) for target, choice in chosen)
+        print(f"已写入 {written} 个 @diagram(..., engine=...)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="diagramkit", description="diagrams 图表构建工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="以单次布局多格式输出的方式运行图表脚本")
+    run.add_argument("scripts", nargs="+", help="图表脚本路径")
+    run.set_defaults(func=cmd_run)
+
+    bld = sub.add_parser("build", help="在进程池中并行渲染全部或部分图表")
+    _add_selection(bld)
+    bld.add_argument("-j", "--jobs", type=int, default=None, help="并行进程数，默认使用全部 CPU")
+    bld.add_argument("-k", "--keep-going", action="store_true", help="遇到失败时继续构建其余图表")
+    bld.add_argument("-f", "--format", dest="formats", action="append", help="输出格式，可重复指定，默认 png 与 pdf")
+    bld.add_argument("-i", "--incremental", action="store_true", help="增量构建：内容未变化的图表直接复用缓存产物")
+    bld.add_argument("--force", action="store_true", help="忽略缓存强制重新渲染（结果仍写入缓存）")
+    bld.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="缓存目录")
+    bld.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="缓存大小上限（MB）")
+    bld.add_argument(
+        "--layout-cache", nargs="?", type=Path, const=DEFAULT_LAYOUT_CACHE_DIR, default=None, metavar="DIR",
+        help=f"启用布局缓存，可指定目录（默认 {DEFAULT_LAYOUT_CACHE_DIR.name}）",
+    )
+    bld.add_argument("--layout-cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="布局缓存大小上限（MB）")
+    bld.add_argument(
+        "--coprocess", action="store_true",
+        help="每个 worker 复用常驻的 Graphviz 进程，不再为每张图、每种格式各启动一次",
+    )
+    bld.add_argument(
+        "--in-memory", action="store_true", help="各格式的输出以字节读回内存，最后原子地写入输出文件",
+    )
+    bld.add_argument(
+        "--trace", type=Path, default=None, metavar="FILE",
+        help="分阶段计时，写出 Chrome trace JSON 与同名 .txt 汇总",
+    )
+    bld.add_argument(
+        "--fragments-changed", action="store_true",
+        help="只构建所用片段自上次成功构建以来被修改过的图表",
+    )
+    _add_passes(bld)
+    bld.add_argument(
+        "--fallback-nodes", type=int, default=engines.FALLBACK_NODES, metavar="N",
+        help=f"没有声明布局方式的图超过 N 个节点时改用 {engines.FALLBACK}，0 表示不改用（默认 %(default)s）",
+    )
+    bld.add_argument(
+        "--layout-budget", type=float, default=None, metavar="SECONDS",
+        help="每张图每次布局的时间预算，超时后逐级降级重试（减少迭代、直线连线、标签改为 xlabel），"
+        "输出中标为 budget",
+    )
+    bld.add_argument(
+        "--split-layout", action="store_true",
+        help="节点数不少于 250、正交走线的大图把每个顶层集群交给单独的 dot 进程并行布局，按图的方向拼合，"
+        "块间连线最后由 neato -n2 布线",
+    )
+    bld.set_defaults(func=cmd_build)
+
+    bch = sub.add_parser("bench", help="重复渲染测量布局与输出耗时，记录历史并与基线比较")
+    _add_selection(bch)
+    bch.add_argument("-n", "--repeat", type=int, default=5, help="每张图测量次数")
+    bch.add_argument("-w", "--warmup", type=int, default=1, help="每张图预热次数（不计入结果）")
+    bch.add_argument("-f", "--format", dest="formats", action="append", help="输出格式，可重复指定，默认 png 与 pdf")
+    bch.add_argument("--history", type=Path, default=bench.DEFAULT_HISTORY, help="SQLite 历史文件")
+    bch.add_argument("--label", help="为本次运行加标签，便于之后作为基线引用")
+    bch.add_argument("--baseline", help="基线运行的编号或标签，默认取上一次运行")
+    bch.add_argument("--threshold", type=float, default=bench.DEFAULT_THRESHOLD, help="判为回归的最小变慢比例")
+    bch.add_argument("--no-save", action="store_true", help="不把本次结果写入历史")
+    bch.add_argument("--runs", action="store_true", help="列出历史中的运行后退出")
+    bch.set_defaults(func=cmd_bench)
+
+    cmp = sub.add_parser("compile", help="比较经 diagrams 对象与由中间表示直接生成 DOT 的耗时与内存")
+    _add_selection(cmp)
+    cmp.add_argument("-n", "--repeat", type=int, default=5, help="每张图测量次数，取中位数")
+    cmp.add_argument(
+        "--synthetic", type=int, action="append", metavar="NODES", help="另外比较给定节点数的合成图，可重复指定",
+    )
+    cmp.set_defaults(func=cmd_compile)
+
+    pss = sub.add_parser("passes", help="报告布局前改写的内容，并比较改写前后的 dot 布局耗时、层数与画布尺寸")
+    _add_selection(pss)
+    pss.add_argument(
+        "-p", "--pass", dest="passes", action="append", choices=list(passes.PASSES), metavar="NAME",
+        help="要比较的改写，可重复指定；默认使用各图表在 @diagram 中声明的改写",
+    )
+    pss.add_argument("-n", "--repeat", type=int, default=3, help="每张图布局次数，取中位数")
+    pss.add_argument("--no-layout", action="store_true", help="只报告改写内容，不运行 dot")
+    pss.set_defaults(func=cmd_passes)
+
+    eng = sub.add_parser("engines", help="逐个试布局候选的引擎与连线方式，按耗时、画布、交叉与连线长度打分")
+    _add_selection(eng)
+    eng.add_argument(
+        "-e", "--engine", dest="engines", action="append", metavar="ENGINE[:SPLINES]",
+        help=f"候选的布局方式，可重复指定（默认 {'、'.join(engines.CANDIDATES)}）",
+    )
+    eng.add_argument("-n", "--repeat", type=int, default=3, help="每种方式布局次数，取中位数")
+    eng.add_argument("--record", action="store_true", help="把每张图得分最低的方式写进脚本的 @diagram(..., engine=...)")
+    eng.set_defaults(func=cmd_engines)
+
+    wch = sub.add_parser("watch", help="监视脚本，修改后只重新导入并渲染该脚本的图表")
+    _add_selection(wch)
+    wch.add_argument("-p", "--port", type=int, default=watch.DEFAULT_PORT, help="实时刷新页面的端口")
+    wch.add_argument("--no-server", action="store_true", help="不启动实时刷新页面")
+    wch.add_argument("--dpi", type=int, default=watch.PREVIEW_DPI, help="预览 PNG 的 dpi")
+    wch.add_argument("--preview-only", action="store_true", help="只生成预览，不更新正式输出文件")
+    wch.add_argument("-f", "--format", dest="formats", action="append", help="正式输出格式，默认 png 与 pdf")
+    wch.set_defaults(func=cmd_watch)
+
+    chk = sub.add_parser("check", help="不调用 Graphviz 的试运行：校验各图表的结构")
+    _add_selection(chk)
+    chk.add_argument("--strict", action="store_true", help="有警告（如孤立节点）时也以失败退出")
+    chk.add_argument("-v", "--verbose", action="store_true", help="列出每张图的节点、连线与集群数")
+    chk.set_defaults(func=cmd_check)
+
+    grp = sub.add_parser("graph", help="不导入 diagrams、不执行脚本，静态解析各图表的图结构")
+    static.add_arguments(grp)
+    grp.set_defaults(func=static.run)
+
+    imp = sub.add_parser("importtime", help="用 -X importtime 对比各脚本在延迟加载前后的导入耗时")
+    _add_selection(imp)
+    imp.add_argument("-r", "--repeat", type=int, default=5, help="每个脚本重复测量次数，取最小值")
+    imp.set_defaults(func=cmd_importtime)
+
+    syn = sub.add_parser("synth", help="生成并渲染一张参数化的合成大图")
+    _add_spec(syn)
+    syn.add_argument("-o", "--output", default="synthetic", help="输出文件名（不含扩展名）")
+    syn.add_argument("-f", "--format", dest="formats", action="append", help="输出格式，默认 svg")
+    syn.set_defaults(func=cmd_synth)
+
+    swp = sub.add_parser("sweep", help="按节点数扫描合成图的布局耗时与内存")
+    _add_spec(swp)
+    swp.add_argument(
+        "--sizes", default=",".join(map(str, synthetic.DEFAULT_SIZES)), help="逗号分隔的节点数列表"
+    )
+    swp.add_argument("-f", "--format", dest="formats", action="append", help="输出格式，默认 svg")
+    swp.add_argument("-r", "--repeat", type=int, default=1, help="每个规模测量次数，取布局最快的一次")
+    swp.add_argument("--timeout", type=float, default=300, help="单次测量超时（秒），超时后不再尝试更大的规模")
+    swp.add_argument("--limit", type=float, default=10, help="布局耗时超过该秒数即视为不可用")
+    swp.add_argument("--json", type=Path, help="把结果写入 JSON 文件")
+    swp.set_defaults(func=cmd_sweep)
+
+    lst = sub.add_parser("list", help="列出已注册的图表及其标签")
+    _add_selection(lst)
+    lst.set_defaults(func=cmd_list)
+
+    cln = sub.add_parser("clean", help="删除图表的输出文件")
+    _add_selection(cln)
+    cln.add_argument("-f", "--format", dest="formats", action="append", help="要删除的输出格式，默认 png 与 pdf")
+    cln.set_defaults(func=cmd_clean)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,657 @@
+"""渲染基准测试与回归检测。
+
+每张图先预热若干次，再重复渲染 N 次，借助 `diagramkit.trace` 分别记录
+布局、输出与总耗时以及输出文件大小。结果写入本地 SQLite 历史文件，
+并与基线运行逐图比较：用 Welch t 区间估计均值差的 95% 置信区间，
+区间整体高于 0 且变慢幅度超过阈值时判为显著回归。
+
+为了让计时稳定，基准测试在当前进程中串行运行，且不使用产物缓存与
+布局缓存。
+
+`construction_benchmark` 另外比较生成 DOT 之前的建图开销：经 `diagrams`
+对象，与由中间表示直接编译（`compiler`），并核对两者的 DOT 是否相同。
+`pass_benchmark` 比较布局前改写（`passes`）前后的 dot 布局耗时。
+`engine_benchmark` 对每张图逐个试布局候选的引擎与连线方式并打分。
+"""
+
+import contextlib
+import gc
+import json
+import math
+import platform
+import sqlite3
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import diagrams
+
+from diagramkit import engines, passes, registry, static, trace
+from diagramkit.cache import graphviz_version
+from diagramkit.compiler import compile_dot
+from diagramkit.graph import Graph
+from diagramkit.registry import ROOT, Target
+from diagramkit.layout import statements
+from diagramkit.render import install, run_graphviz
+from diagramkit.synthetic import GraphSpec, create_synthetic_diagram, synthetic_graph
+
+DEFAULT_HISTORY = ROOT / ".bench-history.sqlite"
+DEFAULT_THRESHOLD = 0.10
+
+METRICS = ("layout_ms", "render_ms", "total_ms", "output_bytes")
+# 参与回归判定的指标
+GATED_METRICS = ("layout_ms", "total_ms")
+
+# t 分布 0.975 分位数，自由度 1..30；更大的自由度近似取正态分位数
+_T_975 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    label TEXT,
+    revision TEXT,
+    graphviz TEXT,
+    host TEXT,
+    repeat INTEGER,
+    warmup INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    diagram TEXT NOT NULL,
+    category TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    layout_ms REAL,
+    render_ms REAL,
+    total_ms REAL,
+    output_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS samples_run ON samples (run_id, diagram);
+"""
+
+
+@dataclass
+class Sample:
+    """一张图的一次测量。"""
+
+    diagram: str
+    category: str
+    iteration: int
+    layout_ms: float
+    render_ms: float
+    total_ms: float
+    output_bytes: int
+
+
+def measure(target: Target, formats: Sequence[str], iteration: int, outdir: Path) -> Sample:
+    """渲染一次 target 到 outdir，返回各阶段耗时与输出大小。"""
+    tracer = trace.active()
+    tracer.diagram = target.name
+    func = registry.function(target)
+    filename = outdir / target.filename
+    gc.collect()
+    with tracer.span("diagram"):
+        func(filename=str(filename), outformat=list(formats))
+    phases: Dict[str, float] = defaultdict(float)
+    for span in tracer.drain():
+        if span["name"].startswith("render:"):
+            phases["render"] += span["wall"]
+        else:
+            phases[span["name"]] += span["wall"]
+    size = sum(p.stat().st_size for p in (filename.with_name(f"{target.filename}.{fmt}") for fmt in formats) if p.exists())
+    return Sample(
+        target.name, target.category, iteration,
+        phases["layout"] / 1000, phases["render"] / 1000, phases["diagram"] / 1000, size,
+    )
+
+
+def run_benchmark(
+    targets: Sequence[Target], formats: Sequence[str] = ("png", "pdf"), repeat: int = 5, warmup: int = 1
+) -> List[Sample]:
+    """对每张图预热 warmup 次后测量 repeat 次，逐张打印中位数。"""
+    install(tracing=True)
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        outdir = Path(tmp)
+        for target in targets:
+            for _ in range(warmup):
+                measure(target, formats, -1, outdir)
+            runs = [measure(target, formats, i, outdir) for i in range(repeat)]
+            samples.extend(runs)
+            layout = _median([s.layout_ms for s in runs])
+            total = _median([s.total_ms for s in runs])
+            print(f"{layout:9.1f}ms {total:9.1f}ms  {target.name}", flush=True)
+    return samples
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _revision() -> str:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=ROOT
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return proc.stdout.strip()
+
+
+class History:
+    """SQLite 中的基准测试历史。"""
+
+    def __init__(self, path: Path = DEFAULT_HISTORY):
+        self.path = Path(path)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+    def save(self, samples: Sequence[Sample], label: str = "", repeat: int = 0, warmup: int = 0) -> int:
+        """保存一次运行，返回运行编号。"""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (created, label, revision, graphviz, host, repeat, warmup) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.strftime("%Y-%m-%d %H:%M:%S"), label, _revision(), graphviz_version("dot"),
+                    platform.node(), repeat, warmup,
+                ),
+            )
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, *astuple(s)) for s in samples],
+            )
+        return run_id
+
+    def runs(self) -> List[sqlite3.Row]:
+        return self.db.execute(
+            "SELECT runs.*, COUNT(DISTINCT samples.diagram) AS diagrams FROM runs "
+            "LEFT JOIN samples ON samples.run_id = runs.id GROUP BY runs.id ORDER BY runs.id"
+        ).fetchall()
+
+    def resolve(self, ref: Optional[str], before: Optional[int] = None) -> Optional[int]:
+        """把运行编号或标签解析为运行编号；ref 为空时取 before 之前的最近一次运行。"""
+        if ref:
+            if ref.isdigit():
+                row = self.db.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+            else:
+                row = self.db.execute("SELECT id FROM runs WHERE label = ? ORDER BY id DESC LIMIT 1", (ref,)).fetchone()
+            if row is None:
+                raise ValueError(f'no benchmark run "{ref}" in {self.path}')
+            return row["id"]
+        row = self.db.execute(
+            "SELECT id FROM runs WHERE id < ? ORDER BY id DESC LIMIT 1", (before if before is not None else 2 ** 62,)
+        ).fetchone()
+        return row["id"] if row else None
+
+    def samples(self, run_id: int) -> List[Sample]:
+        rows = self.db.execute(
+            "SELECT diagram, category, iteration, layout_ms, render_ms, total_ms, output_bytes "
+            "FROM samples WHERE run_id = ? ORDER BY diagram, iteration",
+            (run_id,),
+        )
+        return [Sample(*row) for row in rows]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+@dataclass
+class Comparison:
+    """一张图一个指标的基线对比。change、low、high 均为相对基线均值的比例。"""
+
+    diagram: str
+    category: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+    low: float
+    high: float
+    significant: bool
+
+
+def t_quantile(df: float) -> float:
+    """t 分布的 0.975 分位数。"""
+    if df < 1:
+        return float("inf")
+    return _T_975[int(df) - 1] if df <= len(_T_975) else 1.96
+
+
+def welch_interval(baseline: Sequence[float], current: Sequence[float]) -> Optional[tuple]:
+    """均值差 current - baseline 的 95% Welch 置信区间；样本不足时返回 None。"""
+    n1, n2 = len(baseline), len(current)
+    if n1 < 2 or n2 < 2:
+        return None
+    m1, m2 = sum(baseline) / n1, sum(current) / n2
+    v1 = sum((x - m1) ** 2 for x in baseline) / (n1 - 1)
+    v2 = sum((x - m2) ** 2 for x in current) / (n2 - 1)
+    se2 = v1 / n1 + v2 / n2
+    diff = m2 - m1
+    if se2 == 0:
+        return diff, diff
+    df = se2 ** 2 / ((v1 / n1) ** 2 / (n1 - 1) + (v2 / n2) ** 2 / (n2 - 1))
+    half = t_quantile(df) * math.sqrt(se2)
+    return diff - half, diff + half
+
+
+def _by_diagram(samples: Sequence[Sample]) -> Dict[str, List[Sample]]:
+    grouped: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        grouped[sample.diagram].append(sample)
+    return grouped
+
+
+def compare(
+    baseline: Sequence[Sample], current: Sequence[Sample], threshold: float = DEFAULT_THRESHOLD
+) -> List[Comparison]:
+    """逐图比较 GATED_METRICS；置信区间整体高于 0 且变慢超过 threshold 时为显著回归。"""
+    before = _by_diagram(baseline)
+    comparisons = []
+    for diagram, runs in sorted(_by_diagram(current).items()):
+        if diagram not in before:
+            continue
+        for metric in GATED_METRICS:
+            old = [getattr(s, metric) for s in before[diagram]]
+            new = [getattr(s, metric) for s in runs]
+            old_mean, new_mean = sum(old) / len(old), sum(new) / len(new)
+            if old_mean <= 0:
+                continue
+            interval = welch_interval(old, new)
+            low, high = (interval[0] / old_mean, interval[1] / old_mean) if interval else (-math.inf, math.inf)
+            change = new_mean / old_mean - 1
+            comparisons.append(Comparison(
+                diagram, runs[0].category, metric, old_mean, new_mean, change, low, high,
+                significant=low > 0 and change >= threshold,
+            ))
+    return comparisons
+
+
+def category_table(samples: Sequence[Sample], comparisons: Sequence[Comparison] = ()) -> str:
+    """按分类汇总各图中位数耗时、输出大小以及相对基线的变化。"""
+    medians: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for diagram, runs in _by_diagram(samples).items():
+        for metric in METRICS:
+            medians[runs[0].category][metric].append(_median([getattr(s, metric) for s in runs]))
+    changes: Dict[str, List[Comparison]] = defaultdict(list)
+    for c in comparisons:
+        if c.metric == "total_ms":
+            changes[c.category].append(c)
+    regressions: Dict[str, set] = defaultdict(set)
+    for c in comparisons:
+        if c.significant:
+            regressions[c.category].add(c.diagram)
+    lines = [
+        f"{'category':<36} {'n':>3} {'layout ms':>10} {'render ms':>10} {'total ms':>10} "
+        f"{'output KB':>10} {'Δtotal':>8} {'regr':>5}"
+    ]
+    for category in [c for c in registry.CATEGORIES if c in medians]:
+        row = medians[category]
+        matched = changes.get(category, [])
+        if matched:
+            old = sum(c.baseline for c in matched)
+            delta = f"{(sum(c.current for c in matched) / old - 1) * 100:+7.1f}%" if old else f"{'-':>8}"
+        else:
+            delta = f"{'-':>8}"
+        lines.append(
+            f"{category:<36} {len(row['total_ms']):3d} {sum(row['layout_ms']):10.1f} {sum(row['render_ms']):10.1f} "
+            f"{sum(row['total_ms']):10.1f} {sum(row['output_bytes']) / 1024:10.1f} {delta} {len(regressions[category]):5d}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def regression_report(comparisons: Sequence[Comparison]) -> str:
+    """列出显著回归，按变慢幅度降序。"""
+    flagged = sorted((c for c in comparisons if c.significant), key=lambda c: -c.change)
+    if not flagged:
+        return "没有显著回归\n"
+    lines = [f"{'diagram':<56} {'metric':<10} {'baseline':>10} {'current':>10} {'change':>8}  95% CI"]
+    for c in flagged:
+        lines.append(
+            f"{c.diagram:<56} {c.metric:<10} {c.baseline:10.1f} {c.current:10.1f} {c.change * 100:+7.1f}%  "
+            f"[{c.low * 100:+.1f}%, {c.high * 100:+.1f}%]"
+        )
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class Construction:
+    """一张图经 diagrams 对象与经中间表示生成 DOT 的耗时与内存对比。"""
+
+    name: str
+    nodes: int
+    edges: int
+    diagrams_ms: float
+    direct_ms: float
+    diagrams_kb: float
+    direct_kb: float
+    identical: bool
+
+    @property
+    def speedup(self) -> float:
+        return self.diagrams_ms / self.direct_ms if self.direct_ms else float("inf")
+
+
+@contextlib.contextmanager
+def _capture_sources() -> Iterator[List[str]]:
+    """在 with 块内不渲染图表，只收集各图的 DOT 源码。"""
+    install()
+    sources: List[str] = []
+    saved = diagrams.Diagram.render
+    diagrams.Diagram.render = lambda self: sources.append(self.dot.source)
+    try:
+        yield sources
+    finally:
+        diagrams.Diagram.render = saved
+
+
+def _cost(func: Callable[[], List[str]], repeat: int) -> Tuple[List[str], float, float]:
+    """运行 func 一次预热，再测 repeat 次耗时中位数（毫秒）与一次的 Python 内存峰值（KB）。"""
+    result = func()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, _median(times), peak / 1024
+
+
+def _compare_paths(name: str, build_objects: Callable[[], List[str]], build_ir: Callable[[], List[Graph]], repeat: int) -> Construction:
+    with _capture_sources() as sources:
+
+        def via_diagrams() -> List[str]:
+            sources.clear()
+            build_objects()
+            return list(sources)
+
+        expected, diagrams_ms, diagrams_kb = _cost(via_diagrams, repeat)
+    graphs = build_ir()
+    actual, direct_ms, direct_kb = _cost(lambda: [compile_dot(g) for g in build_ir()], repeat)
+    return Construction(
+        name,
+        sum(len(g.nodes) for g in graphs),
+        sum(len(g.edges) for g in graphs),
+        diagrams_ms, direct_ms, diagrams_kb, direct_kb,
+        identical=actual == expected,
+    )
+
+
+def construction_benchmark(
+    targets: Sequence[Target], specs: Sequence[GraphSpec] = (), repeat: int = 5
+) -> List[Construction]:
+    """比较两条生成 DOT 的路径：执行脚本经 diagrams 对象，与由中间表示直接编译。
+
+    脚本图表的中间表示取自静态解析索引（`static`），只计编译耗时，正如
+    diagrams 路径不计导入脚本的耗时；合成图两条路径都从 `synthetic.plan`
+    开始建图。静态解析不完整（有跳过的语句）的图表不参与比较。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = {f"{s.category}/{s.path.name}": s for s in static.index({t.category for t in targets})}
+        rows = []
+        for target in targets:
+            script = scripts.get(f"{target.category}/{target.script}")
+            graphs = script.graphs(target) if script is not None else []
+            if not graphs or any(g.unresolved for g in graphs):
+                print(f"跳过 {target.name}：静态解析结果不完整", flush=True)
+                continue
+            func = registry.function(target)
+            output = str(Path(tmp) / target.filename)
+            rows.append(_compare_paths(
+                target.name, lambda: func(filename=output, outformat=["png"]), lambda: graphs, repeat
+            ))
+        for spec in specs:
+            output = str(Path(tmp) / "synthetic")
+            rows.append(_compare_paths(
+                f"synthetic/{spec.nodes}",
+                lambda: create_synthetic_diagram(spec, output),
+                lambda: [synthetic_graph(spec)[0]],
+                repeat,
+            ))
+    return rows
+
+
+def construction_table(rows: Sequence[Construction]) -> str:
+    lines = [
+        f"{'diagram':<56} {'nodes':>6} {'edges':>6} {'diagrams ms':>12} {'direct ms':>10} {'speedup':>8} "
+        f"{'diagrams KB':>12} {'direct KB':>10} {'same':>5}"
+    ]
+    for r in rows:
+        lines.append(
+            f"{r.name:<56} {r.nodes:6d} {r.edges:6d} {r.diagrams_ms:12.2f} {r.direct_ms:10.2f} {r.speedup:7.1f}x "
+            f"{r.diagrams_kb:12.0f} {r.direct_kb:10.0f} {'yes' if r.identical else 'NO':>5}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class PassComparison:
+    """一张图应用布局前改写前后的连线数、dot 布局耗时、层数与画布尺寸（英寸）；
+    无法布局时后三者为 None。"""
+
+    name: str
+    edges: int
+    edges_after: int
+    notes: List[str]
+    before_ms: Optional[float]
+    after_ms: Optional[float]
+    ranks_before: Optional[int] = None
+    ranks_after: Optional[int] = None
+    canvas_before: Optional[Tuple[float, float]] = None
+    canvas_after: Optional[Tuple[float, float]] = None
+
+    @property
+    def saving(self) -> Optional[float]:
+        if not self.before_ms or self.after_ms is None:
+            return None
+        return 1 - self.after_ms / self.before_ms
+
+    @property
+    def area_change(self) -> Optional[float]:
+        if not self.canvas_before or not self.canvas_after:
+            return None
+        before = self.canvas_before[0] * self.canvas_before[1]
+        return self.canvas_after[0] * self.canvas_after[1] / before - 1 if before else None
+
+
+def _ranks(layout: bytes) -> Optional[int]:
+    # 层数即节点在分层方向上不同坐标的个数
+    try:
+        data = json.loads(layout)
+    except ValueError:
+        return None
+    axis = 0 if data.get("rankdir", "TB") in ("LR", "RL") else 1
+    coords = {
+        round(float(obj["pos"].split(",")[axis]))
+        for obj in data.get("objects", [])
+        if "pos" in obj and "nodes" not in obj
+    }
+    return len(coords) or None
+
+
+def _canvas(layout: bytes) -> Optional[Tuple[float, float]]:
+    # 画布即图的 bb，单位为点
+    try:
+        x0, y0, x1, y1 = (float(v) for v in json.loads(layout)["bb"].split(","))
+    except (ValueError, KeyError):
+        return None
+    return (x1 - x0) / 72, (y1 - y0) / 72
+
+
+def _layout(source: str, repeat: int) -> Tuple[Optional[float], Optional[int], Optional[Tuple[float, float]]]:
+    """dot 只做布局（-Tjson0）的耗时中位数（预热一次）、层数与画布尺寸；Graphviz 不可用时都为 None。"""
+    times = []
+    try:
+        for i in range(repeat + 1):
+            start = time.perf_counter()
+            layout = run_graphviz(["dot", "-Tjson0"], source)
+            if i:
+                times.append((time.perf_counter() - start) * 1000)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None, None
+    return _median(times), _ranks(layout), _canvas(layout)
+
+
+def pass_benchmark(
+    targets: Sequence[Target], names: Sequence[str] = (), repeat: int = 3, layout: bool = True
+) -> List[PassComparison]:
+    """对各图表的 DOT 应用改写，报告改写内容与布局耗时的变化。
+
+    DOT 由静态解析索引中的中间表示编译得到，与构建时相同。names 为空时
+    使用各图表在 `@diagram` 中声明的改写；没有任何改写的图表跳过。
+    """
+    passes.check(names)
+    scripts = {f"{s.category}/{s.path.name}": s for s in static.index({t.category for t in targets})}
+    rows = []
+    for target in targets:
+        rewrites = list(names) or list(target.passes)
+        script = scripts.get(f"{target.category}/{target.script}")
+        graphs = script.graphs(target) if script is not None else []
+        if not rewrites or not graphs or any(g.unresolved for g in graphs):
+            continue
+        for graph in graphs:
+            source = compile_dot(graph)
+            after, notes = passes.run(source, rewrites)
+            (before_ms, ranks_before, canvas_before), (after_ms, ranks_after, canvas_after) = [
+                _layout(dot, repeat) if layout and notes else (None, None, None) for dot in (source, after)
+            ]
+            rows.append(PassComparison(
+                target.name,
+                len(graph.edges),
+                len(passes.edges(list(statements(after)))),
+                notes,
+                before_ms,
+                after_ms,
+                ranks_before,
+                ranks_after,
+                canvas_before,
+                canvas_after,
+            ))
+    return rows
+
+
+def pass_table(rows: Sequence[PassComparison]) -> str:
+    lines = [
+        f"{'diagram':<56} {'edges':>6} {'after':>6} {'before ms':>10} {'after ms':>10} {'saving':>7} {'ranks':>9}"
+        f" {'canvas in':>15} {'area':>7}"
+    ]
+    for r in rows:
+        before = f"{r.before_ms:10.1f}" if r.before_ms is not None else f"{'-':>10}"
+        after = f"{r.after_ms:10.1f}" if r.after_ms is not None else f"{'-':>10}"
+        saving = f"{r.saving * 100:6.1f}%" if r.saving is not None else f"{'-':>7}"
+        ranks = f"{r.ranks_before}->{r.ranks_after}" if r.ranks_before and r.ranks_after else "-"
+        canvas = f"{r.canvas_after[0]:.1f}x{r.canvas_after[1]:.1f}" if r.canvas_after else "-"
+        area = f"{r.area_change * 100:+6.1f}%" if r.area_change is not None else f"{'-':>7}"
+        lines.append(f"{r.name:<56} {r.edges:6d} {r.edges_after:6d} {before} {after} {saving} {ranks:>9} {canvas:>15} {area}")
+        lines += [f"    {note}" for note in r.notes]
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class EngineRun:
+    """一种布局方式在一张图上的测量结果：布局耗时、画布面积（平方英寸）、连线
+    交叉数、平均连线长度（英寸）与得分；布局失败时只有 error。"""
+
+    choice: str
+    ms: Optional[float] = None
+    area: Optional[float] = None
+    crossings: Optional[int] = None
+    length: Optional[float] = None
+    score: Optional[float] = None
+    error: str = ""
+
+    def metrics(self) -> Dict[str, float]:
+        return {"time": self.ms, "area": self.area, "crossings": self.crossings, "length": self.length}
+
+
+@dataclass
+class EngineComparison:
+    """一张图在各候选布局方式下的测量结果。"""
+
+    target: Target
+    nodes: int
+    runs: List[EngineRun]
+
+    @property
+    def best(self) -> Optional[EngineRun]:
+        scored = [r for r in self.runs if r.score is not None]
+        return min(scored, key=lambda r: r.score) if scored else None
+
+
+def _engine_run(source: str, choice: str, repeat: int) -> EngineRun:
+    dot, engine = engines.configure(source, choice)
+    times = []
+    try:
+        for i in range(repeat + 1):
+            start = time.perf_counter()
+            layout = run_graphviz([engine, "-Tjson0"], dot)
+            if i:
+                times.append((time.perf_counter() - start) * 1000)
+        measured = engines.geometry(json.loads(layout))
+    except (OSError, subprocess.CalledProcessError, ValueError, KeyError) as e:
+        return EngineRun(choice, error=str(e).splitlines()[0] if str(e) else type(e).__name__)
+    return EngineRun(choice, _median(times), measured["area"], measured["crossings"], measured["length"])
+
+
+def engine_benchmark(
+    targets: Sequence[Target], choices: Sequence[str] = engines.CANDIDATES, repeat: int = 3
+) -> List[EngineComparison]:
+    """对各图表逐个试布局 choices 中的方式（-Tjson0），测量并按 `engines.score` 打分。
+
+    DOT 由静态解析索引中的中间表示编译，并应用图表声明的改写，与构建时
+    相同。得分以 `engines.DEFAULT` 为基准，它布局失败时以第一个成功的方式
+    为基准。
+    """
+    for choice in choices:
+        engines.parse(choice)
+    scripts = {f"{s.category}/{s.path.name}": s for s in static.index({t.category for t in targets})}
+    rows = []
+    for target in targets:
+        script = scripts.get(f"{target.category}/{target.script}")
+        graphs = script.graphs(target) if script is not None else []
+        if len(graphs) != 1 or graphs[0].unresolved:
+            continue
+        source, _ = passes.run(compile_dot(graphs[0]), target.passes)
+        runs = [_engine_run(source, choice, repeat) for choice in engines.candidates(source, choices)]
+        measured = [r for r in runs if not r.error]
+        if measured:
+            baseline = next((r for r in measured if r.choice == engines.DEFAULT), measured[0])
+            for run in measured:
+                run.score = engines.score(run.metrics(), baseline.metrics())
+        rows.append(EngineComparison(target, engines.node_count(source), runs))
+    return rows
+
+
+def engine_table(rows: Sequence[EngineComparison]) -> str:
+    lines = [f"{'diagram / engine':<56} {'ms':>8} {'area in2':>9} {'cross':>6} {'len in':>7} {'score':>6}"]
+    for row in rows:
+        best = row.best
+        lines.append(f"{row.target.name}（{row.nodes} 个节点）")
+        for r in row.runs:
+            if r.error:
+                lines.append(f"  {r.choice:<54} 失败：{r.error}")
+                continue
+            mark = " *" if r is best else ""
+            lines.append(
+                f"  {r.choice:<54} {r.ms:8.1f} {r.area:9.1f} {r.crossings:6d} {r.length:7.2f} {r.score:6.2f}{mark}"
+            )
+    return "\n".join(lines) + "\n"
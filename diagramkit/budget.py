@@ -0,0 +1,82 @@
+"""布局时间预算。
+
+脚本里一处不当的修改就可能让 dot 跑上几分钟，拖住整个构建。启用预算
+（`build --layout-budget 秒数`）后，每张图先在预算内只做布局（-Tjson0），
+超时即结束 Graphviz 进程，按 `STEPS` 逐级叠加更便宜的设置重试：
+
+1. 减少交叉最小化与网络单纯形的迭代（mclimit、nslimit、searchsize）；
+2. 连线画成直线（splines=line），不再做样条或正交走线；
+3. 连线标签改为 xlabel，不再作为虚拟节点参与分层（见 `passes.xlabel`）。
+
+每一级都有同样的预算，所有级别都超时时以 `LayoutBudgetExceeded` 失败。
+布局坐标无法回填、要按选定的设置完整渲染一次时，这次渲染同样限时；
+分块布局（`diagramkit.split`）的每一块也在预算内完成，否则改为全局布局。
+因此一张图的布局耗时不超过预算的 len(STEPS) + 3 倍。按回填的坐标输出
+各格式（`neato -n2`）不再布局，不计入预算；大图的 PNG 光栅化本身就可能
+要十几秒。降级的结果在构建输出中标出，且不写入渲染缓存与布局缓存，
+下次构建仍先按原设置尝试。
+"""
+
+import contextlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from diagramkit import passes
+from diagramkit.layout import statements
+
+# 逐级叠加的降级设置：(说明, 图属性或改写)
+STEPS: Tuple[Tuple[str, Union[Dict[str, str], Callable[[str], Tuple[str, List[str]]]]], ...] = (
+    ("减少迭代（mclimit/nslimit）", {"mclimit": "0.2", "nslimit": "2", "nslimit1": "2", "searchsize": "10"}),
+    ("直线连线（splines=line）", {"splines": "line"}),
+    ("标签改为 xlabel", passes.xlabel),
+)
+
+
+class LayoutBudgetExceeded(RuntimeError):
+    """降到最便宜的设置仍不能在预算内完成布局。"""
+
+
+def degrade(source: str, level: int) -> str:
+    """叠加 STEPS 的前 level 级设置，返回新的 DOT 源码。"""
+    for _, step in STEPS[:level]:
+        if callable(step):
+            source, _ = step(source)
+            continue
+        lines = list(statements(source))
+        found = passes.graph_attrs(lines)
+        if found is None:
+            continue
+        i, items = found
+        items.update(step)
+        lines[i] = passes.graph_line(items)
+        source = "\n".join(lines) + "\n"
+    return source
+
+
+def describe(level: int) -> str:
+    return "、".join(name for name, _ in STEPS[:level])
+
+
+_seconds: Optional[float] = None
+_notes: List[str] = []
+
+
+@contextlib.contextmanager
+def limited(seconds: Optional[float]) -> Iterator[List[str]]:
+    """在 with 块内渲染的图每次布局限时 seconds 秒（None 表示不限），返回降级说明的列表。"""
+    global _seconds, _notes
+    if seconds is not None and seconds <= 0:
+        raise ValueError("布局时间预算必须为正数")
+    saved = _seconds, _notes
+    _seconds, _notes = seconds, []
+    try:
+        yield _notes
+    finally:
+        _seconds, _notes = saved
+
+
+def active() -> Optional[float]:
+    return _seconds
+
+
+def note(message: str) -> None:
+    _notes.append(message)
@@ -0,0 +1,188 @@
+"""并行构建：把注册表中的图表交给进程池渲染。
+
+每张图作为一个任务提交，worker 从注册表取得对应的 `create_*` 函数
+（必要时导入其脚本）并直接调用，不再为每张图启动一次 `python3`。
+"""
+
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from diagramkit import cache as artifact_cache
+from diagramkit import layout as layout_cache
+from diagramkit import budget, engines, passes, registry, split, trace
+from diagramkit.registry import Target
+from diagramkit.render import install
+
+DEFAULT_FORMATS = ("png", "pdf")
+
+
+@dataclass
+class Result:
+    """单张图表的构建结果。"""
+
+    target: Target
+    ok: bool
+    seconds: float
+    error: str = ""
+    cached: bool = False
+    layout_cached: bool = False
+    # 布局超出时间预算，输出按降级的设置生成
+    degraded: bool = False
+    spans: List[dict] = field(default_factory=list)
+    # 布局前改写与布局方式的说明
+    notes: List[str] = field(default_factory=list)
+
+
+def target_passes(target: Target, extra: Sequence[str] = (), own: bool = True) -> Tuple[str, ...]:
+    """target 构建时应用的改写：图表自己声明的（own 为真时），再加上 extra。"""
+    return tuple(dict.fromkeys([*(target.passes if own else ()), *extra]))
+
+
+def _init_worker(
+    cache: Optional[artifact_cache.ArtifactCache],
+    layouts: Optional[layout_cache.LayoutCache],
+    tracing: bool,
+    coprocesses: bool,
+    in_memory: bool,
+) -> None:
+    # fork 出的 worker 继承了父进程的 tracer 及其中导入阶段的 span，
+    # 不换成新的会在每个 worker 的第一张图里再交回一遍
+    if tracing:
+        trace.activate(trace.Tracer())
+    install(cache, layouts, tracing, coprocesses, in_memory)
+
+
+def render_target(
+    target: Target,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    rewrites: Sequence[str] = (),
+    fallback_nodes: int = engines.FALLBACK_NODES,
+    layout_budget: Optional[float] = None,
+    split_layout: bool = False,
+    split_jobs: Optional[int] = None,
+) -> Result:
+    """渲染单张图表，异常被捕获并记录到结果中。
+
+    :param rewrites: 布局前应用的改写，见 `target_passes`。
+    :param fallback_nodes: 没有声明布局方式的图超过这个节点数时改用
+        `engines.FALLBACK`，0 表示不改用。
+    :param layout_budget: 每次布局的时间预算（秒），超时后降级重试，见
+        `diagramkit.budget`；None 表示不限时。
+    :param split_layout: 为真时各顶层集群分块并行布局，见 `diagramkit.split`。
+    :param split_jobs: 分块布局时同时布局的块数上限，默认为 CPU 数。
+    """
+    start = time.perf_counter()
+    cache = artifact_cache.active()
+    layouts = layout_cache.active()
+    tracer = trace.active()
+    hits = cache.hits if cache else 0
+    layout_hits = layouts.hits if layouts else 0
+    if tracer is not None:
+        tracer.diagram = target.name
+    notes: List[str] = []
+    layout_notes: List[str] = []
+    budget_notes: List[str] = []
+    split_notes: List[str] = []
+    try:
+        with trace.span("diagram"), passes.enabled(rewrites) as notes, budget.limited(layout_budget) as budget_notes:
+            with engines.selected(target.engine, fallback_nodes) as layout_notes:
+                with split.enabled(split_layout, split_jobs) as split_notes:
+                    func = registry.function(target)
+                    func(filename=str(target.output), outformat=list(formats))
+    except Exception:
+        return Result(
+            target, False, time.perf_counter() - start, traceback.format_exc(),
+            spans=tracer.drain() if tracer else [], notes=notes + layout_notes + split_notes + budget_notes,
+        )
+    return Result(
+        target,
+        True,
+        time.perf_counter() - start,
+        cached=bool(cache and cache.hits > hits),
+        layout_cached=bool(layouts and layouts.hits > layout_hits),
+        degraded=bool(budget_notes),
+        spans=tracer.drain() if tracer else [],
+        notes=notes + layout_notes + split_notes + budget_notes,
+    )
+
+
+def _report(result: Result) -> None:
+    if not result.ok:
+        status = "FAIL"
+    elif result.degraded:
+        status = "budget"
+    elif result.cached:
+        status = "cached"
+    elif result.layout_cached:
+        status = "layout"
+    else:
+        status = "ok"
+    print(f"{status:<6} {result.seconds:7.2f}s  {result.target.name}", flush=True)
+    for note in result.notes:
+        print(f"{'':17}{note}", flush=True)
+    if not result.ok:
+        print(result.error, flush=True)
+
+
+def build(
+    targets: Sequence[Target],
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    jobs: Optional[int] = None,
+    keep_going: bool = False,
+    cache: Optional[artifact_cache.ArtifactCache] = None,
+    layouts: Optional[layout_cache.LayoutCache] = None,
+    tracing: bool = False,
+    coprocesses: bool = False,
+    in_memory: bool = False,
+    extra_passes: Sequence[str] = (),
+    own_passes: bool = True,
+    fallback_nodes: int = engines.FALLBACK_NODES,
+    layout_budget: Optional[float] = None,
+    split_layout: bool = False,
+) -> List[Result]:
+    """在进程池中渲染 targets，逐张输出状态。
+
+    默认遇到第一个失败即停止派发新任务，已在运行的任务会等待其结束；
+    keep_going 为真时继续构建其余图表。给定 cache 时启用增量构建，
+    给定 layouts 时启用布局缓存；tracing 为真时各 worker 分阶段计时，
+    span 随结果一并返回；coprocesses 为真时每个 worker 复用常驻的 Graphviz
+    进程；in_memory 为真时输出在内存中生成后原子写入。各图表在布局前应用
+    自己声明的改写（own_passes 为假时不应用）与 extra_passes，按自己声明
+    的布局方式布局；没有声明的图超过 fallback_nodes 个节点时改用更快的方式。
+    给定 layout_budget 时每次布局限时，超时后降级重试，结果标为 degraded；
+    split_layout 为真时各图的顶层集群分块并行布局；进程池已占满 jobs 个
+    CPU，每张图同时布局的块数取 CPU 数除以 jobs（至少为 1），以免超额占用。
+    """
+    jobs = jobs or os.cpu_count() or 1
+    split_jobs = max(1, (os.cpu_count() or 1) // jobs)
+    # 脚本越大通常越慢，先派发大图，整体耗时更接近最慢的单张图
+    pending = sorted(targets, key=lambda t: t.path.stat().st_size, reverse=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache, layouts, tracing, coprocesses, in_memory)) as pool:
+        futures = {
+            pool.submit(render_target, t, tuple(formats), target_passes(t, extra_passes, own_passes), fallback_nodes, layout_budget, split_layout, split_jobs): t
+            for t in pending
+        }
+        stopped = False
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.pop(future)
+                result = future.result()
+                results.append(result)
+                _report(result)
+                if not result.ok and not keep_going and not stopped:
+                    stopped = True
+                    for other in futures:
+                        other.cancel()
+            if stopped:
+                futures = {f: t for f, t in futures.items() if not f.cancelled()}
+    built = {r.target for r in results}
+    for target in targets:
+        if target not in built:
+            print(f"{'skip':<6} {'':8}  {target.name}", flush=True)
+    return results
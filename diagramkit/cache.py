@@ -0,0 +1,207 @@
+"""按内容寻址的渲染产物缓存。
+
+缓存键由规范化后的 DOT 源码、`diagrams`/Graphviz 版本和输出选项共同
+计算。命中时直接把缓存中的文件复制到输出位置，跳过 Graphviz；未命中时
+正常渲染并把产物存入缓存。每个条目是缓存目录下的一个子目录，目录的
+修改时间即最近使用时间，总大小超过上限时按 LRU 淘汰。
+"""
+
+import functools
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".diagram-cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# uuid4().hex 以数字开头时 graphviz 会给它加上引号
+_RANDOM_ID = re.compile(r'"?\b([0-9a-f]{32})\b"?')
+
+
+def canonical_dot(source: str) -> str:
+    """把 DOT 中随机生成的节点 ID 按出现顺序替换为稳定的编号。"""
+    ids: Dict[str, str] = {}
+
+    def replace(match: "re.Match[str]") -> str:
+        return ids.setdefault(match.group(1), f"n{len(ids)}")
+
+    return _RANDOM_ID.sub(replace, source)
+
+
+@functools.lru_cache(maxsize=None)
+def graphviz_version(engine: str = "dot") -> str:
+    """返回 Graphviz 版本字符串；找不到命令时返回空串。"""
+    try:
+        proc = subprocess.run([engine, "-V"], capture_output=True, text=True)
+    except OSError:
+        return ""
+    return (proc.stderr or proc.stdout).strip()
+
+
+@functools.lru_cache(maxsize=None)
+def diagrams_version() -> str:
+    try:
+        return metadata.version("diagrams")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+class DirectoryCache:
+    """以目录为条目、按 LRU 淘汰的本地缓存。
+
+    每个条目是 `root/<key 前两位>/<key>/` 目录，目录修改时间即最近使用时间。
+    写入先落到临时目录再整体改名，多个进程并发读写同一缓存是安全的。
+
+    :param root: 缓存目录。
+    :param max_bytes: 缓存总大小上限，超过时淘汰最久未使用的条目。
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """返回条目目录并刷新其使用时间；不存在时返回 None。"""
+        entry = self._entry(key)
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def store_files(self, key: str, files: Dict[str, Path]) -> None:
+        """把 files（条目内文件名 -> 源文件）存为一个条目，然后按需淘汰。"""
+        entry = self._entry(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=entry.parent, prefix=".tmp-"))
+        for name, path in files.items():
+            shutil.copyfile(path, tmp / name)
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # 其他进程已写入同一条目，内容相同，丢弃本次结果
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def entries(self) -> List[Path]:
+        if not self.root.is_dir():
+            return []
+        return [p for p in self.root.glob("??/*") if p.is_dir() and not p.name.startswith(".tmp-")]
+
+    def size(self) -> int:
+        return sum(f.stat().st_size for e in self.entries() for f in e.iterdir())
+
+    def evict(self) -> List[Path]:
+        """按最近使用时间淘汰条目，直到总大小不超过 max_bytes。"""
+        sized = []
+        for entry in self.entries():
+            try:
+                sized.append((entry.stat().st_mtime, sum(f.stat().st_size for f in entry.iterdir()), entry))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in sized)
+        removed = []
+        for _, size, entry in sorted(sized, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed.append(entry)
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class ArtifactCache(DirectoryCache):
+    """渲染产物缓存，条目内按格式名保存各输出文件。
+
+    :param root: 缓存目录。
+    :param max_bytes: 缓存总大小上限。
+    :param force: 为真时忽略已有条目、总是重新渲染（渲染结果仍会写入缓存）。
+    """
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES, force: bool = False):
+        super().__init__(root, max_bytes)
+        self.force = force
+
+    def key(self, source: str, formats: Sequence[str], engine: str = "dot") -> str:
+        h = hashlib.sha256()
+        for part in (
+            canonical_dot(source),
+            diagrams_version(),
+            graphviz_version(engine),
+            engine,
+            ",".join(formats),
+        ):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def fetch(self, key: str, outputs: Sequence[str]) -> bool:
+        """命中时把缓存产物复制到 outputs 并返回 True。"""
+        entry = None if self.force else self.lookup(key)
+        if entry is None:
+            self.misses += 1
+            return False
+        try:
+            for path in outputs:
+                _copy_atomic(entry / Path(path).suffix.lstrip("."), Path(path))
+        except FileNotFoundError:
+            # 条目在读取过程中被并发淘汰，按未命中处理
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key: str, outputs: Sequence[str]) -> None:
+        """把刚渲染出的 outputs 存入缓存。"""
+        self.store_files(key, {Path(path).suffix.lstrip("."): Path(path) for path in outputs})
+
+
+def temp_path(dst: Path) -> Path:
+    """与 dst 同目录、各进程互不冲突的临时文件名，改名到 dst 是原子的。"""
+    return dst.with_name(f".{dst.name}.{os.getpid()}.{time.monotonic_ns()}")
+
+
+def write_atomic(dst: Path, data: bytes) -> None:
+    """先写临时文件再改名，读者只会看到完整的旧文件或新文件。"""
+    tmp = temp_path(dst)
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _copy_atomic(src: Path, dst: Path) -> None:
+    tmp = temp_path(dst)
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+_active: Optional[ArtifactCache] = None
+
+
+def activate(cache: Optional[ArtifactCache]) -> None:
+    """设置当前进程渲染时使用的缓存；传入 None 关闭缓存。"""
+    global _active
+    _active = cache
+
+
+def active() -> Optional[ArtifactCache]:
+    return _active
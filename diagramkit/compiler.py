@@ -0,0 +1,191 @@
+"""从 `graph.Graph` 直接生成 DOT。
+
+经 `diagrams` 建图时，每个 `Server(...)` 都要分配一个 `Node` 对象、一份
+`graphviz` 属性字典并查找图标路径，每个 `>>` 还要分配 `Edge` 对象，每个
+集群是一个独立的 `graphviz.Digraph`，结束时把整段正文逐行缩进后拼进
+父图。这里跳过这些对象，由中间表示直接拼出 DOT 文本：默认属性、图标、
+标签、方向与各元素在正文中的次序都与 `diagrams` 的输出一致，同一张图
+两条路径得到逐字节相同的 DOT，因此渲染缓存与布局缓存可以共用。
+
+节点类只用来查图标和高度，每个类第一次出现时导入一次并缓存。
+"""
+
+import functools
+import importlib
+import os
+import re
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from diagramkit.graph import Graph
+
+# 与 diagrams.Diagram / Cluster / Edge 的默认属性一致
+DIAGRAM_GRAPH_ATTRS = {
+    "pad": "2.0",
+    "splines": "ortho",
+    "nodesep": "0.60",
+    "ranksep": "0.75",
+    "fontname": "Sans-Serif",
+    "fontsize": "15",
+    "fontcolor": "#2D3436",
+}
+DIAGRAM_NODE_ATTRS = {
+    "shape": "box",
+    "style": "rounded",
+    "fixedsize": "true",
+    "width": "1.4",
+    "height": "1.4",
+    "labelloc": "b",
+    "imagescale": "true",
+    "fontname": "Sans-Serif",
+    "fontsize": "13",
+    "fontcolor": "#2D3436",
+}
+DIAGRAM_EDGE_ATTRS = {"color": "#7B8894"}
+CLUSTER_GRAPH_ATTRS = {
+    "shape": "box",
+    "style": "rounded",
+    "labeljust": "l",
+    "pencolor": "#AEB6BE",
+    "fontname": "Sans-Serif",
+    "fontsize": "12",
+}
+CLUSTER_BGCOLORS = ("#E5F5FD", "#EBF3E7", "#ECE8F6", "#FDF7E3")
+EDGE_ATTRS = {"fontcolor": "#2D3436", "fontname": "Sans-Serif", "fontsize": "13"}
+
+# 与 graphviz.quoting 的规则一致
+_ID = re.compile(r"([a-zA-Z_][a-zA-Z0-9_]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?))$")
+_HTML = re.compile(r"<.*>$", re.DOTALL)
+_KEYWORDS = {"node", "edge", "graph", "digraph", "subgraph", "strict"}
+_UNESCAPED_QUOTE = re.compile(r'(?P<backslashes>(?:\\{2})*)\\?(?P<quote>")')
+
+
+def quote(identifier: str) -> str:
+    """按 DOT 语法在需要时给标识符加引号。"""
+    if _ID.match(identifier) and identifier.lower() not in _KEYWORDS or _HTML.match(identifier):
+        return identifier
+    if '"' not in identifier:
+        return f'"{identifier}"'
+    return '"' + _UNESCAPED_QUOTE.sub(r'\g<backslashes>\\\g<quote>', identifier) + '"'
+
+
+@functools.lru_cache(maxsize=4096)
+def _attr(key: str, value: str) -> str:
+    # 属性名与取值（颜色、字体、图标路径等）在一张图里大量重复
+    return f"{quote(key)}={quote(value)}"
+
+
+def _attr_list(attrs: Mapping[str, object], label: Optional[str] = None) -> str:
+    items = [f"label={quote(label)}"] if label is not None else []
+    items += [_attr(k, str(v)) for k, v in sorted(attrs.items()) if v is not None]
+    return f" [{' '.join(items)}]" if items else ""
+
+
+@functools.lru_cache(maxsize=None)
+def node_class(kind: str) -> Tuple[str, Optional[str], float]:
+    """返回节点类的 (类名, 图标路径, 高度)；没有图标的类图标路径为 None。"""
+    module, _, name = kind.rpartition(".")
+    cls = getattr(importlib.import_module(module), name)
+    icon = None
+    if cls._icon:
+        # 与 diagrams.Node._load_icon 相同：图标在 diagrams 包旁的 resources 目录下
+        root = os.path.dirname(os.path.dirname(os.path.abspath(importlib.import_module("diagrams").__file__)))
+        icon = os.path.join(root, cls._icon_dir, cls._icon)
+    return cls.__name__, icon, cls._height
+
+
+def _node_line(node, autolabel: bool) -> str:
+    label = node.label
+    attrs: Dict[str, object] = {}
+    if node.kind:
+        name, icon, height = node_class(node.kind)
+        if autolabel:
+            label = f"{name}\n{label}" if label else name
+        if icon is not None:
+            padding = 0.4 * label.count("\n")
+            attrs = {"shape": "none", "height": str(height + padding), "image": icon}
+    attrs.update(node.attrs)
+    return f"{quote(node.id)}{_attr_list(attrs, label)}"
+
+
+def edge_line(edge) -> str:
+    """一条连线的 DOT 语句（不含缩进与换行）。"""
+    attrs = {**EDGE_ATTRS, **edge.attrs}
+    label = attrs.pop("label", None)
+    return f"{quote(edge.tail)} -> {quote(edge.head)}{_attr_list(attrs, label)}"
+
+
+def _bodies(graph: Graph, autolabel: bool, edges: bool = True) -> Dict[Optional[str], List[Tuple[int, object]]]:
+    # 每个容器（None 表示图本身）的正文条目：(次序, 行或集群)
+    bodies: Dict[Optional[str], List[Tuple[int, object]]] = {None: []}
+    for cluster in graph.clusters.values():
+        bodies.setdefault(cluster.id, [])
+    for node in graph.nodes.values():
+        bodies[node.cluster].append((node.seq, _node_line(node, autolabel)))
+    for cluster in graph.clusters.values():
+        bodies[cluster.parent].append((cluster.seq, cluster))
+    if edges:
+        top = bodies[None]
+        for edge in graph.edges:
+            top.append((edge.seq, edge_line(edge)))
+    return bodies
+
+
+def _emit(bodies: Dict[Optional[str], List[Tuple[int, object]]], container: Optional[str], indent: str, depth: int, lines: List[str]) -> None:
+    for _, item in sorted(bodies[container], key=lambda entry: entry[0]):
+        if isinstance(item, str):
+            lines.append(indent + item)
+            continue
+        cluster_attrs = {
+            **CLUSTER_GRAPH_ATTRS,
+            "label": item.label,
+            "rankdir": item.attrs.get("direction", "LR"),
+            "bgcolor": CLUSTER_BGCOLORS[depth % len(CLUSTER_BGCOLORS)],
+            **item.attrs.get("graph_attr", {}),
+        }
+        lines.append(f"{indent}subgraph {quote(item.id)} {{")
+        lines.append(f"{indent}\tgraph{_attr_list(cluster_attrs)}")
+        _emit(bodies, item.id, indent + "\t", depth + 1, lines)
+        lines.append(f"{indent}}}")
+
+
+def compile_dot(graph: Graph, graph_attr: Optional[Mapping[str, str]] = None) -> str:
+    """生成 graph 的 DOT 源码，与经 `diagrams` 构建同一张图得到的 `dot.source` 相同。
+
+    :param graph: 图的中间表示。
+    :param graph_attr: 额外覆盖的图属性，相当于渲染前修改 `Diagram.dot.graph_attr`。
+    """
+    options = graph.options
+    bodies = _bodies(graph, bool(options.get("autolabel")))
+    lines = []
+    head = f"digraph {quote(graph.name)} {{" if graph.name else "digraph {"
+    lines.append(f"strict {head}" if options.get("strict") else head)
+    attrs = {
+        **DIAGRAM_GRAPH_ATTRS,
+        "label": graph.name,
+        "rankdir": graph.direction,
+        "splines": options.get("curvestyle", "ortho"),
+        **options.get("graph_attr", {}),
+        **(graph_attr or {}),
+    }
+    lines.append(f"\tgraph{_attr_list(attrs)}")
+    lines.append(f"\tnode{_attr_list({**DIAGRAM_NODE_ATTRS, **options.get('node_attr', {})})}")
+    lines.append(f"\tedge{_attr_list({**DIAGRAM_EDGE_ATTRS, **options.get('edge_attr', {})})}")
+    _emit(bodies, None, "\t", 0, lines)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def snippet(graph: Graph, depth: int = 0, autolabel: bool = False) -> Tuple[List[str], List[str]]:
+    """生成子图片段的 DOT 语句，供直接追加到 `graphviz` 的正文。
+
+    返回 (所在容器的正文行, 连线行)：`diagrams` 把连线都加在图的顶层正文，
+    节点与集群则加在所在集群的正文。每行带缩进与换行，与 `graphviz`
+    逐条追加的格式相同。
+
+    :param graph: 片段的中间表示，顶层元素将放进所在容器。
+    :param depth: 所在容器的集群嵌套深度，决定片段中集群的背景色。
+    :param autolabel: 所在图是否启用了 autolabel。
+    """
+    lines: List[str] = []
+    _emit(_bodies(graph, autolabel, edges=False), None, "\t", depth, lines)
+    return [line + "\n" for line in lines], [f"\t{edge_line(edge)}\n" for edge in graph.edges]
@@ -0,0 +1,198 @@
+"""常驻的 Graphviz 协进程。
+
+每次渲染都新启动一个 `dot`，进程要先加载插件、初始化 fontconfig，然后
+才开始布局。`dot` 本身可以从 stdin 依次读入多张图、逐张输出到 stdout，
+这里为每条命令（引擎、参数与输出格式）保留一个常驻进程，图通过管道
+送入，结果以字节返回。
+
+stdout 上各张图的输出首尾相接，没有分隔符。每张图后面跟两份“哨兵图”，
+哨兵图在该命令下的输出是事先用一次性进程得到的固定字节，读到哨兵的
+输出即说明前面的图已经输出完整。第二份哨兵保证即使解析器需要读到下一
+个记号才结束上一张图，第一份哨兵的输出也会及时出现；它自己的输出留到
+下一次请求开头丢弃。相邻请求交替使用两种哨兵，以便区分上一次的残留
+与本次的输出。
+
+这种分帧要求设备每渲染完一张图就把它写出。PDF 等分页设备把所有图当作
+同一文件的各页，直到进程退出才写出，读不到哨兵只会等到超时，因此只有
+`STREAMING_FORMATS` 中的格式使用协进程，其余格式（包括默认的 pdf）照常
+启动一次性进程，见 `streaming`。
+
+协进程异常退出、输出为空或超时都会抛出 `CoprocessError`，调用方应改用
+一次性进程重新渲染以得到正常的错误信息。
+"""
+
+import atexit
+import os
+import select
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_TIMEOUT = 300.0
+
+# 每张图渲染完即写出的格式；pdf、ps 等分页格式在进程退出时才写出
+STREAMING_FORMATS = ("json0", "svg", "png")
+
+# 两种哨兵图的输出必须不同；都不含文字，避免输出依赖字体
+_SENTINELS = (
+    b"digraph diagramkit_sentinel_a {}\n",
+    b'digraph diagramkit_sentinel_b { n [label="" shape=point pos="0,0"] }\n',
+)
+
+
+class CoprocessError(Exception):
+    """协进程无法给出结果。"""
+
+
+def graphviz_env() -> Dict[str, str]:
+    """Graphviz 子进程的环境变量。"""
+    # 固定 PDF 等格式中嵌入的创建时间，使相同输入得到逐字节相同的输出
+    return {**os.environ, "SOURCE_DATE_EPOCH": os.environ.get("SOURCE_DATE_EPOCH", "0")}
+
+
+def streaming(cmd: Sequence[str]) -> bool:
+    """cmd 只输出一种 `STREAMING_FORMATS` 中的格式到 stdout 时返回 True。"""
+    formats = [arg[2:].split(":")[0] for arg in cmd if arg.startswith("-T")]
+    return len(formats) == 1 and formats[0] in STREAMING_FORMATS and not any(arg.startswith("-o") for arg in cmd)
+
+
+class Coprocess:
+    """一个常驻的 Graphviz 进程，依次处理多张图。"""
+
+    def __init__(self, cmd: Sequence[str], timeout: float = DEFAULT_TIMEOUT):
+        if not streaming(cmd):
+            raise CoprocessError(f"{' '.join(cmd)} does not write each graph as soon as it is rendered")
+        self.cmd = list(cmd)
+        self.timeout = timeout
+        env = graphviz_env()
+        self.markers = tuple(
+            subprocess.run(self.cmd, input=s, capture_output=True, check=True, env=env).stdout for s in _SENTINELS
+        )
+        if not all(self.markers) or self.markers[0] == self.markers[1]:
+            raise CoprocessError(f"cannot frame the output of {' '.join(self.cmd)}")
+        self._stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr, env=env, bufsize=0
+        )
+        self.requests = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _read(self, deadline: float) -> bytes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([self.proc.stdout], [], [], remaining)[0]:
+            raise CoprocessError(f"{' '.join(self.cmd)} timed out")
+        data = os.read(self.proc.stdout.fileno(), 1 << 16)
+        if not data:
+            raise CoprocessError(f"{' '.join(self.cmd)} exited with status {self.proc.wait()}")
+        return data
+
+    def run(self, source: str) -> bytes:
+        """处理一张图，返回它在 stdout 上的全部输出。"""
+        sentinel = _SENTINELS[self.requests % 2]
+        marker = self.markers[self.requests % 2]
+        leftover = self.markers[(self.requests + 1) % 2] if self.requests else b""
+        self.requests += 1
+        try:
+            self.proc.stdin.write(source.encode("utf-8") + b"\n" + sentinel + sentinel)
+        except BrokenPipeError:
+            raise CoprocessError(f"{' '.join(self.cmd)} exited with status {self.proc.wait()}") from None
+        deadline = time.monotonic() + self.timeout
+        buffer = b""
+        while True:
+            # 丢弃上一次请求留下的哨兵输出
+            while leftover and buffer.startswith(leftover):
+                buffer = buffer[len(leftover):]
+            if buffer.endswith(marker):
+                break
+            buffer += self._read(deadline)
+        while buffer.endswith(marker):
+            buffer = buffer[:-len(marker)]
+        if not buffer:
+            raise CoprocessError(f"{' '.join(self.cmd)} produced no output")
+        return buffer
+
+    def close(self) -> None:
+        if self.proc.stdin and not self.proc.stdin.closed:
+            try:
+                self.proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc.stdout.close()
+        self._stderr.close()
+
+
+class GraphvizPool:
+    """按命令复用的 Graphviz 协进程集合。
+
+    构建时每个 worker 进程各持有一个 pool，并行度由进程池决定；同一命令
+    在一个 worker 内只有一个协进程，处理 max_requests 张图后重启，避免
+    Graphviz 自身的内存增长累积。
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, max_requests: int = 1000):
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self._workers: Dict[Tuple[str, ...], Coprocess] = {}
+        self.started = 0
+        self.served = 0
+
+    def run(self, cmd: Sequence[str], source: str) -> bytes:
+        """用常驻进程执行 cmd 处理 source；失败时关闭该进程并抛出 `CoprocessError`。"""
+        key = tuple(cmd)
+        worker = self._workers.get(key)
+        if worker is not None and (not worker.alive or worker.requests >= self.max_requests):
+            self._discard(key)
+            worker = None
+        if worker is None:
+            try:
+                worker = self._workers[key] = Coprocess(cmd, self.timeout)
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise CoprocessError(str(e)) from e
+            self.started += 1
+        try:
+            data = worker.run(source)
+        except CoprocessError:
+            self._discard(key)
+            raise
+        self.served += 1
+        return data
+
+    def _discard(self, key: Tuple[str, ...]) -> None:
+        worker = self._workers.pop(key)
+        if worker.alive:
+            worker.proc.kill()
+        worker.close()
+
+    def commands(self) -> List[Tuple[str, ...]]:
+        return list(self._workers)
+
+    def close(self) -> None:
+        for key in list(self._workers):
+            self._workers.pop(key).close()
+
+
+_active: Optional[GraphvizPool] = None
+
+
+def activate(pool: Optional[GraphvizPool]) -> None:
+    """设置当前进程使用的协进程池；传入 None 关闭并停止已有的协进程。"""
+    global _active
+    if _active is not None and _active is not pool:
+        _active.close()
+    _active = pool
+
+
+def active() -> Optional[GraphvizPool]:
+    return _active
+
+
+atexit.register(activate, None)
@@ -0,0 +1,199 @@
+"""不调用 Graphviz 的图结构校验。
+
+执行各 `create_*` 函数时把 `diagrams` 的节点、集群与连线改为记录到内存
+中的 `graph.Graph`，不生成 DOT、不调用 `dot`、不写任何文件，然后检查：
+
+- 脚本或函数抛出的异常；
+- 图中没有节点；
+- 空集群（既无节点也无子集群）；
+- 连线的端点不在同一张图中（例如复用了另一张图的节点变量）；
+- 重复的节点 ID；
+- 孤立节点（创建后没有任何连线，通常是忘了连线的变量），只作为警告。
+"""
+
+import contextlib
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import diagrams
+from diagrams import Cluster, Diagram
+
+from diagramkit import compiler, edges, fragments, graph, ids, lazy, registry
+from diagramkit.graph import Graph, lint
+from diagramkit.registry import Target
+
+# diagrams 按节点类自动加上的图标属性，不属于图结构
+_ICON_ATTRS = ("shape", "height", "image")
+
+
+@dataclass
+class Report:
+    """一张图表的校验结果。"""
+
+    target: Target
+    graphs: List[Graph]
+    errors: List[str]
+    warnings: List[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _record(diagram: Diagram) -> Graph:
+    record = getattr(diagram, "_diagramkit_record", None)
+    if record is None:
+        direction = diagram.dot.graph_attr.get("rankdir", "LR")
+        record = diagram._diagramkit_record = Graph(diagram.name, diagram.filename, direction)
+    return record
+
+
+def _cluster_attrs(cluster: Cluster) -> dict:
+    # 与静态解析一致，只记录 direction 与非默认的 graph_attr
+    attrs = dict(cluster.dot.graph_attr)
+    direction = attrs.pop("rankdir")
+    defaults = {
+        **compiler.CLUSTER_GRAPH_ATTRS,
+        "label": cluster.label,
+        "bgcolor": compiler.CLUSTER_BGCOLORS[cluster.depth % len(compiler.CLUSTER_BGCOLORS)],
+    }
+    extra = {k: v for k, v in attrs.items() if defaults.get(k) != v}
+    recorded = {"direction": direction} if direction != "LR" else {}
+    if extra:
+        recorded["graph_attr"] = extra
+    return recorded
+
+
+@contextlib.contextmanager
+def recording() -> Iterator[List[Graph]]:
+    """在 with 块内把 `diagrams` 的输出改为记录，返回收集到的 `Graph` 列表。"""
+    # 只装上确定性 ID 与延迟加载，不动当前进程的渲染缓存设置
+    ids.install()
+    lazy.install()
+    graphs: List[Graph] = []
+    saved = {
+        (diagrams.Node, "__init__"): diagrams.Node.__init__,
+        (Diagram, "node"): Diagram.node,
+        (Diagram, "connect"): Diagram.connect,
+        (Diagram, "subgraph"): Diagram.subgraph,
+        (Diagram, "render"): Diagram.render,
+        (Diagram, "__exit__"): Diagram.__exit__,
+        (Cluster, "node"): Cluster.node,
+        (Cluster, "subgraph"): Cluster.subgraph,
+        (Cluster, "__exit__"): Cluster.__exit__,
+        (edges, "emit"): edges.emit,
+        (fragments, "emit"): fragments.emit,
+    }
+    node_init = diagrams.Node.__init__
+    kinds: List[str] = []
+
+    def init(self: diagrams.Node, *args, **kwargs) -> None:
+        # Diagram.node / Cluster.node 拿不到节点对象，借此记下节点类
+        kinds.append(f"{type(self).__module__}.{type(self).__name__}")
+        try:
+            node_init(self, *args, **kwargs)
+        finally:
+            kinds.pop()
+
+    def add_node(diagram: Diagram, nodeid: str, label: str, cluster: Optional[str], attrs: dict) -> None:
+        attrs = {k: v for k, v in attrs.items() if k not in _ICON_ATTRS}
+        _record(diagram).add_node(graph.Node(nodeid, label, kinds[-1] if kinds else "", cluster, attrs))
+
+    def diagram_node(self: Diagram, nodeid: str, label: str, **attrs) -> None:
+        add_node(self, nodeid, label, None, attrs)
+
+    def cluster_node(self: Cluster, nodeid: str, label: str, **attrs) -> None:
+        add_node(self._diagram, nodeid, label, self.name, attrs)
+
+    def connect(self: Diagram, node: diagrams.Node, node2: diagrams.Node, edge: diagrams.Edge) -> None:
+        record = _record(self)
+        for end in (node, node2):
+            if end._diagram is not self:
+                record.foreign.append((end.nodeid, end.label))
+        attrs = {k: v for k, v in edge.attrs.items() if diagrams.Edge._default_edge_attrs.get(k) != v}
+        record.add_edge(graph.Edge(node.nodeid, node2.nodeid, attrs))
+
+    def emit(diagram: Diagram, batch: Sequence[graph.Edge]) -> None:
+        # edges.connect 已校验过端点，批量连线直接记录
+        record = _record(diagram)
+        for edge in batch:
+            record.add_edge(edge)
+
+    def fragment_emit(diagram: Diagram, cluster: Optional[Cluster], item: fragments.Compiled, namespace: str) -> None:
+        _record(diagram).merge(item.graph, namespace, cluster.name if cluster is not None else None)
+
+    def cluster_exit(self: Cluster, exc_type, exc_value, tb) -> None:
+        parent = self._parent.name if self._parent is not None else None
+        _record(self._diagram).add_cluster(graph.Cluster(self.name, self.label, parent, _cluster_attrs(self)))
+        diagrams.setcluster(self._parent)
+
+    def render(self: Diagram) -> None:
+        graphs.append(_record(self))
+
+    def diagram_exit(self: Diagram, exc_type, exc_value, tb) -> None:
+        # diagrams 原本在渲染后删除 DOT 文件，记录模式下没有这个文件
+        self.render()
+        diagrams.setdiagram(None)
+
+    diagrams.Node.__init__ = init
+    Diagram.node = diagram_node
+    Diagram.connect = connect
+    Diagram.subgraph = lambda self, dot: None
+    Diagram.render = render
+    Diagram.__exit__ = diagram_exit
+    Cluster.node = cluster_node
+    Cluster.subgraph = lambda self, dot: None
+    Cluster.__exit__ = cluster_exit
+    edges.emit = emit
+    fragments.emit = fragment_emit
+    try:
+        yield graphs
+    finally:
+        for (cls, name), value in saved.items():
+            setattr(cls, name, value)
+
+
+def validate(target: Target) -> Report:
+    """以记录模式执行 target 并检查其结构。"""
+    start = time.perf_counter()
+    with recording() as graphs:
+        try:
+            registry.function(target)(filename=str(target.output), outformat=["png"])
+        except Exception as e:
+            frame = traceback.extract_tb(e.__traceback__)[-1]
+            error = f"{type(e).__name__}: {e}（{frame.filename}:{frame.lineno}）"
+            return Report(target, graphs, [error], [], time.perf_counter() - start)
+        finally:
+            # 异常中断时 diagrams 的全局上下文可能残留，避免影响下一张图
+            diagrams.setdiagram(None)
+            diagrams.setcluster(None)
+    errors, warnings = [], []
+    if not graphs:
+        errors.append("函数没有生成任何图")
+    for record in graphs:
+        e, w = lint(record)
+        errors += e
+        warnings += w
+    return Report(target, graphs, errors, warnings, time.perf_counter() - start)
+
+
+def discover(categories: Iterable[str] = registry.CATEGORIES) -> Tuple[List[Target], List[Tuple[Path, str]]]:
+    """像 `registry.discover` 一样导入脚本，但导入失败的脚本只记录下来，不中断。"""
+    targets, failures = [], []
+    for category in categories:
+        for path in sorted((registry.ROOT / category).glob("*.py")):
+            try:
+                registry.load_script(path, category)
+            except Exception as e:
+                failures.append((path, f"{type(e).__name__}: {e}"))
+                continue
+            targets.extend(sorted(registry.script_targets(path, category), key=lambda t: t.filename))
+    return targets, failures
+
+
+def validate_all(targets: Sequence[Target]) -> List[Report]:
+    return [validate(target) for target in targets]
@@ -0,0 +1,145 @@
+"""批量声明连线。
+
+技术栈类脚本往往逐条写一百多条 `a >> Edge(label="...") >> b`，每条语句
+都要创建临时的 `Edge` 对象，再单独调用一次 `graphviz` 的 `edge()`。
+`connect` 一次接收整张邻接表——元组列表、CSV 文件，或带 src/dst/label/
+style 字段的 NumPy 结构化数组——先整体校验、去重，再把全部连线一次性
+追加到当前图的 DOT 正文。每行与 `src >> Edge(label=..., style=...) >> dst`
+等价，生成的 DOT 与逐条连线完全相同。
+
+本模块只依赖标准库：结构化数组按 `dtype.names` 识别，不导入 NumPy；
+静态解析（`static`）也用这里的规则处理字面量邻接表。
+"""
+
+import csv
+import os
+from typing import IO, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from diagramkit import compiler
+from diagramkit.graph import Edge
+
+COLUMNS = ("src", "dst", "label", "style")
+
+# 校验失败时最多列出的问题数
+MAX_PROBLEMS = 20
+
+Row = Tuple[object, object, str, str]
+
+
+def _text(value: object) -> object:
+    # 结构化数组的定长字节串字段
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _columns(columns: Mapping[str, Sequence[object]], size: int) -> List[Row]:
+    missing = [name for name in COLUMNS[:2] if name not in columns]
+    if missing:
+        raise ValueError(f"邻接表缺少 {'、'.join(missing)} 列")
+    empty = [""] * size
+    return [
+        (_text(src), _text(dst), _text(label) or "", _text(style) or "")
+        for src, dst, label, style in zip(*(columns.get(name, empty) for name in COLUMNS))
+    ]
+
+
+def _csv_rows(file: IO[str]) -> List[Row]:
+    reader = csv.DictReader(file, skipinitialspace=True)
+    records = list(reader)
+    fields = [name for name in COLUMNS if name in (reader.fieldnames or ())]
+    return _columns({name: [r[name] for r in records] for name in fields}, len(records))
+
+
+def rows(table: object) -> List[Row]:
+    """把邻接表统一为 (src, dst, label, style) 行，label 与 style 缺省为空串。
+
+    :param table: 每行 2 到 4 列的元组（或列表）序列；首行为列名的 CSV 文件
+        路径或已打开的文件；或字段含 src 与 dst 的 NumPy 结构化数组。
+    """
+    if isinstance(table, (str, os.PathLike)):
+        with open(table, newline="", encoding="utf-8") as f:
+            return _csv_rows(f)
+    if hasattr(table, "read"):
+        return _csv_rows(table)
+    names = getattr(getattr(table, "dtype", None), "names", None)
+    if names:
+        return _columns({name: table[name].tolist() for name in names if name in COLUMNS}, len(table))
+    result = []
+    for i, row in enumerate(table, 1):
+        if isinstance(row, (str, bytes)) or not 2 <= len(row) <= 4:
+            raise ValueError(f"第 {i} 行应有 2 到 4 列（src, dst, label, style）：{row!r}")
+        src, dst, label, style = (*row, "", "")[:4]
+        result.append((src, dst, label or "", style or ""))
+    return result
+
+
+def edge_attrs(label: str, style: str) -> Dict[str, str]:
+    """一行对应的连线属性，与 `graph.Edge` 一样只含非默认值与 dir。"""
+    attrs = {"label": label} if label else {}
+    if style:
+        attrs["style"] = style
+    attrs["dir"] = "forward"
+    return attrs
+
+
+def dedupe(edges: Iterable[Edge]) -> Tuple[List[Edge], int]:
+    """去掉端点与属性都相同的重复连线，保留第一条；返回 (连线, 重复条数)。"""
+    seen = set()
+    unique = []
+    duplicates = 0
+    for edge in edges:
+        key = (edge.tail, edge.head, tuple(sorted(edge.attrs.items())))
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        unique.append(edge)
+    return unique, duplicates
+
+
+def emit(diagram, edges: Sequence[Edge]) -> None:
+    """把连线一次性追加到 diagram 的 DOT 正文；试运行校验会把它换成记录。"""
+    diagram.dot.body.extend([f"\t{compiler.edge_line(edge)}\n" for edge in edges])
+
+
+def connect(table: object, nodes: Optional[Mapping[str, object]] = None) -> int:
+    """在当前图中批量添加连线，返回实际添加的条数；重复的行只保留第一条。
+
+    端点可以是节点对象，也可以是 nodes 中的名字，例如传入 `locals()` 后
+    CSV 中直接写节点变量名。任何一行有问题（列数不对、名字找不到、端点
+    不属于当前图、标签不是字符串）都抛出 ValueError 并列出全部问题，
+    此时一条连线也不添加。
+
+    :param table: 邻接表，格式见 `rows`。
+    :param nodes: 名字到节点对象的映射。
+    """
+    # 只有真正连线时才需要 diagrams，本模块的其余部分不依赖它
+    from diagrams import Node, getdiagram
+
+    diagram = getdiagram()
+    if diagram is None:
+        raise RuntimeError("connect() 必须在 with Diagram(...) 块内调用")
+    problems = []
+
+    def resolve(i: int, end: object) -> Optional[Node]:
+        node = nodes.get(end) if isinstance(end, str) and nodes is not None else end
+        if not isinstance(node, Node):
+            problems.append(f"第 {i} 行：找不到节点 {end!r}")
+            return None
+        if node._diagram is not diagram:
+            problems.append(f"第 {i} 行：节点 {node.label!r} 不属于当前图")
+            return None
+        return node
+
+    batch = []
+    for i, (src, dst, label, style) in enumerate(rows(table), 1):
+        tail, head = resolve(i, src), resolve(i, dst)
+        if not isinstance(label, str) or not isinstance(style, str):
+            problems.append(f"第 {i} 行：label 与 style 必须是字符串")
+        if tail is not None and head is not None:
+            batch.append(Edge(tail.nodeid, head.nodeid, edge_attrs(label, style)))
+    if problems:
+        more = f"\n……共 {len(problems)} 处" if len(problems) > MAX_PROBLEMS else ""
+        raise ValueError("邻接表校验失败：\n" + "\n".join(problems[:MAX_PROBLEMS]) + more)
+    unique, _ = dedupe(batch)
+    emit(diagram, unique)
+    return len(unique)
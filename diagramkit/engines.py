@@ -0,0 +1,241 @@
+"""布局引擎与连线方式的选择。
+
+图表脚本都经 `Diagram(...)` 使用 dot 与 `splines=ortho`，唯一的调节项是
+方向。集群多、连线少的技术栈图换成 osage、fdp，或者只把正交走线换成
+普通样条，画面更紧凑或交叉更少；仓库里这种规模的图布局耗时相差不大，
+节点数上百之后正交走线的耗时才明显高于样条。布局方式写作
+"引擎[:splines]"，例如 "dot:spline"、"osage"。
+
+`python3 -m diagramkit engines` 对每张图逐个试布局候选方式，按布局耗时、
+画布面积、连线交叉数与平均连线长度打分（都与当前的 dot:ortho 相比，
+越低越好），`--record` 把得分最低的方式写进脚本的
+`@diagram(..., engine="...")`。构建时按图表声明的方式布局；没有声明、
+节点数又超过阈值的图自动改用更快的 `FALLBACK`。
+
+sfdp、neato 不画集群，有集群的图不考虑它们；patchwork 不画连线，不在
+候选之列。
+"""
+
+import ast
+import contextlib
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from diagramkit import passes
+from diagramkit.layout import statements
+from diagramkit.registry import Target
+
+# 与 diagrams 的默认相同
+DEFAULT = "dot:ortho"
+CANDIDATES = ("dot:ortho", "dot:spline", "dot:polyline", "fdp:spline", "sfdp:spline", "osage:spline")
+# 没有声明布局方式的图节点数超过 FALLBACK_NODES 时改用的方式
+FALLBACK = "dot:spline"
+FALLBACK_NODES = 300
+
+ENGINES = ("dot", "neato", "fdp", "sfdp", "osage", "twopi", "circo", "patchwork")
+# 会画出集群的引擎
+CLUSTER_ENGINES = ("dot", "fdp", "osage", "patchwork")
+SPLINES = ("ortho", "spline", "polyline", "line", "curved", "none")
+
+# 各项与基准之比的权重，得分越低越好
+WEIGHTS = {"time": 0.4, "area": 0.2, "crossings": 0.25, "length": 0.15}
+
+_CLUSTER = re.compile(r"^\t+subgraph cluster", re.M)
+
+
+def parse(choice: str) -> Tuple[str, Optional[str]]:
+    """把 "引擎[:splines]" 拆成 (引擎, splines)，未知的取值抛出 ValueError。"""
+    engine, _, splines = choice.partition(":")
+    if engine not in ENGINES:
+        raise ValueError(f"未知的布局引擎：{engine}（可用：{'、'.join(ENGINES)}）")
+    if splines and splines not in SPLINES:
+        raise ValueError(f"未知的连线方式：{splines}（可用：{'、'.join(SPLINES)}）")
+    return engine, splines or None
+
+
+def configure(source: str, choice: str) -> Tuple[str, str]:
+    """按 choice 改写 DOT 的 splines，返回 (新的源码, 引擎)。"""
+    engine, splines = parse(choice)
+    if splines is None:
+        return source, engine
+    lines = list(statements(source))
+    found = passes.graph_attrs(lines)
+    if found is None or found[1].get("splines") == splines:
+        return source, engine
+    i, items = found
+    items["splines"] = splines
+    lines[i] = passes.graph_line(items)
+    return "\n".join(lines) + "\n", engine
+
+
+def clustered(source: str) -> bool:
+    return bool(_CLUSTER.search(source))
+
+
+def candidates(source: str, choices: Sequence[str] = CANDIDATES) -> List[str]:
+    """适用于这张图的候选方式：有集群的图去掉不画集群的引擎。"""
+    if not clustered(source):
+        return list(choices)
+    return [c for c in choices if parse(c)[0] in CLUSTER_ENGINES]
+
+
+def node_count(source: str) -> int:
+    return len(passes.labels(list(statements(source))))
+
+
+_active: Optional[str] = None
+_fallback_nodes = FALLBACK_NODES
+_notes: List[str] = []
+
+
+@contextlib.contextmanager
+def selected(choice: str = "", fallback_nodes: int = FALLBACK_NODES) -> Iterator[List[str]]:
+    """在 with 块内用 choice 布局用 dot 渲染的图，返回收集说明的列表。
+
+    :param choice: 图表声明的布局方式；为空时按节点数决定是否改用 `FALLBACK`。
+    :param fallback_nodes: 改用 `FALLBACK` 的节点数阈值，0 表示不改用。
+    """
+    global _active, _fallback_nodes, _notes
+    if choice:
+        parse(choice)
+    saved = _active, _fallback_nodes, _notes
+    _active, _fallback_nodes, _notes = choice, fallback_nodes, []
+    try:
+        yield _notes
+    finally:
+        _active, _fallback_nodes, _notes = saved
+
+
+def apply(source: str, engine: str) -> Tuple[str, str]:
+    """按当前选定的布局方式改写 source，返回 (新的源码, 引擎)。
+
+    只替换脚本默认的 dot；不在 `selected` 块内时原样返回。
+    """
+    if _active is None or engine != "dot":
+        return source, engine
+    choice = _active
+    if not choice and _fallback_nodes:
+        nodes = node_count(source)
+        if nodes > _fallback_nodes:
+            choice = FALLBACK
+            _notes.append(f"{nodes} 个节点，超过 {_fallback_nodes}，改用 {FALLBACK} 布局")
+    if not choice or choice == DEFAULT:
+        return source, engine
+    return configure(source, choice)
+
+
+def _points(pos: str) -> List[Tuple[float, float]]:
+    # 连线的 pos 为 B 样条控制点，前面可能有 "s,x,y"（起点）、"e,x,y"（箭头端点）
+    start, end, points = [], [], []
+    for token in pos.replace("\\\n", "").split():
+        if token.startswith("s,"):
+            start = [tuple(map(float, token[2:].split(",")))]
+        elif token.startswith("e,"):
+            end = [tuple(map(float, token[2:].split(",")))]
+        else:
+            points.append(tuple(map(float, token.split(","))))
+    return start + points + end
+
+
+def _length(points: Sequence[Tuple[float, float]]) -> float:
+    return sum(math.dist(a, b) for a, b in zip(points, points[1:]))
+
+
+def _cross(p: Tuple[float, float], q: Tuple[float, float], r: Tuple[float, float], s: Tuple[float, float]) -> bool:
+    # 线段 pq 与 rs 是否真正相交（不计共线重叠与端点相接）
+    def side(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    d1, d2, d3, d4 = side(r, s, p), side(r, s, q), side(p, q, r), side(p, q, s)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def _box(points: Sequence[Tuple[float, float]]) -> Tuple[float, float, float, float]:
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def geometry(layout: dict) -> Dict[str, float]:
+    """从 json0 布局计算画布面积（平方英寸）、连线交叉数与平均连线长度（英寸）。
+
+    连线按控制点连成的折线近似；共用端点的两条连线不计交叉。
+    """
+    x0, y0, x1, y1 = (float(v) for v in layout.get("bb", "0,0,0,0").split(","))
+    routed = [
+        (e.get("tail"), e.get("head"), _points(e["pos"]))
+        for e in layout.get("edges", [])
+        if e.get("pos")
+    ]
+    routed = [(tail, head, points, _box(points)) for tail, head, points in routed if len(points) > 1]
+    crossings = 0
+    for k, (tail, head, points, box) in enumerate(routed):
+        for other_tail, other_head, other, other_box in routed[k + 1:]:
+            if {tail, head} & {other_tail, other_head}:
+                continue
+            if box[2] < other_box[0] or other_box[2] < box[0] or box[3] < other_box[1] or other_box[3] < box[1]:
+                continue
+            crossings += sum(
+                _cross(a, b, c, d) for a, b in zip(points, points[1:]) for c, d in zip(other, other[1:])
+            )
+    lengths = [_length(points) for _, _, points, _ in routed]
+    return {
+        "area": (x1 - x0) * (y1 - y0) / 72 / 72,
+        "crossings": crossings,
+        "length": sum(lengths) / len(lengths) / 72 if lengths else 0.0,
+    }
+
+
+def score(measured: Dict[str, float], baseline: Dict[str, float]) -> float:
+    """按 `WEIGHTS` 加权的各项与基准之比；基准自身得 1。交叉数两边各加 1，避免除以 0。"""
+    total = 0.0
+    for key, weight in WEIGHTS.items():
+        value, base = measured[key], baseline[key]
+        if key == "crossings":
+            value, base = value + 1, base + 1
+        total += weight * (value / base if base else 1.0)
+    return total
+
+
+def record(target: Target, choice: str) -> bool:
+    """把 choice 写进 target 所在脚本的 `@diagram(..., engine=...)`；脚本有变化时返回 True。"""
+    parse(choice)
+    path = Path(target.path)
+    source = path.read_text(encoding="utf-8")
+    call = _decorator(ast.parse(source), target)
+    if call is None:
+        raise ValueError(f"{target.script} 中找不到 {target.func} 的 @diagram 装饰器")
+    lines = source.splitlines(keepends=True)
+    keyword = next((k for k in call.keywords if k.arg == "engine"), None)
+    # ast 的列号按 UTF-8 字节计
+    if keyword is not None:
+        value = keyword.value
+        start, end = (value.lineno, value.col_offset), (value.end_lineno, value.end_col_offset)
+        text = f'"{choice}"'
+    elif call.args or call.keywords:
+        # 接在最后一个参数之后，不受尾随逗号与单独成行的右括号影响
+        last = max([*call.args, *(k.value for k in call.keywords)], key=lambda n: (n.end_lineno, n.end_col_offset))
+        start = end = (last.end_lineno, last.end_col_offset)
+        text = f', engine="{choice}"'
+    else:
+        start = end = (call.end_lineno, call.end_col_offset - 1)
+        text = f'engine="{choice}"'
+    head = lines[start[0] - 1].encode("utf-8")[: start[1]]
+    tail = lines[end[0] - 1].encode("utf-8")[end[1]:]
+    replaced = (head + text.encode("utf-8") + tail).decode("utf-8")
+    updated = "".join(lines[: start[0] - 1] + [replaced] + lines[end[0]:])
+    if updated == source:
+        return False
+    path.write_text(updated, encoding="utf-8")
+    return True
+
+
+def _decorator(tree: ast.Module, target: Target) -> Optional[ast.Call]:
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef) or node.name != target.func:
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call) and getattr(decorator.func, "id", getattr(decorator.func, "attr", None)) == "diagram":
+                return decorator
+    return None
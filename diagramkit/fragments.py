@@ -0,0 +1,315 @@
+"""多张图共用的子图片段。
+
+`fragments/` 目录下的模块用 `@fragment("名字")` 定义片段：一个用 `diagrams`
+API 画出若干集群、节点与连线的函数，返回值中的节点（可以直接
+`return locals()`）是片段对外的端口。图表脚本在 `Diagram` 或 `Cluster`
+块内用 `include("名字", 参数...)` 实例化片段，再用返回的端口与图中其他
+节点连线::
+
+    k8s = include("kubernetes", prefix="")
+    users >> Edge(label="HTTP") >> k8s["ingress"]
+
+片段按 (片段库内容, 名字, 参数) 编译一次：在独立的草稿图中以记录模式
+执行，得到中间表示，再由 `compiler` 生成 DOT 片段，连同中间表示缓存在
+`.fragment-cache/`。实例化时只需把片段中的 ID 加上实例的命名空间后缀，
+追加到所在集群与图的正文，不再逐个创建节点与连线对象。同一张图中多次
+实例化同一片段也不会发生 ID 冲突。
+
+图中用到了哪些片段记录在静态解析索引中（`Graph.fragments`），片段被
+修改后，`build --fragments-changed` 与 `watch` 只重新构建用到它的图表。
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import diagrams
+from diagrams import Cluster, Diagram, getcluster, getdiagram, setcluster, setdiagram
+
+from diagramkit import compiler, ids, registry
+from diagramkit.graph import Graph, namespaced
+from diagramkit.registry import FRAGMENT_DIR, ROOT, Target
+
+DEFAULT_CACHE_DIR = ROOT / ".fragment-cache"
+# 记录各图表上次成功构建时所用片段的摘要
+DEFAULT_STAMPS = DEFAULT_CACHE_DIR / "built.json"
+
+# 编译格式变化时递增，使旧的缓存失效
+CACHE_VERSION = 1
+
+_ID = re.compile(r"\b(?:n|cluster)_[0-9a-f]{16}\b")
+
+
+@dataclass
+class Fragment:
+    """一个已注册的片段。"""
+
+    name: str
+    func: Callable[..., object]
+    path: Path
+
+
+_fragments: Dict[str, Fragment] = {}
+
+
+def fragment(name: str) -> Callable:
+    """注册一个片段函数。
+
+    :param name: 片段名，`include` 按名字实例化。
+    """
+
+    def register(func: Callable[..., object]) -> Callable[..., object]:
+        _fragments[name] = Fragment(name, func, Path(func.__code__.co_filename))
+        return func
+
+    return register
+
+
+def _module_name(path: Path) -> str:
+    return "diagramkit_fragment_" + path.stem.replace("-", "_")
+
+
+def load(directory: Path = FRAGMENT_DIR) -> Dict[str, Fragment]:
+    """导入片段库中尚未导入的模块，返回全部已注册的片段。"""
+    for path in sorted(Path(directory).glob("*.py")):
+        name = _module_name(path)
+        if name in sys.modules:
+            continue
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+    return _fragments
+
+
+def reload(path: Path) -> List[str]:
+    """重新导入一个已修改的片段模块，返回修改前后它定义的全部片段名。"""
+    path = Path(path).resolve()
+    names = [n for n, f in _fragments.items() if f.path.resolve() == path]
+    for name in names:
+        del _fragments[name]
+    sys.modules.pop(_module_name(path), None)
+    _compiled.clear()
+    load(path.parent)
+    return sorted(set(names) | {n for n, f in _fragments.items() if f.path.resolve() == path})
+
+
+_library: Dict[tuple, str] = {}
+
+
+def library_digest(directory: Path = FRAGMENT_DIR) -> str:
+    """片段库全部源文件的摘要；片段可以嵌套引用，任何一个文件变化都要重新编译。"""
+    paths = sorted(Path(directory).glob("*.py"))
+    signature = tuple((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in paths)
+    if signature not in _library:
+        digest = hashlib.sha1(str(CACHE_VERSION).encode())
+        for path in paths:
+            digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes() + b"\0")
+        _library[signature] = digest.hexdigest()
+    return _library[signature]
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()[:16]
+
+
+@dataclass
+class Compiled:
+    """编译后的片段：使用片段内 ID 的中间表示、端口，以及按所在位置生成的 DOT 片段。
+
+    snippets 以 "集群深度:autolabel" 为键，值为 (所在容器的正文行, 连线行)。
+    """
+
+    graph: Graph
+    ports: Dict[str, str]
+    snippets: Dict[str, Tuple[List[str], List[str]]] = field(default_factory=dict)
+    # 缓存文件；生成了新的 DOT 片段后重新写入
+    path: Optional[Path] = field(default=None, repr=False)
+
+    def snippet(self, depth: int, autolabel: bool) -> Tuple[List[str], List[str]]:
+        # 集群背景色按深度循环，深度只需取模
+        key = f"{depth % len(compiler.CLUSTER_BGCOLORS)}:{int(autolabel)}"
+        if key not in self.snippets:
+            self.snippets[key] = compiler.snippet(self.graph, depth, autolabel)
+            self.store()
+        return self.snippets[key]
+
+    def store(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.to_dict(), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def to_dict(self) -> dict:
+        return {"graph": self.graph.to_dict(), "ports": self.ports, "snippets": self.snippets}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Compiled":
+        snippets = {k: (body, edges) for k, (body, edges) in data["snippets"].items()}
+        return cls(Graph.from_dict(data["graph"]), data["ports"], snippets)
+
+
+_compiled: Dict[str, Compiled] = {}
+
+
+def _key(name: str, params: Dict[str, object]) -> str:
+    try:
+        encoded = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    except TypeError:
+        raise TypeError(f"片段 {name} 的参数只能是字符串、数字等可写入 JSON 的值") from None
+    return hashlib.sha1(f"{library_digest()}\0{name}\0{encoded}".encode("utf-8")).hexdigest()[:20]
+
+
+def _compile(item: Fragment, params: Dict[str, object]) -> Compiled:
+    # dryrun 记录时会替换本模块的 emit，两个模块互相引用，这里延迟导入
+    from diagramkit import dryrun
+
+    outer, outer_cluster = getdiagram(), getcluster()
+    # 草稿图从顶层开始，不能落进实例化时所在的集群
+    setcluster(None)
+    try:
+        with dryrun.recording() as graphs:
+            with Diagram(item.name, filename=item.name, show=False):
+                result = item.func(**params)
+                nodes = {k: v.nodeid for k, v in dict(result or {}).items() if isinstance(v, diagrams.Node)}
+    finally:
+        setdiagram(outer)
+        setcluster(outer_cluster)
+    graph = graphs[0]
+    graph.name, graph.filename = item.name, str(item.path)
+    return Compiled(graph, nodes)
+
+
+def compiled(name: str, params: Dict[str, object], cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> Compiled:
+    """返回编译好的片段，依次查进程内缓存与缓存目录，都没有时编译。
+
+    生成新的 DOT 片段时写入缓存目录；cache_dir 为 None 时只缓存在进程内。
+    """
+    load()
+    if name not in _fragments:
+        raise KeyError(f"未定义的片段：{name}（片段库 {FRAGMENT_DIR}）")
+    key = _key(name, params)
+    result = _compiled.get(key)
+    if result is not None:
+        return result
+    path = Path(cache_dir) / f"{name}-{key}.json" if cache_dir is not None else None
+    if path is not None and path.exists():
+        try:
+            result = Compiled.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError):
+            result = None
+    if result is None:
+        result = _compile(_fragments[name], params)
+    result.path = path
+    _compiled[key] = result
+    return result
+
+
+class Port(diagrams.Node):
+    """片段实例中的一个节点。可以像普通节点一样用 >>、<<、- 连线，但不会再次加入图中。"""
+
+    def __init__(self, nodeid: str, label: str):
+        # 不调用 Node.__init__：节点已随片段加入图中
+        self._id = nodeid
+        self.label = label
+        self._attrs = {}
+        self._diagram = getdiagram()
+        self._cluster = getcluster()
+
+
+def emit(diagram: Diagram, cluster: Optional[Cluster], item: Compiled, namespace: str) -> None:
+    """把片段实例的 DOT 追加到所在集群（或图）与图的正文；试运行校验会把它换成记录。"""
+    body, edges = item.snippet(cluster.depth + 1 if cluster is not None else 0, diagram.autolabel)
+    local = set(item.graph.nodes) | set(item.graph.clusters)
+
+    def rename(lines: Sequence[str]) -> List[str]:
+        sub = lambda m: namespaced(m[0], namespace) if m[0] in local else m[0]
+        return [_ID.sub(sub, line) for line in lines]
+
+    (cluster.dot if cluster is not None else diagram.dot).body.extend(rename(body))
+    diagram.dot.body.extend(rename(edges))
+
+
+def include(name: str, **params: object) -> Dict[str, Port]:
+    """在当前集群（或图）中实例化片段 name，返回 {端口名: 节点}。
+
+    :param name: 片段名。
+    :param params: 传给片段函数的参数，只能是可写入 JSON 的值。
+    """
+    diagram = getdiagram()
+    if diagram is None:
+        raise RuntimeError("include() 必须在 with Diagram(...) 块内调用")
+    cluster = getcluster()
+    item = compiled(name, params)
+    # 与节点 ID 相同，由集群路径、片段名与出现次序确定
+    namespace = ids.stable_id("fragment", ids.cluster_path(cluster), name).split("_", 1)[1]
+    emit(diagram, cluster, item, namespace)
+    return {
+        port: Port(namespaced(nodeid, namespace), item.graph.nodes[nodeid].label)
+        for port, nodeid in item.ports.items()
+    }
+
+
+class Stamps:
+    """各图表上次成功构建时所用片段源文件的摘要，用于找出片段修改后需要重建的图表。
+
+    :param path: 记录文件；为 None 时不读写。
+    """
+
+    def __init__(self, path: Optional[Path] = DEFAULT_STAMPS):
+        self.path = Path(path) if path is not None else None
+        self.built: Dict[str, Dict[str, str]] = {}
+        if self.path is not None:
+            try:
+                self.built = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.built = {}
+
+    def stale(self, targets: Iterable[Target], uses: Dict[str, List[str]], files: Dict[str, Path]) -> List[Target]:
+        """返回所用片段自上次成功构建以来有变化（或从未记录）的图表。
+
+        :param uses: 图表名到所用片段名的映射（来自静态解析索引）。
+        :param files: 片段名到源文件的映射。
+        """
+        current = {name: file_digest(path) for name, path in files.items() if path.exists()}
+        result = []
+        for target in targets:
+            used = uses.get(target.name, [])
+            recorded = self.built.get(target.name, {})
+            if any(current.get(name) != recorded.get(name) for name in used):
+                result.append(target)
+        return result
+
+    def record(self, targets: Iterable[Target], uses: Dict[str, List[str]], files: Dict[str, Path]) -> None:
+        for target in targets:
+            used = uses.get(target.name, [])
+            if used:
+                self.built[target.name] = {name: file_digest(files[name]) for name in used if name in files}
+            else:
+                self.built.pop(target.name, None)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.built, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def dependents(targets: Sequence[Target], names: Iterable[str], uses: Dict[str, List[str]]) -> List[Target]:
+    """返回用到 names 中任一片段的图表。"""
+    names = set(names)
+    return [t for t in targets if names & set(uses.get(t.name, ()))]
@@ -0,0 +1,239 @@
+"""与 `diagrams` 无关的图结构中间表示。
+
+一张图由节点、集群树和连线组成，节点与集群使用和渲染时相同的确定性
+ID。试运行校验（`dryrun`）在执行脚本时记录出这种结构，静态解析
+（`static`）不执行脚本直接从源码得到它；校验规则只依赖这里的结构，
+因此两者共用 `lint`。本模块只依赖标准库。
+"""
+
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def stable_id(counter: Counter, kind: str, path: Sequence[str], label: str) -> str:
+    """按 (kind, 集群路径, 标签) 在 counter 所属图中的出现次数生成稳定 ID。
+
+    :param counter: 一张图内共用的计数器，记录每个 (kind, 路径, 标签) 已出现的次数。
+    :param kind: "n" 表示节点，"cluster" 表示集群。
+    :param path: 从最外层到所在集群的集群标签列表。
+    :param label: 节点或集群的标签。
+    """
+    key = "\x1f".join([kind, *path, label])
+    ordinal = counter[key]
+    counter[key] += 1
+    digest = hashlib.sha1(f"{key}\x1e{ordinal}".encode("utf-8")).hexdigest()[:16]
+    return f"{kind}_{digest}"
+
+
+def namespaced(itemid: str, namespace: str) -> str:
+    """片段实例中节点或集群的 ID：片段内的 ID 加上实例的命名空间。
+
+    集群 ID 仍以 cluster 开头，Graphviz 才会把它画成方框。
+    """
+    return f"{itemid}_{namespace}"
+
+
+class Node:
+    """一个节点。kind 是节点类的完整路径，例如 "diagrams.onprem.compute.Server"。
+
+    seq 是节点在所在集群（或图）DOT 正文中的次序，由 `Graph.add_node` 填写。
+    大图有成千上万个节点与连线，记录类都用 `__slots__`，不为每个实例分配
+    属性字典。
+    """
+
+    __slots__ = ("id", "label", "kind", "cluster", "attrs", "line", "seq")
+
+    def __init__(
+        self,
+        id: str,
+        label: str,
+        kind: str = "",
+        cluster: Optional[str] = None,
+        attrs: Optional[Dict[str, str]] = None,
+        line: int = 0,
+        seq: int = 0,
+    ):
+        self.id = id
+        self.label = label
+        self.kind = kind
+        self.cluster = cluster
+        self.attrs = attrs if attrs is not None else {}
+        self.line = line
+        self.seq = seq
+
+    def __repr__(self) -> str:
+        return f"Node({self.id!r}, {self.label!r}, {self.kind!r}, cluster={self.cluster!r})"
+
+
+class Cluster:
+    """一个集群；parent 为 None 表示直接位于图的顶层。
+
+    与 `diagrams` 一致，集群在结束（离开 with 块）时才加入父集群的正文，
+    seq 记录的是这一时刻的次序。
+    """
+
+    __slots__ = ("id", "label", "parent", "attrs", "line", "seq")
+
+    def __init__(
+        self,
+        id: str,
+        label: str,
+        parent: Optional[str] = None,
+        attrs: Optional[Dict[str, object]] = None,
+        line: int = 0,
+        seq: int = 0,
+    ):
+        self.id = id
+        self.label = label
+        self.parent = parent
+        self.attrs = attrs if attrs is not None else {}
+        self.line = line
+        self.seq = seq
+
+    def __repr__(self) -> str:
+        return f"Cluster({self.id!r}, {self.label!r}, parent={self.parent!r})"
+
+
+class Edge:
+    """一条连线。attrs 只含与 `diagrams.Edge` 默认值不同的属性，包括 dir。"""
+
+    __slots__ = ("tail", "head", "attrs", "line", "seq")
+
+    def __init__(self, tail: str, head: str, attrs: Optional[Dict[str, str]] = None, line: int = 0, seq: int = 0):
+        self.tail = tail
+        self.head = head
+        self.attrs = attrs if attrs is not None else {}
+        self.line = line
+        self.seq = seq
+
+    @property
+    def label(self) -> str:
+        return self.attrs.get("label", "")
+
+    def __repr__(self) -> str:
+        return f"Edge({self.tail!r}, {self.head!r}, {self.attrs!r})"
+
+
+@dataclass
+class Graph:
+    """一张图。
+
+    duplicates 与 foreign 记录建图过程中发现的问题：重复的节点 ID，以及
+    端点不属于本图的连线；unresolved 是静态解析时无法确定含义而跳过的
+    语句；fragments 是图中（包括嵌套）实例化过的片段名。
+    """
+
+    name: str
+    filename: str
+    direction: str = "LR"
+    options: Dict[str, object] = field(default_factory=dict)
+    nodes: Dict[str, Node] = field(default_factory=dict)
+    clusters: Dict[str, Cluster] = field(default_factory=dict)
+    edges: List[Edge] = field(default_factory=list)
+    duplicates: List[str] = field(default_factory=list)
+    foreign: List[Tuple[str, str]] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+    fragments: List[str] = field(default_factory=list)
+
+    def _next(self) -> int:
+        return len(self.nodes) + len(self.clusters) + len(self.edges)
+
+    def add_node(self, node: Node) -> Node:
+        if node.id in self.nodes:
+            self.duplicates.append(node.id)
+        node.seq = self._next()
+        self.nodes[node.id] = node
+        return node
+
+    def add_cluster(self, cluster: Cluster) -> Cluster:
+        """在集群结束时调用，把它加入父集群的正文。"""
+        cluster.seq = self._next()
+        self.clusters[cluster.id] = cluster
+        return cluster
+
+    def add_edge(self, edge: Edge) -> Edge:
+        edge.seq = self._next()
+        self.edges.append(edge)
+        return edge
+
+    def merge(self, fragment: "Graph", namespace: str, cluster: Optional[str], line: int = 0) -> None:
+        """把片段 fragment 的元素以带命名空间的 ID 加入本图，顶层元素放进 cluster。
+
+        与实例化时追加 DOT 片段的顺序一致：先按原次序加入节点与集群，
+        再加入全部连线。
+        """
+        items = sorted([*fragment.nodes.values(), *fragment.clusters.values()], key=lambda item: item.seq)
+        for item in items:
+            if isinstance(item, Node):
+                parent = namespaced(item.cluster, namespace) if item.cluster is not None else cluster
+                self.add_node(Node(namespaced(item.id, namespace), item.label, item.kind, parent, dict(item.attrs), line))
+            else:
+                parent = namespaced(item.parent, namespace) if item.parent is not None else cluster
+                self.add_cluster(Cluster(namespaced(item.id, namespace), item.label, parent, dict(item.attrs), line))
+        for edge in fragment.edges:
+            self.add_edge(Edge(namespaced(edge.tail, namespace), namespaced(edge.head, namespace), dict(edge.attrs), line))
+        self.fragments += [fragment.name, *fragment.fragments]
+
+    def children(self, cluster: Optional[str]) -> Tuple[List[Cluster], List[Node]]:
+        """返回直接位于 cluster（None 表示顶层）下的子集群与节点。"""
+        clusters = [c for c in self.clusters.values() if c.parent == cluster]
+        nodes = [n for n in self.nodes.values() if n.cluster == cluster]
+        return clusters, nodes
+
+    def to_dict(self) -> dict:
+        """转换为可写入 JSON 的紧凑形式：节点、集群与连线各是一个字段列表。"""
+        return {
+            "name": self.name,
+            "filename": self.filename,
+            "direction": self.direction,
+            "options": self.options,
+            "nodes": [[n.id, n.label, n.kind, n.cluster, n.attrs, n.line, n.seq] for n in self.nodes.values()],
+            "clusters": [[c.id, c.label, c.parent, c.attrs, c.line, c.seq] for c in self.clusters.values()],
+            "edges": [[e.tail, e.head, e.attrs, e.line, e.seq] for e in self.edges],
+            "duplicates": self.duplicates,
+            "foreign": self.foreign,
+            "unresolved": self.unresolved,
+            "fragments": self.fragments,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Graph":
+        return cls(
+            data["name"],
+            data["filename"],
+            data["direction"],
+            data["options"],
+            {n[0]: Node(*n) for n in data["nodes"]},
+            {c[0]: Cluster(*c) for c in data["clusters"]},
+            [Edge(*e) for e in data["edges"]],
+            data["duplicates"],
+            [tuple(f) for f in data["foreign"]],
+            data["unresolved"],
+            data["fragments"],
+        )
+
+
+def lint(graph: Graph) -> Tuple[List[str], List[str]]:
+    """返回一张图的 (错误, 警告)。"""
+    errors, warnings = [], []
+    if not graph.nodes:
+        errors.append("图中没有节点")
+    parents = {c.parent for c in graph.clusters.values() if c.parent is not None}
+    populated = {n.cluster for n in graph.nodes.values() if n.cluster is not None}
+    for cluster in graph.clusters.values():
+        if cluster.id not in parents and cluster.id not in populated:
+            errors.append(f"空集群：{cluster.label}")
+    for nodeid in dict.fromkeys(graph.duplicates):
+        errors.append(f"重复的节点 ID：{nodeid}")
+    for nodeid, label in dict.fromkeys(graph.foreign):
+        errors.append(f"连线端点不属于本图：{label}（{nodeid}）")
+    connected = {end for edge in graph.edges for end in (edge.tail, edge.head)}
+    isolated = [n.label for n in graph.nodes.values() if n.id not in connected]
+    if isolated and graph.edges:
+        # 完全没有连线的图（如纯分层清单）不逐个报告
+        warnings.append(f"{len(isolated)} 个孤立节点：" + "、".join(isolated[:5]) + ("……" if len(isolated) > 5 else ""))
+    if graph.unresolved:
+        warnings.append(f"静态解析跳过 {len(graph.unresolved)} 处语句：" + "；".join(graph.unresolved[:3]))
+    return errors, warnings
@@ -0,0 +1,67 @@
+"""确定性的节点与集群 ID。
+
+`diagrams.Node` 默认用 `uuid4().hex` 作为节点 ID，每次运行生成的 DOT 都
+不同；`Cluster` 则直接以 `cluster_<label>` 命名，不同父集群下的同名集群
+会被 Graphviz 合并成一个。这里改为由集群路径、标签和声明顺序推导 ID：
+同一脚本重复运行得到逐字节相同的 DOT，新增或删除一个节点也只影响它
+自己（以及其后同路径、同标签的节点）的 ID。
+"""
+
+from collections import Counter
+from typing import List, Optional
+
+import diagrams
+from diagrams import Cluster, Node, getcluster, getdiagram
+
+from diagramkit import graph
+
+_original_node_init = Node.__init__
+_original_cluster_init = Cluster.__init__
+
+
+def cluster_path(cluster: Optional[Cluster]) -> List[str]:
+    """返回从最外层到 cluster 的集群标签列表。"""
+    path = []
+    while cluster is not None:
+        path.append(cluster.label)
+        cluster = cluster._parent
+    return path[::-1]
+
+
+def stable_id(kind: str, path: List[str], label: str) -> str:
+    """按 (kind, 集群路径, 标签) 在当前图中的出现次数生成稳定 ID。"""
+    diagram = getdiagram()
+    counter = getattr(diagram, "_diagramkit_ids", None)
+    if counter is None:
+        counter = diagram._diagramkit_ids = Counter()
+    return graph.stable_id(counter, kind, path, label)
+
+
+def _node_init(self, label: str = "", *, nodeid: str = None, **attrs) -> None:
+    if nodeid is None and getdiagram() is not None:
+        nodeid = stable_id("n", cluster_path(getcluster()), label)
+    _original_node_init(self, label, nodeid=nodeid, **attrs)
+
+
+def _cluster_init(self, label: str = "cluster", direction: str = "LR", graph_attr: Optional[dict] = None) -> None:
+    _original_cluster_init(self, label, direction=direction, graph_attr=graph_attr)
+    # 集群名必须以 cluster 开头 Graphviz 才会把它画成方框
+    self.name = stable_id("cluster", cluster_path(self._parent), label)
+    self.dot.name = self.name
+
+
+def install() -> None:
+    """让 `diagrams` 的节点与集群使用确定性 ID。
+
+    已被其他包装（如试运行校验的记录）替换过的构造函数保持不变，
+    这些包装本身会调用到这里的实现。
+    """
+    if diagrams.Node.__init__ is _original_node_init:
+        diagrams.Node.__init__ = _node_init
+    if diagrams.Cluster.__init__ is _original_cluster_init:
+        diagrams.Cluster.__init__ = _cluster_init
+
+
+def uninstall() -> None:
+    diagrams.Node.__init__ = _original_node_init
+    diagrams.Cluster.__init__ = _original_cluster_init
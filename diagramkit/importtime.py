@@ -0,0 +1,39 @@
+"""基于 `-X importtime` 的脚本导入耗时测量，用于对比 provider 延迟加载的效果。"""
+
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+
+def import_header(script: Path) -> str:
+    """返回脚本中所有顶层 import 语句组成的代码。"""
+    tree = ast.parse(Path(script).read_text(encoding="utf-8"))
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure_import_time(script: Path, lazy: bool, repeat: int = 5) -> float:
+    """用 `-X importtime` 测量脚本顶层导入的耗时（秒），取 repeat 次中的最小值。
+
+    lazy 为真时先安装延迟加载 finder，其自身的导入开销也计入结果。
+    """
+    code = import_header(script)
+    if lazy:
+        code = "import diagramkit.lazy\ndiagramkit.lazy.install()\n" + code
+    root = str(Path(__file__).resolve().parent.parent)
+    best = float("inf")
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True, cwd=root,
+        )
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|")
+            # 只累加顶层模块（名字前没有缩进），避免重复计算子模块
+            if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+                total += int(cumulative)
+        best = min(best, total / 1e6)
+    return best
@@ -0,0 +1,196 @@
+"""持久化的 Graphviz 布局缓存。
+
+布局（节点坐标、边的样条、集群边框与标签位置）只取决于图结构和影响
+几何的属性。缓存键由去掉纯渲染属性（颜色、dpi、链接等）后的 DOT、布局
+引擎和 Graphviz 版本计算；缓存内容是 Graphviz 的 `json0` 输出，即带坐标
+的图。命中时把坐标回填到当前 DOT 中，用 `neato -n2` 直接按已有坐标输出，
+不再做布局。因此同一张图换输出格式、换 DPI 或只改颜色都会命中缓存。
+"""
+
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from diagramkit.cache import DEFAULT_MAX_BYTES, DirectoryCache, canonical_dot, graphviz_version
+
+DEFAULT_LAYOUT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".layout-cache"
+
+# 只影响绘制、不影响几何的属性，不参与布局缓存键。style（invis、rounded
+# 等）与 penwidth（节点边框、正交走线的间距）会改变几何，不在其中
+RENDER_ONLY_ATTRS = (
+    "bgcolor", "class", "color", "colorscheme", "comment", "dpi", "fillcolor",
+    "fontcolor", "gradientangle", "href", "id", "labeltooltip", "pencolor",
+    "resolution", "target", "tooltip", "URL",
+)
+
+# 布局结果中需要回填的属性
+GRAPH_LAYOUT_ATTRS = ("bb", "lp", "lwidth", "lheight")
+NODE_LAYOUT_ATTRS = ("pos", "width", "height")
+EDGE_LAYOUT_ATTRS = ("pos", "lp", "xlp", "head_lp", "tail_lp")
+
+QUOTED = r'"(?:[^"\\]|\\.)*"'
+_RENDER_ONLY = re.compile(
+    rf'({QUOTED})|\s?\b(?:{"|".join(RENDER_ONLY_ATTRS)})=(?:{QUOTED}|[^\s\]]+)'
+)
+_ID = rf'({QUOTED}|[^\s\[\]"]+)'
+_NODE_LINE = re.compile(rf"^(\t+){_ID}(?: \[(.*)\])?$", re.S)
+_EDGE_LINE = re.compile(rf"^(\t+){_ID} -[>-] {_ID}(?: \[(.*)\])?$", re.S)
+_GRAPH_LINE = re.compile(r"^(\t+)graph \[(.*)\]$", re.S)
+_SUBGRAPH_LINE = re.compile(rf"^\t+subgraph {_ID} \{{$")
+
+EdgeKey = Tuple[str, str, int]
+
+
+def layout_dot(source: str) -> str:
+    """去掉纯渲染属性并规范化随机 ID，得到只反映几何的 DOT 文本。"""
+    return _RENDER_ONLY.sub(lambda m: m.group(1) or "", canonical_dot(source))
+
+
+class LayoutCache(DirectoryCache):
+    """布局缓存，条目内保存 Graphviz 的 json0 输出。"""
+
+    def __init__(self, root: Path = DEFAULT_LAYOUT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(root, max_bytes)
+
+    def key(self, source: str, engine: str = "dot") -> str:
+        h = hashlib.sha256()
+        for part in (layout_dot(source), engine, graphviz_version(engine)):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def fetch(self, key: str) -> Optional[dict]:
+        """返回缓存的 json0 布局；未命中时返回 None。"""
+        entry = self.lookup(key)
+        try:
+            layout = json.loads((entry / "json0").read_text(encoding="utf-8")) if entry else None
+        except (FileNotFoundError, ValueError):
+            layout = None
+        if layout is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return layout
+
+    def store(self, key: str, path: Path) -> None:
+        self.store_files(key, {"json0": Path(path)})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries()),
+            "bytes": self.size(),
+        }
+
+
+def unquote(name: str) -> str:
+    if name.startswith('"') and name.endswith('"'):
+        return name[1:-1].replace('\\"', '"')
+    return name
+
+
+def _format_attrs(values: Dict[str, object], names: Tuple[str, ...]) -> str:
+    return " ".join(f'{name}="{values[name]}"' for name in names if name in values)
+
+
+def _extend(prefix: str, head: str, attrs: Optional[str], extra: str) -> str:
+    if not extra:
+        return f"{prefix}{head}" + (f" [{attrs}]" if attrs is not None else "")
+    return f"{prefix}{head} [{attrs + ' ' if attrs else ''}{extra}]"
+
+
+def statements(source: str):
+    """按行切分 DOT，但把引号内含换行的标签拼回同一条语句。"""
+    buffer = []
+    for line in source.splitlines():
+        buffer.append(line)
+        text = "\n".join(buffer)
+        if len(re.findall(r'(?<!\\)"', text)) % 2 == 0:
+            yield text
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer)
+
+
+def apply_layout(source: str, layout: dict) -> Optional[str]:
+    """把 json0 布局中的坐标回填到 source，返回可用 `neato -n2` 渲染的 DOT。
+
+    source 须是 python-graphviz 生成的 DOT（每条语句一行）。图结构与布局
+    对不上时返回 None，调用方应退回完整布局。
+    """
+    objects = layout.get("objects", [])
+    names = {obj["_gvid"]: obj["name"] for obj in objects}
+    clusters = {obj["name"]: obj for obj in objects if {"nodes", "subgraphs", "bb"} & obj.keys()}
+    nodes = {obj["name"]: obj for obj in objects if obj["name"] not in clusters}
+    edges: Dict[EdgeKey, dict] = {}
+    seen: Counter = Counter()
+    for edge in layout.get("edges", []):
+        pair = (names.get(edge["tail"]), names.get(edge["head"]))
+        edges[(*pair, seen[pair])] = edge
+        seen[pair] += 1
+
+    lines = []
+    current = [layout]
+    pending_graph = True
+    used: Counter = Counter()
+    placed = set()
+    for line in statements(source):
+        match = _SUBGRAPH_LINE.match(line)
+        if match:
+            cluster = clusters.get(unquote(match.group(1)))
+            if cluster is None:
+                return None
+            current.append(cluster)
+            pending_graph = True
+            lines.append(line)
+            continue
+        if line.strip() == "}":
+            current.pop()
+            pending_graph = False
+            lines.append(line)
+            continue
+        match = _GRAPH_LINE.match(line)
+        if match and pending_graph:
+            extra = _format_attrs(current[-1], GRAPH_LAYOUT_ATTRS)
+            lines.append(_extend(match.group(1), "graph", match.group(2), extra))
+            pending_graph = False
+            continue
+        match = _EDGE_LINE.match(line)
+        if match:
+            pair = (unquote(match.group(2)), unquote(match.group(3)))
+            edge = edges.get((*pair, used[pair]))
+            used[pair] += 1
+            if edge is None:
+                return None
+            head = line[len(match.group(1)):].split(" [", 1)[0]
+            lines.append(_extend(match.group(1), head, match.group(4), _format_attrs(edge, EDGE_LAYOUT_ATTRS)))
+            continue
+        match = _NODE_LINE.match(line)
+        if match and match.group(2) not in ("graph", "node", "edge"):
+            node = nodes.get(unquote(match.group(2)))
+            if node is None:
+                return None
+            placed.add(node["name"])
+            lines.append(_extend(match.group(1), match.group(2), match.group(3), _format_attrs(node, NODE_LAYOUT_ATTRS)))
+            continue
+        lines.append(line)
+    if sum(used.values()) != len(edges) or len(placed) != len(nodes):
+        return None
+    return "\n".join(lines) + "\n"
+
+
+_active: Optional[LayoutCache] = None
+
+
+def activate(cache: Optional[LayoutCache]) -> None:
+    """设置当前进程渲染时使用的布局缓存；传入 None 关闭。"""
+    global _active
+    _active = cache
+
+
+def active() -> Optional[LayoutCache]:
+    return _active
@@ -0,0 +1,137 @@
+"""延迟加载 `diagrams` 的 provider 模块。
+
+技术栈脚本开头往往有十几行 `from diagrams.aws.analytics import Kinesis, Glue`
+之类的导入，而图中大部分节点只是 `Server`。安装本模块的 finder 后，
+`diagrams.<provider>.<module>` 在导入时只得到一个轻量的替身模块：
+`from ... import X` 拿到的是 `diagrams.Node` 的一个替身子类，直到第一次
+实例化 X、读取它的类属性（`_icon`、`_provider` 等）或用它做
+isinstance/issubclass 判断时才真正导入对应的 provider 模块，之后这些操作
+都转给真实的类。导入不存在的名字仍会立即报 ImportError（通过扫描模块
+源码判断）。
+"""
+
+import importlib
+import importlib.machinery
+import re
+import sys
+import types
+
+_DEFINITION = re.compile(r"^(?:class (\w+)\b|(\w+) = )", re.M)
+
+_resolving = set()
+
+
+class _LazyClass(type):
+    """provider 节点类替身的元类：除自身的簿记属性外，一切都转给真实的类。
+
+    替身是 `diagrams.Node` 的子类，issubclass(X, Node) 不必导入真实模块。
+    """
+
+    _own = ("_lazy_module", "__name__", "__qualname__", "__module__", "__class__", "__dict__", "__mro__")
+
+    def resolve(cls) -> type:
+        module = type.__getattribute__(cls, "_lazy_module")
+        return getattr(module._load(), type.__getattribute__(cls, "__name__"))
+
+    def __getattribute__(cls, attr: str):
+        if attr in _LazyClass._own or attr == "resolve":
+            return type.__getattribute__(cls, attr)
+        return getattr(_LazyClass.resolve(cls), attr)
+
+    def __call__(cls, *args, **kwargs):
+        return _LazyClass.resolve(cls)(*args, **kwargs)
+
+    def __instancecheck__(cls, obj) -> bool:
+        return isinstance(obj, _LazyClass.resolve(cls))
+
+    def __subclasscheck__(cls, sub) -> bool:
+        return sub is cls or issubclass(sub, _LazyClass.resolve(cls))
+
+    def __repr__(cls) -> str:
+        return f"<lazy class '{cls.__module__}.{cls.__name__}'>"
+
+
+def _lazy_class(module: "LazyProviderModule", name: str) -> type:
+    from diagrams import Node
+
+    return _LazyClass(name, (Node,), {"_lazy_module": module, "__module__": module.__name__, "__qualname__": name})
+
+
+class LazyProviderModule(types.ModuleType):
+    """provider 模块的替身，属性访问返回节点类的替身。"""
+
+    def __init__(self, name: str, origin: str, names: set):
+        super().__init__(name)
+        self.__file__ = origin
+        self._names = names
+        self._real = None
+        self._proxies = {}
+
+    def _load(self) -> types.ModuleType:
+        if self._real is None:
+            name = self.__name__
+            _resolving.add(name)
+            try:
+                sys.modules.pop(name, None)
+                self._real = importlib.import_module(name)
+            finally:
+                _resolving.discard(name)
+        return self._real
+
+    def __getattr__(self, attr: str):
+        if self._real is not None:
+            return getattr(self._real, attr)
+        if attr.startswith("__"):
+            # 导入系统初始化模块时会探测 __path__ 等属性，不能因此触发真实导入
+            raise AttributeError(attr)
+        if attr not in self._names:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {attr!r}")
+        proxy = self._proxies.get(attr)
+        if proxy is None:
+            proxy = self._proxies[attr] = _lazy_class(self, attr)
+        return proxy
+
+
+class _ShimLoader:
+    def __init__(self, origin: str):
+        self.origin = origin
+
+    def create_module(self, spec: importlib.machinery.ModuleSpec) -> types.ModuleType:
+        with open(self.origin, encoding="utf-8") as f:
+            names = {a or b for a, b in _DEFINITION.findall(f.read())}
+        return LazyProviderModule(spec.name, self.origin, names)
+
+    def exec_module(self, module: types.ModuleType) -> None:
+        pass
+
+
+class LazyProviderFinder:
+    """为 `diagrams.<provider>.<module>` 返回延迟加载的替身模块。
+
+    本模块刻意只依赖启动时已加载的标准库（不用 `importlib.abc`、`typing`
+    等），否则自身的导入开销会抵消节省下来的启动时间。
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        parts = fullname.split(".")
+        if len(parts) != 3 or parts[0] != "diagrams" or fullname in _resolving:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+            return None
+        return importlib.machinery.ModuleSpec(fullname, _ShimLoader(spec.origin), origin=spec.origin)
+
+
+_finder = LazyProviderFinder()
+
+
+def install() -> None:
+    """安装延迟加载 finder；已导入的 provider 模块不受影响。"""
+    if _finder not in sys.meta_path:
+        sys.meta_path.insert(0, _finder)
+
+
+def uninstall() -> None:
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+
@@ -0,0 +1,380 @@
+"""布局前对 DOT 源码的改写。
+
+有些图的结构对 Graphviz 并不友好，例如链路之外再画一条捷径的连线，
+不增加信息，却同样参与分层与交叉最小化。是否更快、画面是否更好因图
+而异，用 `python3 -m diagramkit passes` 实测后再按图开启。这里的改写
+在渲染前作用于 DOT 源码，与布局缓存回填坐标一样逐条语句处理，因此
+经 `diagrams` 对象与由中间表示直接编译的两条路径都适用；改写后的 DOT
+参与渲染缓存与布局缓存的键。
+
+改写默认关闭，按图表在 `@diagram(..., passes=("reduce",))` 中开启，或在
+命令行用 `--pass` 对选中的图表统一开启。每个改写返回新的 DOT 与一组
+说明，构建时随结果输出：
+
+- reduce：传递约简，删除可由其他路径推出的连线。
+- reduce-soft：同样找出这些连线，但保留它们，加 constraint=false 不参与
+  分层并画成虚线，标签仍然可见。
+- feedback：找出成环的强连通分量，给其中的反馈连线（优先选标签写明
+  “反馈”的）加 constraint=false。dot 不必再自己拆环，这些连线照常画出，
+  作为回头的走线。
+- bundle：同一个起点（或终点）上标签相同的连线合成一条带标签的主干，
+  在分支点处分叉。标签只布置一次，要走线的长连线也少了。
+
+dot 把每个连线标签当作一个虚拟节点参与分层与交叉最小化，几乎每条
+连线都有标签的图实际要排的节点数接近翻倍。下面三种轻标签模式把标签
+移出布局：
+
+- xlabel：标签改为 xlabel，在布局完成后再摆放，也是 Graphviz 对
+  splines=ortho 推荐的写法。
+- tooltip：标签只作为 SVG 中的悬停提示，PNG/PDF 中不再显示。
+- legend：连线上只标编号，编号对应的标签列在图标题下方的图例中；
+  SVG 中悬停仍能看到原标签。
+"""
+
+import contextlib
+import hashlib
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from diagramkit import compiler, topology
+from diagramkit.layout import QUOTED, statements, unquote
+
+Pass = Callable[[str], Tuple[str, List[str]]]
+
+PASSES: Dict[str, Pass] = {}
+
+# 报告中逐条列出的连线数上限
+MAX_LISTED = 20
+
+# 标签含这些词的连线在拆环时优先视为反馈连线
+FEEDBACK_WORDS = ("反馈", "回流", "回写", "feedback")
+
+# 同一起点（或终点）上至少有这么多条同标签连线才合成主干
+MIN_BUNDLE = 3
+
+_ID = rf"({QUOTED}|[^\s\[\]\"]+)"
+# `diagrams` 把连线都加在图的顶层正文，只有一级缩进
+_EDGE_LINE = re.compile(rf"^\t{_ID} -> {_ID}(?: \[(.*)\])?$", re.S)
+_NODE_LINE = re.compile(rf"^\t+{_ID}(?: \[(.*)\])?$", re.S)
+_GRAPH_LINE = re.compile(r"^\tgraph \[(.*)\]$", re.S)
+_ATTR = re.compile(rf"(\w+)=({QUOTED}|[^\s\]]+)")
+
+
+def register(name: str) -> Callable[[Pass], Pass]:
+    """登记一个改写：接收 DOT 源码，返回 (新的源码, 说明)。"""
+
+    def decorate(func: Pass) -> Pass:
+        PASSES[name] = func
+        return func
+
+    return decorate
+
+
+def attrs(text: Optional[str]) -> Dict[str, str]:
+    """解析 `[...]` 中的属性，取值去掉引号。"""
+    return {m[1]: unquote(m[2]) for m in _ATTR.finditer(text or "")}
+
+
+def edges(lines: Sequence[str]) -> List[Tuple[int, str, str, Dict[str, str]]]:
+    """顶层正文中的连线：(语句下标, 起点, 终点, 属性)。"""
+    result = []
+    for i, line in enumerate(lines):
+        match = _EDGE_LINE.match(line)
+        if match:
+            result.append((i, unquote(match[1]), unquote(match[2]), attrs(match[3])))
+    return result
+
+
+def labels(lines: Sequence[str]) -> Dict[str, str]:
+    """节点 ID 到标签（多行标签取首行）的映射，用于报告。"""
+    result = {}
+    for line in lines:
+        match = _NODE_LINE.match(line)
+        if match and match[1] not in ("graph", "node", "edge", "}"):
+            label = attrs(match[2]).get("label") or unquote(match[1])
+            result[unquote(match[1])] = label.splitlines()[0] if label else label
+    return result
+
+
+def with_attrs(line: str, extra: Dict[str, str]) -> str:
+    """在一条语句的属性列表末尾追加属性。"""
+    items = " ".join(f'{key}="{value}"' for key, value in extra.items())
+    if line.endswith("]"):
+        return f"{line[:-1]} {items}]"
+    return f"{line} [{items}]"
+
+
+def _flow(tail: str, head: str, edge_attrs: Dict[str, str]) -> Optional[Tuple[str, str]]:
+    # 按箭头方向取连线的语义方向；无向与双向连线不参与约简
+    direction = edge_attrs.get("dir", "forward")
+    if tail == head or direction not in ("forward", "back"):
+        return None
+    return (tail, head) if direction == "forward" else (head, tail)
+
+
+def _reduce(source: str, soft: bool) -> Tuple[str, List[str]]:
+    lines = list(statements(source))
+    candidates = []
+    for i, tail, head, edge_attrs in edges(lines):
+        pair = _flow(tail, head, edge_attrs)
+        if pair is not None:
+            candidates.append((i, pair, edge_attrs.get("label", "")))
+    pairs = [pair for _, pair, _ in candidates]
+    found = topology.redundant(pairs)
+    if not found:
+        return source, []
+    names = labels(lines)
+    action = "改为虚线且不参与分层" if soft else "删除"
+    notes = [f"{action} {len(found)}/{len(candidates)} 条可由其他路径推出的连线"]
+    for k in found:
+        i, (tail, head), label = candidates[k]
+        if len(notes) <= MAX_LISTED:
+            path = topology.witness(pairs, k) or [tail, head]
+            text = f"「{label}」" if label else ""
+            notes.append(f"{names.get(tail, tail)} -> {names.get(head, head)}{text}，经 {' -> '.join(names.get(n, n) for n in path)}")
+        if soft:
+            extra = {"constraint": "false"}
+            if "style" not in attrs(_EDGE_LINE.match(lines[i])[3]):
+                extra["style"] = "dashed"
+            lines[i] = with_attrs(lines[i], extra)
+        else:
+            lines[i] = None
+    if len(found) > MAX_LISTED:
+        notes.append(f"……另有 {len(found) - MAX_LISTED} 条")
+    return "\n".join(line for line in lines if line is not None) + "\n", notes
+
+
+@register("reduce")
+def reduce(source: str) -> Tuple[str, List[str]]:
+    """删除可由其他路径推出的连线。"""
+    return _reduce(source, soft=False)
+
+
+@register("reduce-soft")
+def reduce_soft(source: str) -> Tuple[str, List[str]]:
+    """可由其他路径推出的连线不参与分层并画成虚线。"""
+    return _reduce(source, soft=True)
+
+
+def _constrained(edge_attrs: Dict[str, str]) -> bool:
+    return edge_attrs.get("constraint", "true").lower() not in ("false", "no", "0")
+
+
+@register("feedback")
+def feedback(source: str) -> Tuple[str, List[str]]:
+    """环上的反馈连线不参与分层。"""
+    lines = list(statements(source))
+    # 分层只看起点与终点，与箭头方向无关；已不参与分层的连线不计入
+    candidates = [(i, (tail, head), a.get("label", "")) for i, tail, head, a in edges(lines) if _constrained(a)]
+    pairs = [pair for _, pair, _ in candidates]
+    preferred = [k for k, (_, _, label) in enumerate(candidates) if any(w in label.lower() for w in FEEDBACK_WORDS)]
+    found = topology.feedback(pairs, preferred)
+    if not found:
+        return source, []
+    names = labels(lines)
+    chosen = set(found)
+    before = topology.ranks(pairs, list(names))
+    after = topology.ranks([pair for k, pair in enumerate(pairs) if k not in chosen], list(names))
+    cycles = sum(len(c) > 1 for c in topology.strongly_connected(topology.successors(pairs)))
+    notes = [f"{len(found)} 条反馈连线不参与分层（{cycles} 个成环的分量），估计层数 {before} -> {after}"]
+    for k in found:
+        i, (tail, head), label = candidates[k]
+        if len(notes) <= MAX_LISTED:
+            text = f"「{label}」" if label else ""
+            notes.append(f"{names.get(tail, tail)} -> {names.get(head, head)}{text}")
+        lines[i] = with_attrs(lines[i], {"constraint": "false"})
+    if len(found) > MAX_LISTED:
+        notes.append(f"……另有 {len(found) - MAX_LISTED} 条")
+    return "\n".join(lines) + "\n", notes
+
+
+def graph_attrs(lines: Sequence[str]) -> Optional[Tuple[int, Dict[str, str]]]:
+    """顶层 graph 属性语句的下标与属性；没有时返回 None。"""
+    for i, line in enumerate(lines):
+        match = _GRAPH_LINE.match(line)
+        if match:
+            return i, attrs(match[1])
+    return None
+
+
+def graph_line(items: Dict[str, str]) -> str:
+    """顶层 graph 属性语句。"""
+    return f"\tgraph [{_format(items)}]"
+
+
+def _format(items: Dict[str, str]) -> str:
+    # 标签在前，其余属性保持原来的次序，与 compiler 生成的语句格式相同
+    ordered = [("label", items["label"])] if "label" in items else []
+    ordered += [(key, value) for key, value in items.items() if key != "label"]
+    return " ".join(f"{key}={compiler.quote(value)}" for key, value in ordered)
+
+
+def _edge(tail: str, head: str, edge_attrs: Dict[str, str]) -> str:
+    return f"\t{compiler.quote(tail)} -> {compiler.quote(head)} [{_format(edge_attrs)}]"
+
+
+def _junction(nodeid: str, color: str) -> str:
+    point = {"label": "", "shape": "point", "style": "filled", "width": "0.06", "height": "0.06", "color": color}
+    return f"\t{compiler.quote(nodeid)} [{_format(point)}]"
+
+
+@register("bundle")
+def bundle(source: str) -> Tuple[str, List[str]]:
+    """同一枢纽上标签相同的连线经一个分支点合成一条主干。"""
+    lines = list(statements(source))
+    # 只合并正向、带标签的连线；属性必须完全相同，合并后外观才不变
+    candidates = [
+        (i, tail, head, a) for i, tail, head, a in edges(lines)
+        if a.get("label") and a.get("dir", "forward") == "forward" and tail != head
+    ]
+    pairs = [(tail, head) for _, tail, head, _ in candidates]
+    used = set()
+    groups = []
+    for kind in ("out", "in"):
+        found: Dict[tuple, Dict[str, int]] = {}
+        for k, (_, tail, head, a) in enumerate(candidates):
+            if k in used:
+                continue
+            hub, other = (tail, head) if kind == "out" else (head, tail)
+            # 平行的重复连线只取第一条
+            found.setdefault((hub, tuple(sorted(a.items()))), {}).setdefault(other, k)
+        for (hub, _), members in found.items():
+            if len(members) >= MIN_BUNDLE:
+                groups.append((kind, hub, sorted(members.values())))
+                used.update(members.values())
+    if not groups:
+        return source, []
+    names = labels(lines)
+    bundled = [pair for k, pair in enumerate(pairs) if k not in used]
+    notes = []
+    for kind, hub, members in sorted(groups, key=lambda g: candidates[g[2][0]][0]):
+        first = candidates[members[0]]
+        edge_attrs = first[3]
+        label = edge_attrs["label"]
+        # 分组按全部属性，分支点的 id 也要包括它们，否则同一枢纽上标签相同、
+        # 颜色或样式不同的两组会得到同一个分支点
+        key = "\0".join([kind, hub, *(f"{k}={v}" for k, v in sorted(edge_attrs.items()))])
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        junction = f"junction_{digest}"
+        branch = {key: value for key, value in edge_attrs.items() if key != "label"}
+        if kind == "out":
+            trunk = [_edge(hub, junction, {**edge_attrs, "dir": "none"})]
+            branches = [_edge(junction, candidates[k][2], branch) for k in members]
+            bundled += [(hub, junction)] + [(junction, candidates[k][2]) for k in members]
+        else:
+            branches = [_edge(candidates[k][1], junction, {**branch, "dir": "none"}) for k in members]
+            trunk = [_edge(junction, hub, edge_attrs)]
+            bundled += [(candidates[k][1], junction) for k in members] + [(junction, hub)]
+        color = edge_attrs.get("color", compiler.DIAGRAM_EDGE_ATTRS["color"])
+        lines[first[0]] = "\n".join([_junction(junction, color), *(trunk + branches if kind == "out" else branches + trunk)])
+        for k in members[1:]:
+            lines[candidates[k][0]] = None
+        if len(notes) < MAX_LISTED:
+            others = "、".join(names.get(pairs[k][kind == "out"], pairs[k][kind == "out"]) for k in members)
+            arrow = f"{names.get(hub, hub)} -> {others}" if kind == "out" else f"{others} -> {names.get(hub, hub)}"
+            notes.append(f"「{label}」{arrow}")
+    merged = sum(len(members) for _, _, members in groups)
+    order = list(names)
+    before = topology.ranks(pairs, order)
+    after = topology.ranks(bundled, order)
+    notes.insert(0, (
+        f"{len(groups)} 组共 {merged} 条同标签连线合成主干：带标签的连线 {merged} -> {len(groups)}，"
+        f"连线 {merged} -> {merged + len(groups)}（新增 {len(groups)} 个分支点），估计层数 {before} -> {after}"
+    ))
+    if len(groups) > MAX_LISTED:
+        notes.append(f"……另有 {len(groups) - MAX_LISTED} 组")
+    return "\n".join(line for line in lines if line is not None) + "\n", notes
+
+
+def _relabel(source: str, move: Callable[[int, str], Dict[str, str]], where: str) -> Tuple[List[str], List[str], List[str]]:
+    # 把每条带标签连线的 label 换成 move(编号, 标签) 给出的属性；编号按标签首次出现的次序
+    lines = list(statements(source))
+    numbers: Dict[str, int] = {}
+    count = 0
+    for i, tail, head, edge_attrs in edges(lines):
+        label = edge_attrs.pop("label", "")
+        if not label:
+            continue
+        number = numbers.setdefault(label, len(numbers) + 1)
+        lines[i] = _edge(tail, head, {**edge_attrs, **move(number, label)})
+        count += 1
+    notes = [f"{count} 条连线的标签（{len(numbers)} 种）{where}，不再作为虚拟节点参与分层"] if count else []
+    return lines, list(numbers), notes
+
+
+@register("xlabel")
+def xlabel(source: str) -> Tuple[str, List[str]]:
+    """连线标签改为布局后摆放的 xlabel。"""
+    lines, _, notes = _relabel(source, lambda number, label: {"xlabel": label}, "改为 xlabel")
+    return "\n".join(lines) + "\n", notes
+
+
+@register("tooltip")
+def tooltip(source: str) -> Tuple[str, List[str]]:
+    """连线标签只作为 SVG 中的悬停提示。"""
+    lines, _, notes = _relabel(source, lambda number, label: {"tooltip": label}, "只作为悬停提示（只在 SVG 中可见）")
+    return "\n".join(lines) + "\n", notes
+
+
+@register("legend")
+def legend(source: str) -> Tuple[str, List[str]]:
+    """连线上只标编号，标签列在图标题下方的图例中。"""
+    move = lambda number, label: {"xlabel": str(number), "tooltip": label}
+    lines, texts, notes = _relabel(source, move, "改为编号，原文列入图例")
+    if not texts:
+        return source, []
+    found = graph_attrs(lines)
+    if found is not None:
+        i, items = found
+        # \l 使图例各行左对齐；多行标签在图例中合成一行
+        entries = "".join(f"{n}. {' '.join(text.split())}\\l" for n, text in enumerate(texts, 1))
+        title = items.get("label", "")
+        items["label"] = f"{title}\n\n{entries}" if title else entries
+        lines[i] = graph_line(items)
+    return "\n".join(lines) + "\n", notes
+
+
+def check(names: Sequence[str]) -> None:
+    unknown = [name for name in names if name not in PASSES]
+    if unknown:
+        raise ValueError(f"未知的改写：{'、'.join(unknown)}（可用：{'、'.join(PASSES)}）")
+
+
+def run(source: str, names: Sequence[str]) -> Tuple[str, List[str]]:
+    """依次应用 names 中的改写，返回新的源码与带改写名前缀的说明。"""
+    check(names)
+    notes = []
+    for name in names:
+        source, messages = PASSES[name](source)
+        notes += [f"{name}: {message}" for message in messages]
+    return source, notes
+
+
+_active: Tuple[str, ...] = ()
+_notes: List[str] = []
+
+
+@contextlib.contextmanager
+def enabled(names: Sequence[str]) -> Iterator[List[str]]:
+    """在 with 块内渲染的图上应用 names 中的改写，返回收集说明的列表。"""
+    global _active, _notes
+    check(names)
+    saved = _active, _notes
+    _active, _notes = tuple(dict.fromkeys(names)), []
+    try:
+        yield _notes
+    finally:
+        _active, _notes = saved
+
+
+def active() -> Tuple[str, ...]:
+    return _active
+
+
+def apply(source: str) -> str:
+    """对 source 应用当前启用的改写，说明记入 `enabled` 返回的列表。"""
+    if not _active:
+        return source
+    source, notes = run(source, _active)
+    _notes.extend(notes)
+    return source
@@ -0,0 +1,168 @@
+"""图表注册表。
+
+每个 `create_*` 函数用 `@diagram(...)` 声明自己的分类、输出文件名和标签，
+导入脚本时即完成注册，不会渲染任何东西。构建、清理、列表和并行渲染
+都从注册表取得图表，在同一个解释器里完成，而不是为每张图各启动一个
+Python 进程并各自重新导入 `diagrams`。
+"""
+
+import importlib.util
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from diagramkit import trace
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CATEGORIES = (
+    "system-designs",
+    "company-tech-stacks",
+    "commercial-algorithms",
+    "financial-quantitative-algorithms",
+)
+
+# 多张图共用的子图片段（见 `diagramkit.fragments`）
+FRAGMENT_DIR = ROOT / "fragments"
+
+
+@dataclass(frozen=True)
+class Target:
+    """一张已注册的图表。"""
+
+    category: str
+    script: str
+    func: str
+    filename: str
+    tags: Tuple[str, ...] = ()
+    # 渲染前对 DOT 的改写，见 `diagramkit.passes`
+    passes: Tuple[str, ...] = ()
+    # 布局方式 "引擎[:splines]"，为空时按脚本默认，见 `diagramkit.engines`
+    engine: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"{self.category}/{self.filename}"
+
+    @property
+    def path(self) -> Path:
+        return ROOT / self.category / self.script
+
+    @property
+    def output(self) -> Path:
+        return ROOT / self.category / self.filename
+
+
+_targets: Dict[str, Target] = {}
+_functions: Dict[str, Callable[..., None]] = {}
+
+
+def diagram(
+    category: str, filename: str, tags: Sequence[str] = (), passes: Sequence[str] = (), engine: str = ""
+) -> Callable:
+    """注册一个 `create_*(filename, outformat)` 函数。
+
+    :param category: 所属分类目录，例如 "company-tech-stacks"。
+    :param filename: 输出文件名（不含扩展名）。
+    :param tags: 标签，可用于按名称或分组选择图表（对应原 Makefile 目标名）。
+    :param passes: 构建时在布局前应用的改写，例如 ("reduce",)。
+    :param engine: 布局方式，例如 "dot:spline"；通常由 `engines --record` 写入。
+    """
+    if category not in CATEGORIES:
+        raise ValueError(f'"{category}" is not a valid category')
+
+    def register(func: Callable[..., None]) -> Callable[..., None]:
+        script = Path(func.__code__.co_filename).name
+        target = Target(category, script, func.__name__, filename, tuple(tags), tuple(passes), engine)
+        _targets[target.name] = target
+        _functions[target.name] = func
+        return func
+
+    return register
+
+
+def _module_name(category: str, path: Path) -> str:
+    return "diagramkit_target_" + f"{category}_{path.stem}".replace("-", "_")
+
+
+def load_script(path: Path, category: str) -> None:
+    """导入一个图表脚本以完成注册；已导入过的脚本不会重复导入。"""
+    name = _module_name(category, path)
+    if name in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    before = len(_targets)
+    try:
+        with trace.span("import", diagram=f"{category}/{path.name}") as span:
+            spec.loader.exec_module(module)
+            if span is not None and len(_targets) > before:
+                # 计时归到脚本注册的第一张图上，便于与后续阶段对照
+                span.diagram = list(_targets.values())[before].name
+    except BaseException:
+        del sys.modules[name]
+        raise
+
+
+def script_targets(path: Path, category: str) -> List[Target]:
+    """返回脚本当前注册的图表。"""
+    return [t for t in _targets.values() if t.category == category and t.script == path.name]
+
+
+def reload_script(path: Path, category: str) -> List[Target]:
+    """重新导入一个已修改的脚本，返回它注册的图表。
+
+    导入失败时保留脚本原先的注册并抛出异常。
+    """
+    name = _module_name(category, path)
+    old = {t.name: (t, _functions[t.name]) for t in script_targets(path, category)}
+    for key in old:
+        del _targets[key]
+        del _functions[key]
+    sys.modules.pop(name, None)
+    try:
+        load_script(path, category)
+    except BaseException:
+        for target in script_targets(path, category):
+            del _targets[target.name]
+            del _functions[target.name]
+        for key, (target, func) in old.items():
+            _targets[key] = target
+            _functions[key] = func
+        raise
+    return script_targets(path, category)
+
+
+def load_category(category: str) -> List[Target]:
+    """导入分类目录下的全部脚本，返回该分类已注册的图表。"""
+    for path in sorted((ROOT / category).glob("*.py")):
+        load_script(path, category)
+    return [t for t in _targets.values() if t.category == category]
+
+
+def discover(categories: Iterable[str] = CATEGORIES) -> List[Target]:
+    """导入给定分类，返回其中所有图表（按分类、脚本名排序）。"""
+    targets = []
+    for category in categories:
+        targets.extend(sorted(load_category(category), key=lambda t: (t.script, t.filename)))
+    return targets
+
+
+def select(targets: Sequence[Target], patterns: Sequence[str]) -> List[Target]:
+    """按分类名、脚本名、输出文件名或标签筛选；patterns 为空时返回全部。"""
+    if not patterns:
+        return list(targets)
+    wanted = set(patterns)
+    return [
+        t for t in targets
+        if wanted & {t.category, t.script, t.path.stem, t.filename, t.name, *t.tags}
+    ]
+
+
+def function(target: Target) -> Callable[..., None]:
+    """返回 target 对应的 `create_*` 函数，必要时先导入其脚本。"""
+    if target.name not in _functions:
+        load_script(target.path, target.category)
+    return _functions[target.name]
@@ -0,0 +1,442 @@
+"""单次布局、多格式输出的渲染。
+
+`diagrams.Diagram` 在 `outformat` 为列表时会对每种格式各调用一次 Graphviz，
+同一张图因此要重复布局。这里改为把所有格式交给同一个 `dot` 进程：
+Graphviz 只做一次布局，再由同一份带坐标的图依次输出各格式。启用布局
+缓存时，命中的图直接按缓存坐标输出，完全跳过布局。
+
+DOT 源码通过 stdin 交给 Graphviz，不再像 `diagrams` 那样先写到输出文件
+旁边再删除；输出先写到同目录的临时文件再改名，并发渲染同一目录时不会
+互相覆盖出半个文件。
+
+内存渲染模式（以及计时、协进程池，见 `diagramkit.trace` 与
+`diagramkit.coprocess`）下，布局与各格式的输出拆成独立的 Graphviz 调用：
+先用 `-Tjson0` 只做布局，再按坐标用 `neato -n2` 逐格式输出，结果以字节
+读回内存，最后原子地写入输出文件。
+"""
+
+import contextlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import diagrams
+import graphviz
+from diagrams import setdiagram
+
+from diagramkit import cache as artifact_cache
+from diagramkit import budget, compiler, coprocess, engines, ids, lazy, passes, split, trace
+from diagramkit import layout as layout_cache
+from diagramkit.graph import Graph
+
+_original_render = diagrams.Diagram.render
+_original_enter = diagrams.Diagram.__enter__
+_original_exit = diagrams.Diagram.__exit__
+
+# install(in_memory=True) 时所有输出都在内存中生成
+_memory = False
+
+# 渲染时临时覆盖的图属性，见 graph_overrides()
+_overrides: Dict[str, str] = {}
+
+
+def run_graphviz(cmd: Sequence[str], source: str, timeout: Optional[float] = None) -> bytes:
+    """运行一次性的 Graphviz 进程，DOT 源码从 stdin 传入，返回 stdout 的内容。
+
+    子进程的 rusage 会记到当前的计时 span 上；退出码非零时抛出
+    `subprocess.CalledProcessError`，超过 timeout 秒时结束进程并抛出
+    `subprocess.TimeoutExpired`。
+    """
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr, env=coprocess.graphviz_env()
+        )
+        # 超时由定时器结束进程，读写管道随之返回；仍用 wait4 回收以取得 rusage
+        timer = threading.Timer(timeout, proc.kill) if timeout is not None else None
+        if timer is not None:
+            timer.start()
+        try:
+            proc.stdin.write(source.encode("utf-8"))
+        except BrokenPipeError:
+            pass
+        proc.stdin.close()
+        stdout = proc.stdout.read()
+        proc.stdout.close()
+        # 用 wait4 取得这个子进程自己的 CPU 时间与峰值 RSS
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        expired = timer is not None and not timer.is_alive()
+        if timer is not None:
+            timer.cancel()
+        tracer = trace.active()
+        if tracer is not None:
+            tracer.attach_child(usage)
+        if expired and proc.returncode:
+            raise subprocess.TimeoutExpired(cmd, timeout, output=stdout)
+        if proc.returncode:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout, stderr=stderr.read())
+    return stdout
+
+
+def graphviz_output(cmd: Sequence[str], source: str) -> bytes:
+    """执行 cmd 并返回其 stdout；启用协进程池且输出格式逐图写出时优先交给常驻进程。"""
+    pool = coprocess.active()
+    if pool is not None and coprocess.streaming(cmd):
+        try:
+            return pool.run(cmd, source)
+        except coprocess.CoprocessError:
+            # 退回一次性进程，出错时能得到正常的退出码与错误信息
+            pass
+    return run_graphviz(cmd, source)
+
+
+def _in_memory() -> bool:
+    # 计时与协进程都需要把布局和各格式的输出拆开，走内存渲染路径
+    return _memory or trace.active() is not None or coprocess.active() is not None
+
+
+def render_formats(
+    source: str,
+    filename: str,
+    formats: Sequence[str],
+    engine: str = "dot",
+    args: Sequence[str] = (),
+    extra_outputs: Sequence[Tuple[str, str]] = (),
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """对 DOT 源码布局一次，并输出 `filename.<fmt>` 形式的各格式文件。
+
+    :param source: DOT 源码。
+    :param filename: 输出文件名，不含扩展名。
+    :param formats: 输出格式列表，例如 ["png", "pdf"]。
+    :param engine: Graphviz 布局引擎。
+    :param args: 额外的 Graphviz 命令行参数。
+    :param extra_outputs: 额外输出的 (格式, 路径)，与各格式共用同一次布局。
+    :param timeout: 超过这么多秒时结束 Graphviz，抛出 `subprocess.TimeoutExpired`。
+    :return: 生成的文件路径列表，顺序与 formats 一致（不含 extra_outputs）。
+    """
+    cmd = [engine, *args]
+    outputs = []
+    pending = []
+    for fmt in formats:
+        path = f"{filename}.{fmt}"
+        # 先写到同目录的临时文件，全部成功后再改名，读者不会看到写了一半的文件
+        tmp = artifact_cache.temp_path(Path(path))
+        # 每个 -o 对应其前一个 -T，布局只在读入图之后进行一次
+        cmd += [f"-T{fmt}", f"-o{tmp}"]
+        outputs.append(path)
+        pending.append((tmp, path))
+    for fmt, path in extra_outputs:
+        cmd += [f"-T{fmt}", f"-o{path}"]
+    try:
+        run_graphviz(cmd, source, timeout=timeout)
+        for tmp, path in pending:
+            os.replace(tmp, path)
+    finally:
+        for tmp, _ in pending:
+            tmp.unlink(missing_ok=True)
+    return outputs
+
+
+def _render_placed(placed: str, formats: Sequence[str]) -> Dict[str, bytes]:
+    # -n2：节点坐标以点为单位直接取自 pos，已有样条的边不再重新布线
+    data = {}
+    for fmt in formats:
+        with trace.span(f"render:{fmt}"):
+            data[fmt] = graphviz_output(["neato", "-n2", f"-T{fmt}"], placed)
+    return data
+
+
+def _layout(
+    source: str, engine: str, layouts: Optional[layout_cache.LayoutCache], key: Optional[str]
+) -> Optional[dict]:
+    with trace.span("layout"):
+        data = graphviz_output([engine, "-Tjson0"], source)
+    if layouts is not None:
+        _store_layout(layouts, key, data)
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _store_layout(layouts: layout_cache.LayoutCache, key: str, data: bytes) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "layout.json"
+        json_path.write_bytes(data)
+        layouts.store(key, json_path)
+
+
+def render_bytes(source: str, formats: Sequence[str], engine: str = "dot") -> Dict[str, bytes]:
+    """在内存中渲染 formats，返回 {格式: 内容}；DOT 与输出都不经过文件。
+
+    布局只做一次（`-Tjson0`），各格式按回填的坐标输出；启用布局缓存时
+    复用缓存中的布局。布局无法回填时退回为每种格式各做一次完整渲染。
+    """
+    layouts = layout_cache.active()
+    key = layouts.key(source, engine) if layouts else None
+    positioned = layouts.fetch(key) if layouts else None
+    if positioned is None:
+        positioned = _layout(source, engine, layouts, key)
+    placed = layout_cache.apply_layout(source, positioned) if positioned is not None else None
+    if placed is not None:
+        try:
+            return _render_placed(placed, formats)
+        except subprocess.CalledProcessError:
+            pass
+    data = {}
+    for fmt in formats:
+        with trace.span(f"render:{fmt}"):
+            data[fmt] = graphviz_output([engine, f"-T{fmt}"], source)
+    return data
+
+
+def render_with_layout_cache(source: str, filename: str, formats: Sequence[str], engine: str = "dot") -> List[str]:
+    """渲染 formats 到 `filename.<fmt>`；启用布局缓存时复用或写入缓存中的布局。"""
+    if _in_memory():
+        outputs = []
+        for fmt, data in render_bytes(source, formats, engine).items():
+            path = f"{filename}.{fmt}"
+            artifact_cache.write_atomic(Path(path), data)
+            outputs.append(path)
+        return outputs
+    layouts = layout_cache.active()
+    if layouts is None:
+        return render_formats(source, filename, formats, engine=engine)
+    key = layouts.key(source, engine)
+    positioned = layouts.fetch(key)
+    placed = layout_cache.apply_layout(source, positioned) if positioned is not None else None
+    if placed is not None:
+        try:
+            return render_formats(placed, filename, formats, engine="neato", args=["-n2"])
+        except subprocess.CalledProcessError:
+            pass
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "layout.json"
+        outputs = render_formats(source, filename, formats, engine=engine, extra_outputs=[("json0", str(json_path))])
+        layouts.store(key, json_path)
+    return outputs
+
+
+def _fit(source: str, engine: str) -> Tuple[str, Optional[bytes], int]:
+    """在时间预算内布局，超时后按 `budget.STEPS` 逐级降级重试。
+
+    返回 (实际使用的 DOT, json0 布局, 降级级数)；所有级别都超时时抛出
+    `budget.LayoutBudgetExceeded`。
+    """
+    seconds = budget.active()
+    start = time.perf_counter()
+    for level in range(len(budget.STEPS) + 1):
+        attempt = budget.degrade(source, level)
+        try:
+            with trace.span("layout"):
+                data = run_graphviz([engine, "-Tjson0"], attempt, timeout=seconds)
+        except subprocess.TimeoutExpired:
+            continue
+        if level:
+            budget.note(
+                f"布局超过 {seconds:g}s 预算，降级为：{budget.describe(level)}（共 {time.perf_counter() - start:.1f}s）"
+            )
+        return attempt, data, level
+    raise budget.LayoutBudgetExceeded(
+        f"降级为 {budget.describe(len(budget.STEPS))} 后布局仍超过 {seconds:g}s 预算"
+    )
+
+
+def _render_positioned(placed: str, filename: str, formats: Sequence[str]) -> List[str]:
+    # 坐标已回填，按 `neato -n2` 输出各格式，不再布局
+    if not _in_memory():
+        return render_formats(placed, filename, formats, engine="neato", args=["-n2"])
+    outputs = []
+    for fmt, data in _render_placed(placed, formats).items():
+        outputs.append(f"{filename}.{fmt}")
+        artifact_cache.write_atomic(Path(outputs[-1]), data)
+    return outputs
+
+
+def render_split(source: str, filename: str, formats: Sequence[str]) -> Optional[List[str]]:
+    """分块并行布局后渲染 formats（见 `diagramkit.split`）；不适用或失败时返回 None。
+
+    启用布局时间预算时每一块都在预算内布局，有一块超时即放弃分块，
+    由调用方按预算做全局布局。
+    """
+    seconds = budget.active()
+    with trace.span("layout"):
+        try:
+            composed = split.compose(
+                source, lambda dot: run_graphviz(["dot", "-Tjson0"], dot, timeout=seconds), split.active()
+            )
+        except subprocess.TimeoutExpired:
+            split.note([f"分块布局超过 {seconds:g}s 预算，改为全局布局"])
+            composed = None
+        except (subprocess.CalledProcessError, ValueError):
+            composed = None
+    if composed is None:
+        return None
+    placed, notes = composed
+    try:
+        outputs = _render_positioned(placed, filename, formats)
+    except subprocess.CalledProcessError:
+        return None
+    split.note(notes)
+    return outputs
+
+
+def render_within_budget(source: str, filename: str, formats: Sequence[str], engine: str = "dot") -> Tuple[List[str], bool]:
+    """在时间预算内渲染 formats 到 `filename.<fmt>`，返回 (输出路径, 是否降级)。
+
+    先在预算内只做布局，再按布局回填的坐标用 `neato -n2` 输出各格式。
+    未降级的布局照常写入布局缓存；降级的布局不写入。
+    """
+    layouts = layout_cache.active()
+    key = layouts.key(source, engine) if layouts else None
+    positioned = layouts.fetch(key) if layouts else None
+    level = 0
+    if positioned is None:
+        source, data, level = _fit(source, engine)
+        if layouts is not None and not level:
+            _store_layout(layouts, key, data)
+        try:
+            positioned = json.loads(data)
+        except ValueError:
+            positioned = None
+    placed = layout_cache.apply_layout(source, positioned) if positioned is not None else None
+    if placed is not None:
+        try:
+            return _render_positioned(placed, filename, formats), bool(level)
+        except subprocess.CalledProcessError:
+            pass
+    # 坐标无法回填时按已在预算内完成布局的设置完整渲染一次，同样限时
+    seconds = budget.active()
+    try:
+        return render_formats(source, filename, formats, engine=engine, timeout=seconds), bool(level)
+    except subprocess.TimeoutExpired:
+        raise budget.LayoutBudgetExceeded(f"完整渲染超过 {seconds:g}s 预算") from None
+
+
+@contextlib.contextmanager
+def graph_overrides(**attrs: str) -> Iterator[None]:
+    """在 with 块内渲染的图上临时覆盖图属性，例如预览时用较低的 dpi。"""
+    saved = dict(_overrides)
+    _overrides.update(attrs)
+    try:
+        yield
+    finally:
+        _overrides.clear()
+        _overrides.update(saved)
+
+
+def _enter(self: diagrams.Diagram) -> diagrams.Diagram:
+    # 记下建图开始的时刻，渲染时据此生成 construct 区间
+    self._diagramkit_entered = (time.perf_counter_ns() / 1000, time.process_time())
+    return _original_enter(self)
+
+
+def _exit(self: diagrams.Diagram, exc_type, exc_value, traceback) -> None:
+    # 原实现渲染后删除 DOT 文件；这里没有写出 DOT 文件，也就无需删除
+    self.render()
+    setdiagram(None)
+
+
+def render_source(source: str, filename: str, formats: Sequence[str], engine: str = "dot") -> List[str]:
+    """把 DOT 源码渲染为 filename.<fmt>，经过渲染缓存与布局缓存，返回输出路径。
+
+    启用了布局前的改写（`diagramkit.passes`）时先改写源码，再按选定的布局
+    方式（`diagramkit.engines`）换引擎与连线方式。启用了布局时间预算
+    （`diagramkit.budget`）时布局限时进行，降级的输出不写入渲染缓存；启用
+    分块布局（`diagramkit.split`）时先尝试分块并行布局，其输出同样不写入。
+    """
+    if passes.active():
+        with trace.span("passes"):
+            source = passes.apply(source)
+    source, engine = engines.apply(source, engine)
+    outputs = [f"{filename}.{fmt}" for fmt in formats]
+    cache = artifact_cache.active()
+    key = cache.key(source, formats, engine) if cache else None
+    with trace.span("cache"):
+        hit = cache is not None and cache.fetch(key, outputs)
+    if not hit:
+        degraded = False
+        composed = split.active() is not None and engine == "dot" and render_split(source, filename, formats) is not None
+        if not composed and budget.active() is not None:
+            _, degraded = render_within_budget(source, filename, formats, engine=engine)
+        elif not composed:
+            render_with_layout_cache(source, filename, formats, engine=engine)
+        if cache is not None and not degraded and not composed:
+            cache.store(key, outputs)
+    return outputs
+
+
+def render_graph(graph: Graph, filename: str, formats: Sequence[str]) -> List[str]:
+    """不经 `diagrams` 对象，由中间表示直接生成 DOT 并渲染。"""
+    with trace.span("serialize"):
+        source = compiler.compile_dot(graph, _overrides)
+    return render_source(source, filename, formats)
+
+
+def _render(self: diagrams.Diagram) -> None:
+    tracer = trace.active()
+    if tracer is not None and hasattr(self, "_diagramkit_entered"):
+        tracer.record("construct", *self._diagramkit_entered)
+    formats = self.outformat if isinstance(self.outformat, list) else [self.outformat]
+    if _overrides:
+        self.dot.graph_attr.update(_overrides)
+    with trace.span("serialize"):
+        # DOT 源码直接通过 stdin 交给 Graphviz，不再写到输出文件旁边
+        source = self.dot.source
+    outputs = render_source(source, self.filename, formats, self.dot.engine)
+    if self.show:
+        for path in outputs:
+            graphviz.view(path)
+
+
+def install(
+    cache: Optional[artifact_cache.ArtifactCache] = None,
+    layouts: Optional[layout_cache.LayoutCache] = None,
+    tracing: bool = False,
+    coprocesses: bool = False,
+    in_memory: bool = False,
+) -> None:
+    """让 `diagrams.Diagram` 使用单次布局的多格式渲染，并启用确定性 ID 与
+    provider 模块的延迟加载。
+
+    :param cache: 渲染产物缓存；给定时内容未变化的图表直接复用缓存产物。
+    :param layouts: 布局缓存；给定时几何未变化的图表跳过布局。
+    :param tracing: 为真时在当前进程启用分阶段计时。
+    :param coprocesses: 为真时 Graphviz 调用交给常驻的协进程。
+    :param in_memory: 为真时各格式的输出以字节读回内存，再原子地写入输出文件。
+    """
+    global _memory
+    _memory = in_memory
+    artifact_cache.activate(cache)
+    layout_cache.activate(layouts)
+    if tracing and trace.active() is None:
+        trace.activate(trace.Tracer())
+    if coprocesses and coprocess.active() is None:
+        coprocess.activate(coprocess.GraphvizPool())
+    ids.install()
+    lazy.install()
+    diagrams.Diagram.__enter__ = _enter
+    diagrams.Diagram.__exit__ = _exit
+    diagrams.Diagram.render = _render
+
+
+def uninstall() -> None:
+    """恢复 `diagrams` 自带的渲染方式。"""
+    global _memory
+    _memory = False
+    artifact_cache.activate(None)
+    layout_cache.activate(None)
+    trace.activate(None)
+    coprocess.activate(None)
+    ids.uninstall()
+    lazy.uninstall()
+    diagrams.Diagram.__enter__ = _original_enter
+    diagrams.Diagram.__exit__ = _original_exit
+    diagrams.Diagram.render = _original_render
@@ -0,0 +1,243 @@
+"""分块并行布局。
+
+大型技术栈图有六十多个集群，归在“客户端层”“前端技术层”等几个顶层
+集群之下，dot 却要在一次串行的全局布局中排完所有节点。分块布局把每个
+顶层集群（以及不在任何集群中的节点）当作一块，各自交给一个 dot 进程
+只做布局（-Tjson0），多块同时进行；再按块之间连线的方向给块分层，沿图
+的 `direction` 依次摆放，平移各块中的坐标，拼成整张图的布局。块之间的
+连线不在任何一块中，最后交给 `neato -n2`：节点与集群的位置都已固定，
+它只需给这些连线布线。
+
+结果与全局布局不同（块内排布互不影响，块间连线可能更长），因此不写入
+渲染缓存与布局缓存。少于两块、不足 `MIN_NODES` 个节点、连线不是正交
+走线或拼合失败时返回 None，调用方照常做全局布局。
+
+每一块多一次进程启动，块间连线还要由 neato 重新布线，小图分块只会更慢：
+仓库里的图（最多约 200 个节点）分块后慢 2～6 倍；合成图在 250 个节点起
+才比全局布局快（300 个节点时全局 8.6 秒、分块 3.0 秒，单核串行），600
+个节点时全局的正交走线失败，分块约 12 秒。neato -n2 给块间连线画样条
+极慢（300 个节点、309 条块间连线约 53 秒），所以只在 splines=ortho 时分块。
+"""
+
+import contextlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from diagramkit import passes, topology
+from diagramkit.layout import apply_layout, statements, unquote
+
+# 相邻两块之间留出的距离（点），供块间连线布线
+BLOCK_GAP = 72.0
+# 整张图标题所占的高度为字号的倍数
+LABEL_LINE = 1.5
+# 节点数少于这个值的图不分块，见模块说明中的测量
+MIN_NODES = 250
+
+_TOP_CLUSTER = re.compile(r"^\tsubgraph (\S+) \{$")
+_POINT = re.compile(r"(-?[\d.]+(?:e-?\d+)?),(-?[\d.]+(?:e-?\d+)?)")
+
+
+@dataclass
+class Block:
+    """一块：一个顶层集群，或全部不在集群中的节点。"""
+
+    name: str
+    lines: List[str] = field(default_factory=list)
+    nodes: set = field(default_factory=set)
+    edges: List[str] = field(default_factory=list)
+
+
+def blocks(source: str) -> Tuple[List[str], List[Block], List[Tuple[str, str]]]:
+    """把 DOT 拆成 (图头部语句, 各块, 块间连线的 (起点, 终点))。"""
+    lines = list(statements(source))
+    header: List[str] = []
+    result: List[Block] = []
+    loose = Block("")
+    current: Optional[Block] = None
+    for line in lines[1:]:
+        if current is not None:
+            current.lines.append(line)
+            if line == "\t}":
+                current = None
+            continue
+        match = _TOP_CLUSTER.match(line)
+        if match:
+            current = Block(unquote(match[1]), [line])
+            result.append(current)
+        elif line.startswith(("\tgraph ", "\tnode ", "\tedge ")):
+            header.append(line)
+        elif line != "}" and not passes.edges([line]):
+            loose.lines.append(line)
+    for block in result + [loose]:
+        block.nodes = set(passes.labels(block.lines))
+    if loose.nodes:
+        result.append(loose)
+    owner = {node: block for block in result for node in block.nodes}
+    between = []
+    for i, tail, head, _ in passes.edges(lines):
+        if tail in owner and owner[tail] is owner.get(head):
+            owner[tail].edges.append(lines[i])
+        else:
+            between.append((tail, head))
+    return [lines[0], *header], result, between
+
+
+def _block_source(header: List[str], block: Block) -> str:
+    # 标题只在整张图上画一次，不计入各块的尺寸
+    lines = list(header)
+    found = passes.graph_attrs(lines)
+    if found is not None:
+        i, items = found
+        items.pop("label", None)
+        lines[i] = passes.graph_line(items)
+    return "\n".join([*lines, *block.lines, *block.edges, "}"]) + "\n"
+
+
+def _shift(value: str, dx: float, dy: float) -> str:
+    return _POINT.sub(lambda m: f"{float(m[1]) + dx:.2f},{float(m[2]) + dy:.2f}", value)
+
+
+def _box(layout: dict) -> Tuple[float, float, float, float]:
+    x0, y0, x1, y1 = (float(v) for v in layout["bb"].split(","))
+    return x0, y0, x1, y1
+
+
+def _arrange(sizes: List[Tuple[float, float]], rank: List[int], direction: str) -> List[Tuple[float, float]]:
+    """按分层与方向给各块定左下角坐标。同一层的块沿垂直于方向的一侧依次排开并居中。"""
+    horizontal = direction in ("LR", "RL")
+    along = [w if horizontal else h for w, h in sizes]
+    across = [h if horizontal else w for w, h in sizes]
+    layers = sorted(set(rank))
+    depth = {r: max(along[i] for i in range(len(sizes)) if rank[i] == r) for r in layers}
+    width = {r: sum(across[i] for i in range(len(sizes)) if rank[i] == r) for r in layers}
+    width = {r: w + BLOCK_GAP * (sum(1 for x in rank if x == r) - 1) for r, w in width.items()}
+    total_along = sum(depth.values()) + BLOCK_GAP * (len(layers) - 1)
+    total_across = max(width.values())
+    start, cursor = {}, 0.0
+    for r in layers:
+        start[r] = cursor
+        cursor += depth[r] + BLOCK_GAP
+    offset = {r: (total_across - width[r]) / 2 for r in layers}
+    corners = []
+    for i in range(len(sizes)):
+        r = rank[i]
+        a = start[r] + (depth[r] - along[i]) / 2
+        if direction in ("TB", "RL"):
+            # 第 0 层在上方（TB）或右侧（RL），坐标轴朝相反方向
+            a = total_along - a - along[i]
+        c = offset[r]
+        offset[r] += across[i] + BLOCK_GAP
+        if horizontal:
+            # 同一层的块自上而下排开
+            c = total_across - c - across[i]
+        corners.append((a, c) if horizontal else (c, a))
+    return corners
+
+
+def compose(
+    source: str, layout: Callable[[str], bytes], jobs: Optional[int] = None, min_nodes: int = MIN_NODES
+) -> Optional[Tuple[str, List[str]]]:
+    """分块并行布局 source，返回 (可用 `neato -n2` 渲染的 DOT, 说明)；不宜分块时返回 None。
+
+    :param layout: 对一段 DOT 做布局并返回 json0 输出，在多个线程中同时调用。
+    :param jobs: 同时布局的块数上限，默认为 CPU 数。
+    :param min_nodes: 节点数少于这个值的图不分块。
+    """
+    header, parts, between = blocks(source)
+    found = passes.graph_attrs(header)
+    splines = found[1].get("splines", "") if found else ""
+    if len(parts) < 2 or sum(len(block.nodes) for block in parts) < min_nodes or splines != "ortho":
+        return None
+    sources = [_block_source(header, block) for block in parts]
+
+    def run(dot: str) -> Tuple[dict, float]:
+        start = time.perf_counter()
+        data = layout(dot)
+        return json.loads(data), (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        laid = list(pool.map(run, sources))
+    wall = (time.perf_counter() - start) * 1000
+    layouts = [data for data, _ in laid]
+    if any("bb" not in data for data in layouts):
+        return None
+    owner = {node: k for k, block in enumerate(parts) for node in block.nodes}
+    order = list(range(len(parts)))
+    pairs = [(owner[tail], owner[head]) for tail, head in between if tail in owner and head in owner]
+    rank = topology.layers([p for p in pairs if p[0] != p[1]], order)
+    direction = found[1].get("rankdir", "TB") if found else "TB"
+    boxes = [_box(data) for data in layouts]
+    corners = _arrange([(x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes], [rank[k] for k in order], direction)
+
+    objects: List[dict] = []
+    edges: List[dict] = []
+    gvid: Dict[str, int] = {}
+    for data, (x0, y0, _, _), (cx, cy) in zip(layouts, boxes, corners):
+        dx, dy = cx - x0, cy - y0
+        local = {}
+        for obj in data.get("objects", []):
+            moved = dict(obj)
+            for key in ("pos", "bb", "lp"):
+                if key in moved:
+                    moved[key] = _shift(moved[key], dx, dy)
+            local[obj["_gvid"]] = moved["_gvid"] = len(objects)
+            gvid[obj["name"]] = moved["_gvid"]
+            objects.append(moved)
+        for edge in data.get("edges", []):
+            moved = dict(edge, tail=local[edge["tail"]], head=local[edge["head"]])
+            for key in ("pos", "lp", "xlp", "head_lp", "tail_lp"):
+                if key in moved:
+                    moved[key] = _shift(moved[key], dx, dy)
+            edges.append(moved)
+    # 块间连线没有 pos，由 neato -n2 布线
+    edges += [{"tail": gvid[tail], "head": gvid[head]} for tail, head in between if tail in gvid and head in gvid]
+    width = max(cx + x1 - x0 for (x0, _, x1, _), (cx, _) in zip(boxes, corners))
+    height = max(cy + y1 - y0 for (_, y0, _, y1), (_, cy) in zip(boxes, corners))
+    graph = {"bb": f"0,0,{width:.2f},{height:.2f}"}
+    if found is not None and found[1].get("label"):
+        # 标题在各块下方（根图 labelloc 默认为 b），留出一行
+        line = float(found[1].get("fontsize", "14")) * LABEL_LINE
+        graph = {"bb": f"0,{-line:.2f},{width:.2f},{height:.2f}", "lp": f"{width / 2:.2f},{-line / 2:.2f}"}
+    placed = apply_layout(source, {**graph, "objects": objects, "edges": edges})
+    if placed is None:
+        return None
+    slowest = max(ms for _, ms in laid)
+    notes = [
+        f"分 {len(parts)} 块并行布局：耗时 {wall:.0f} ms（最慢一块 {slowest:.0f} ms，各块合计 "
+        f"{sum(ms for _, ms in laid):.0f} ms），块间 {len(between)} 条连线由 neato -n2 布线"
+    ]
+    return placed, notes
+
+
+_jobs: Optional[int] = None
+_notes: List[str] = []
+
+
+@contextlib.contextmanager
+def enabled(on: bool = True, jobs: Optional[int] = None) -> Iterator[List[str]]:
+    """在 with 块内渲染的图分块并行布局（on 为假时不变），返回收集说明的列表。
+
+    :param jobs: 同时布局的块数上限，默认为 CPU 数。
+    """
+    global _jobs, _notes
+    saved = _jobs, _notes
+    _jobs, _notes = (jobs or os.cpu_count() or 1) if on else None, []
+    try:
+        yield _notes
+    finally:
+        _jobs, _notes = saved
+
+
+def active() -> Optional[int]:
+    """启用时返回同时布局的块数上限，否则为 None。"""
+    return _jobs
+
+
+def note(messages: List[str]) -> None:
+    _notes.extend(messages)
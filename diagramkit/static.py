@@ -0,0 +1,850 @@
+"""不执行脚本的静态图结构解析。
+
+各分类目录下的脚本写法高度一致：`@diagram(...)` 修饰的 `create_*` 函数里
+是 `with Diagram(...)`、层层嵌套的 `with Cluster("...")`、`var = Server("...")`
+形式的节点，以及 `a >> Edge(label="...") >> b` 形式的连线。这里用 `ast`
+解析脚本，按 `diagrams` 运算符的语义符号化地求值这些语句，直接得到
+`graph.Graph`：节点、集群树、连线与标签，节点与集群 ID 与实际渲染时
+一致。整个过程不导入 `diagrams`、不执行脚本中的任何代码，也不需要
+Graphviz。
+
+`include("片段", ...)` 按同样的规则解析 `fragments/` 中对应的片段函数，
+再以实例的命名空间并入所在的图（见 `diagramkit.fragments`）。
+
+循环、条件、调用辅助函数等无法静态确定的语句会被跳过并记入
+`Graph.unresolved`。
+
+解析结果按脚本的修改时间与大小缓存在 `.graph-index/` 中，未修改的
+脚本直接读取缓存，索引全部脚本只需几毫秒；用到的片段源文件有变化时
+同样重新解析。
+"""
+
+import argparse
+import ast
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from diagramkit import edges, registry
+from diagramkit.graph import Cluster, Edge, Graph, Node, lint, namespaced, stable_id
+from diagramkit.registry import FRAGMENT_DIR, ROOT, Target
+
+DEFAULT_INDEX = ROOT / ".graph-index"
+
+# 解析规则变化时递增，使旧的索引缓存失效
+INDEX_VERSION = 6
+
+_DIAGRAM = "diagrams.Diagram"
+_CLUSTER = "diagrams.Cluster"
+_EDGE = "diagrams.Edge"
+_REGISTER = ("diagramkit.diagram", "diagramkit.registry.diagram")
+_CONNECT = ("diagramkit.connect", "diagramkit.edges.connect")
+_FRAGMENT = ("diagramkit.fragment", "diagramkit.fragments.fragment")
+_INCLUDE = ("diagramkit.include", "diagramkit.fragments.include")
+
+# 与 `diagrams.Edge._default_edge_attrs` 相同的属性不记录
+_EDGE_DEFAULTS = {"fontcolor": "#2D3436", "fontname": "Sans-Serif", "fontsize": "13"}
+
+
+class _Unresolved(Exception):
+    """表达式无法静态求值。"""
+
+
+class _Param:
+    """函数参数等运行时才知道的值。"""
+
+
+_PARAM = _Param()
+
+
+class _NodeRef:
+    __slots__ = ("id", "graph")
+
+    def __init__(self, nodeid: str, graph: Graph):
+        self.id = nodeid
+        self.graph = graph
+
+
+class _EdgeRef:
+    """对应 `diagrams.Edge` 对象：连线属性、方向与已绑定的起点。"""
+
+    __slots__ = ("node", "forward", "reverse", "attrs")
+
+    def __init__(self, attrs: Dict[str, str], node: Optional[_NodeRef] = None, forward=False, reverse=False):
+        self.node = node
+        self.forward = forward
+        self.reverse = reverse
+        self.attrs = attrs
+
+    def final_attrs(self) -> Dict[str, str]:
+        if self.forward and self.reverse:
+            direction = "both"
+        elif self.forward:
+            direction = "forward"
+        elif self.reverse:
+            direction = "back"
+        else:
+            direction = "none"
+        return {**self.attrs, "dir": direction}
+
+
+@dataclass
+class ScriptGraphs:
+    """一个脚本中各图表函数解析出的图。
+
+    从索引缓存读取时只带有统计数字，各图表的图在第一次访问时才从
+    graph_file 读入。
+    """
+
+    path: Path
+    category: str
+    targets: List[Target] = field(default_factory=list)
+    stats: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # 各图表用到的片段名
+    uses: Dict[str, List[str]] = field(default_factory=dict)
+    error: str = ""
+    graph_file: Optional[Path] = None
+    _graphs: Optional[Dict[str, List[Graph]]] = field(default=None, repr=False)
+
+    def add(self, target: Target, graphs: List[Graph]) -> None:
+        if self._graphs is None:
+            self._graphs = {}
+        self.targets.append(target)
+        self.stats[target.name] = statistics(graphs)
+        self.uses[target.name] = sorted({name for graph in graphs for name in graph.fragments})
+        self._graphs[target.name] = graphs
+
+    def graphs(self, target: Target) -> List[Graph]:
+        if self._graphs is None:
+            data = json.loads(self.graph_file.read_text(encoding="utf-8")) if self.graph_file else {}
+            self._graphs = {name: [Graph.from_dict(g) for g in graphs] for name, graphs in data.items()}
+        return self._graphs.get(target.name, [])
+
+    def dump(self) -> str:
+        data = {t.name: [g.to_dict() for g in self.graphs(t)] for t in self.targets}
+        return json.dumps(data, ensure_ascii=False)
+
+
+def _imports(tree: ast.Module) -> Dict[str, str]:
+    """返回模块顶层导入的 {本地名: 完整路径}，包括顶层 try 语句中的导入。"""
+    names = {}
+    statements = []
+    for node in tree.body:
+        statements.append(node)
+        if isinstance(node, ast.Try):
+            # 脚本用 try/except ModuleNotFoundError 兼容直接运行
+            statements += node.body + [s for handler in node.handlers for s in handler.body]
+    for node in statements:
+        if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                names[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    names[alias.asname] = alias.name
+                else:
+                    top = alias.name.split(".")[0]
+                    names[top] = top
+    return names
+
+
+def _qualname(expr: ast.expr, imports: Dict[str, str]) -> Optional[str]:
+    """把 `Server` 或 `compute.Server` 之类的表达式解析为完整路径。"""
+    parts = []
+    while isinstance(expr, ast.Attribute):
+        parts.append(expr.attr)
+        expr = expr.value
+    if not isinstance(expr, ast.Name) or expr.id not in imports:
+        return None
+    return ".".join([imports[expr.id], *reversed(parts)])
+
+
+def _is_node_class(qualname: str) -> bool:
+    # diagrams.<provider>.<module>.<Class>，以及 diagrams.custom.Custom
+    return qualname.startswith("diagrams.") and qualname.count(".") >= 2 and qualname.rsplit(".", 1)[1][:1].isupper()
+
+
+@dataclass
+class FragmentDef:
+    """片段库中用 `@fragment("名字")` 注册的一个片段函数。"""
+
+    name: str
+    func: ast.FunctionDef
+    imports: Dict[str, str]
+    path: Path
+
+
+def _signature(path: Path) -> List[int]:
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+_libraries: Dict[tuple, Dict[str, FragmentDef]] = {}
+
+
+def library(directory: Path = FRAGMENT_DIR) -> Dict[str, FragmentDef]:
+    """解析片段库中的片段函数，返回 {片段名: 定义}；按各文件的修改时间与大小缓存。"""
+    paths = sorted(Path(directory).glob("*.py"))
+    key = (str(directory), *((p.name, *_signature(p)) for p in paths))
+    if key not in _libraries:
+        found = {}
+        for path in paths:
+            try:
+                tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+            except SyntaxError:
+                continue
+            imports = _imports(tree)
+            for func in tree.body:
+                if not isinstance(func, ast.FunctionDef):
+                    continue
+                for decorator in func.decorator_list:
+                    if (
+                        isinstance(decorator, ast.Call)
+                        and _qualname(decorator.func, imports) in _FRAGMENT
+                        and decorator.args
+                        and isinstance(decorator.args[0], ast.Constant)
+                        and isinstance(decorator.args[0].value, str)
+                    ):
+                        name = decorator.args[0].value
+                        found[name] = FragmentDef(name, func, imports, path)
+        _libraries[key] = found
+    return _libraries[key]
+
+
+def fragment_files(directory: Path = FRAGMENT_DIR) -> Dict[str, Path]:
+    """片段名到所在源文件的映射。"""
+    return {name: item.path for name, item in library(directory).items()}
+
+
+def _bind(func: ast.FunctionDef, params: Dict[str, object]) -> Dict[str, object]:
+    # 片段函数的参数：include 的关键字参数，其余取字面量默认值
+    args = func.args
+    positional = [a.arg for a in args.posonlyargs + args.args]
+    defaults = dict(zip(positional[len(positional) - len(args.defaults):], args.defaults))
+    defaults.update((a.arg, d) for a, d in zip(args.kwonlyargs, args.kw_defaults) if d is not None)
+    names = positional + [a.arg for a in args.kwonlyargs]
+    if set(params) - set(names):
+        raise _Unresolved
+    env = {}
+    for name in names:
+        if name in params:
+            env[name] = params[name]
+        elif name in defaults:
+            try:
+                env[name] = ast.literal_eval(defaults[name])
+            except ValueError:
+                raise _Unresolved
+        else:
+            raise _Unresolved
+    return env
+
+
+class _FunctionEvaluator:
+    """按 `diagrams` 的语义对一个图表函数的函数体做符号求值。"""
+
+    def __init__(
+        self,
+        target: Target,
+        imports: Dict[str, str],
+        params: Sequence[str],
+        fragments: Optional[Dict[str, FragmentDef]] = None,
+        including: Tuple[str, ...] = (),
+    ):
+        self.target = target
+        self.imports = imports
+        self.env: Dict[str, object] = {name: _PARAM for name in params}
+        self.fragments = fragments if fragments is not None else {}
+        # 正在求值的片段，防止片段互相引用导致无限递归
+        self.including = including
+        self.graphs: List[Graph] = []
+        self.graph: Optional[Graph] = None
+        self.ids: Counter = Counter()
+        # 集群栈：(集群 ID, 集群标签, 集群)；集群在 with 块结束时才加入图
+        self.clusters: List[Tuple[str, str, Cluster]] = []
+        self.line = 0
+
+    # 语句
+
+    def block(self, body: Sequence[ast.stmt]) -> None:
+        for stmt in body:
+            self.line = stmt.lineno
+            try:
+                self.statement(stmt)
+            except _Unresolved:
+                self.skip(stmt)
+
+    def skip(self, stmt: ast.AST) -> None:
+        if self.graph is not None:
+            source = ast.unparse(stmt).splitlines()[0]
+            self.graph.unresolved.append(f"第 {stmt.lineno} 行 {source[:60]}")
+
+    def statement(self, stmt: ast.stmt) -> None:
+        if isinstance(stmt, ast.With):
+            self.with_block(stmt)
+        elif isinstance(stmt, ast.Assign):
+            value = self.eval(stmt.value)
+            for target in stmt.targets:
+                self.bind(target, value)
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is not None:
+            self.bind(stmt.target, self.eval(stmt.value))
+        elif isinstance(stmt, ast.Expr):
+            if not (isinstance(stmt.value, ast.Constant) and isinstance(stmt.value.value, str)):
+                self.eval(stmt.value)
+        elif not isinstance(stmt, (ast.Pass, ast.Return)):
+            raise _Unresolved
+
+    def bind(self, target: ast.expr, value: object) -> None:
+        if isinstance(target, ast.Name):
+            self.env[target.id] = value
+        elif isinstance(target, (ast.Tuple, ast.List)) and isinstance(value, list) and len(value) == len(target.elts):
+            for element, item in zip(target.elts, value):
+                self.bind(element, item)
+        else:
+            raise _Unresolved
+
+    def with_block(self, stmt: ast.With) -> None:
+        entered = []
+        for item in stmt.items:
+            call = item.context_expr
+            qualname = _qualname(call.func, self.imports) if isinstance(call, ast.Call) else None
+            if qualname == _DIAGRAM and self.graph is None:
+                self.enter_diagram(call)
+            elif qualname == _CLUSTER and self.graph is not None:
+                self.enter_cluster(call)
+            else:
+                raise _Unresolved
+            entered.append(qualname)
+        try:
+            self.block(stmt.body)
+        finally:
+            for qualname in reversed(entered):
+                if qualname == _DIAGRAM:
+                    self.graph = None
+                else:
+                    self.graph.add_cluster(self.clusters.pop()[2])
+
+    def arguments(self, call: ast.Call, names: Sequence[str]) -> Dict[str, object]:
+        """按参数名整理调用的实参并求值；**kwargs 无法静态展开。"""
+        if len(call.args) > len(names) or any(isinstance(a, ast.Starred) for a in call.args):
+            raise _Unresolved
+        args = {name: self.eval(arg) for name, arg in zip(names, call.args)}
+        for keyword in call.keywords:
+            if keyword.arg is None:
+                raise _Unresolved
+            args[keyword.arg] = self.eval(keyword.value)
+        return args
+
+    def enter_diagram(self, call: ast.Call) -> None:
+        args = self.arguments(call, ("name", "filename", "direction", "curvestyle", "outformat"))
+        name = args.pop("name", "")
+        filename = args.pop("filename", None)
+        direction = args.pop("direction", "LR")
+        for key in ("outformat", "show"):
+            args.pop(key, None)
+        if not isinstance(name, str) or not isinstance(direction, str):
+            raise _Unresolved
+        if isinstance(filename, _Param):
+            # 函数参数 filename，即注册时声明的输出文件名
+            filename = self.target.filename
+        elif not filename:
+            filename = "_".join(name.split()).lower() if name else "diagrams_image"
+        elif not isinstance(filename, str):
+            raise _Unresolved
+        options = {k: v for k, v in args.items() if not isinstance(v, _Param)}
+        self.graph = Graph(name, filename, direction, options)
+        self.graphs.append(self.graph)
+        self.ids = Counter()
+
+    def enter_cluster(self, call: ast.Call) -> None:
+        args = self.arguments(call, ("label", "direction", "graph_attr"))
+        label = args.pop("label", "cluster")
+        if not isinstance(label, str):
+            raise _Unresolved
+        path = [c[1] for c in self.clusters]
+        clusterid = stable_id(self.ids, "cluster", path, label)
+        parent = self.clusters[-1][0] if self.clusters else None
+        self.clusters.append((clusterid, label, Cluster(clusterid, label, parent, args, call.lineno)))
+
+    # 表达式
+
+    def eval(self, expr: ast.expr) -> object:
+        if isinstance(expr, ast.Constant):
+            return expr.value
+        if isinstance(expr, ast.Name):
+            if expr.id not in self.env:
+                raise _Unresolved
+            return self.env[expr.id]
+        if isinstance(expr, (ast.List, ast.Tuple)):
+            return [self.eval(e) for e in expr.elts]
+        if isinstance(expr, ast.Dict) and None not in expr.keys:
+            return {self.eval(k): self.eval(v) for k, v in zip(expr.keys, expr.values)}
+        if isinstance(expr, ast.JoinedStr):
+            return "".join(self.format(value) for value in expr.values)
+        if isinstance(expr, ast.Subscript):
+            container, key = self.eval(expr.value), self.eval(expr.slice)
+            if isinstance(container, dict) and isinstance(key, str) and key in container:
+                return container[key]
+            if isinstance(container, list) and isinstance(key, int) and -len(container) <= key < len(container):
+                return container[key]
+        if isinstance(expr, ast.Call):
+            return self.call(expr)
+        if isinstance(expr, ast.BinOp) and isinstance(expr.op, (ast.RShift, ast.LShift, ast.Sub)):
+            left, right = self.eval(expr.left), self.eval(expr.right)
+            if isinstance(left, (_NodeRef, _EdgeRef, list)):
+                return self.operator(expr.op, left, right)
+        raise _Unresolved
+
+    def format(self, value: ast.expr) -> str:
+        """f-string 的一段：字面量，或不带格式说明的字符串、数字字段。"""
+        if isinstance(value, ast.Constant):
+            return value.value
+        if isinstance(value, ast.FormattedValue) and value.conversion == -1 and value.format_spec is None:
+            result = self.eval(value.value)
+            if isinstance(result, (str, int, float)):
+                return str(result)
+        raise _Unresolved
+
+    def call(self, call: ast.Call) -> object:
+        if isinstance(call.func, ast.Name) and call.func.id == "locals" and not call.args and not call.keywords:
+            return dict(self.env)
+        qualname = _qualname(call.func, self.imports)
+        if qualname in _CONNECT and self.graph is not None:
+            return self.connect_table(call)
+        if qualname in _INCLUDE and self.graph is not None:
+            return self.include(call)
+        if qualname == _EDGE:
+            args = self.arguments(call, ("node", "forward", "reverse", "label", "color", "style"))
+            node = args.pop("node", None)
+            forward, reverse = bool(args.pop("forward", False)), bool(args.pop("reverse", False))
+            attrs = {k: v for k, v in args.items() if v and _EDGE_DEFAULTS.get(k) != v}
+            if node is not None and not isinstance(node, _NodeRef) or not all(isinstance(v, str) for v in attrs.values()):
+                raise _Unresolved
+            return _EdgeRef(attrs, node, forward, reverse)
+        if qualname is None or not _is_node_class(qualname) or self.graph is None:
+            raise _Unresolved
+        args = self.arguments(call, ("label",))
+        label = args.pop("label", "")
+        if not isinstance(label, str) or args.pop("nodeid", None) is not None:
+            raise _Unresolved
+        path = [c[1] for c in self.clusters]
+        nodeid = stable_id(self.ids, "n", path, label)
+        cluster = self.clusters[-1][0] if self.clusters else None
+        self.graph.add_node(Node(nodeid, label, qualname, cluster, args, call.lineno))
+        return _NodeRef(nodeid, self.graph)
+
+    def connect_table(self, call: ast.Call) -> int:
+        """`diagramkit.connect` 的字面量邻接表；CSV 等运行时才知道内容的表无法静态解析。"""
+        args = dict(zip(("table", "nodes"), call.args))
+        args.update((k.arg, k.value) for k in call.keywords)
+        if "table" not in args or set(args) - {"table", "nodes"}:
+            raise _Unresolved
+        names = self.env
+        nodes = args.get("nodes")
+        if nodes is not None and not (isinstance(nodes, ast.Call) and isinstance(nodes.func, ast.Name) and nodes.func.id == "locals"):
+            names = self.eval(nodes)
+            if not isinstance(names, dict):
+                raise _Unresolved
+        table = self.eval(args["table"])
+        if not isinstance(table, list):
+            raise _Unresolved
+        try:
+            table = edges.rows(table)
+        except ValueError:
+            raise _Unresolved
+        batch = []
+        for src, dst, label, style in table:
+            tail, head = (names.get(end) if isinstance(end, str) else end for end in (src, dst))
+            if not (isinstance(tail, _NodeRef) and isinstance(head, _NodeRef) and isinstance(label, str) and isinstance(style, str)):
+                raise _Unresolved
+            if tail.graph is not self.graph or head.graph is not self.graph:
+                # 运行时 connect 会整体拒绝这张表
+                raise _Unresolved
+            batch.append(Edge(tail.id, head.id, edges.edge_attrs(label, style), self.line))
+        unique, _ = edges.dedupe(batch)
+        for edge in unique:
+            self.graph.add_edge(edge)
+        return len(unique)
+
+    def include(self, call: ast.Call) -> Dict[str, _NodeRef]:
+        """`diagramkit.include`：求值片段函数，以实例的命名空间并入当前图，返回端口。"""
+        params = self.arguments(call, ("name",))
+        name = params.pop("name", None)
+        item = self.fragments.get(name) if isinstance(name, str) else None
+        if item is None or name in self.including:
+            raise _Unresolved
+        if not all(isinstance(v, (str, int, float, bool, type(None))) for v in params.values()):
+            # 运行时只接受可写入 JSON 的参数
+            raise _Unresolved
+        sub = _FragmentEvaluator(self.target, item, _bind(item.func, params), self.fragments, (*self.including, name))
+        sub.block(item.func.body)
+        # 与 `fragments.include` 相同，由集群路径、片段名与出现次序确定
+        namespace = stable_id(self.ids, "fragment", [c[1] for c in self.clusters], name).split("_", 1)[1]
+        cluster = self.clusters[-1][0] if self.clusters else None
+        self.graph.merge(sub.graph, namespace, cluster, call.lineno)
+        self.graph.unresolved += [f"片段 {name} {message}" for message in sub.graph.unresolved]
+        ports = sub.result if isinstance(sub.result, dict) else {}
+        return {
+            port: _NodeRef(namespaced(ref.id, namespace), self.graph)
+            for port, ref in ports.items()
+            if isinstance(ref, _NodeRef) and ref.graph is sub.graph
+        }
+
+    def connect(self, tail: _NodeRef, head: object, edge: _EdgeRef) -> None:
+        if not isinstance(head, _NodeRef):
+            raise _Unresolved
+        for end in (tail, head):
+            if end.graph is not self.graph:
+                self.graph.foreign.append((end.id, end.graph.nodes[end.id].label))
+        self.graph.add_edge(Edge(tail.id, head.id, edge.final_attrs(), self.line))
+
+    def operator(self, op: ast.operator, left: object, right: object) -> object:
+        forward, reverse = isinstance(op, ast.RShift), isinstance(op, ast.LShift)
+        if isinstance(left, _NodeRef):
+            if isinstance(right, list):
+                for node in right:
+                    self.connect(left, node, _EdgeRef({}, left, forward, reverse))
+                return right
+            if isinstance(right, _NodeRef):
+                self.connect(left, right, _EdgeRef({}, left, forward, reverse))
+                return right
+            if isinstance(right, _EdgeRef):
+                right.forward = right.forward or forward
+                right.reverse = right.reverse or reverse
+                right.node = left
+                return right
+        elif isinstance(left, _EdgeRef):
+            left.forward = left.forward or forward
+            left.reverse = left.reverse or reverse
+            if isinstance(right, list):
+                for node in right:
+                    self.connect(left.node, node, left)
+                return right
+            if isinstance(right, _EdgeRef):
+                left.attrs = dict(right.attrs)
+                return left
+            if isinstance(right, _NodeRef):
+                if left.node is None:
+                    left.node = right
+                    return left
+                self.connect(left.node, right, left)
+                return right
+        elif isinstance(left, list):
+            if isinstance(right, _NodeRef):
+                # [a, b] >> c
+                for item in left:
+                    if isinstance(item, _EdgeRef):
+                        item.forward = item.forward or forward
+                        item.reverse = item.reverse or reverse
+                        self.connect(item.node, right, item)
+                    else:
+                        self.operator(op, item, right)
+                return right
+            if isinstance(right, _EdgeRef):
+                # [a, b] >> Edge(...)
+                edges = []
+                for item in left:
+                    if isinstance(item, _EdgeRef):
+                        right.attrs = dict(item.attrs)
+                        edges.append(item)
+                    else:
+                        edges.append(_EdgeRef(dict(right.attrs), item, forward, reverse))
+                return edges
+        raise _Unresolved
+
+
+class _FragmentEvaluator(_FunctionEvaluator):
+    """片段函数：在独立的草稿图中求值，记下返回值中的端口。"""
+
+    def __init__(
+        self,
+        target: Target,
+        item: FragmentDef,
+        env: Dict[str, object],
+        fragments: Dict[str, FragmentDef],
+        including: Tuple[str, ...],
+    ):
+        super().__init__(target, item.imports, (), fragments, including)
+        self.env.update(env)
+        self.graph = Graph(item.name, str(item.path))
+        self.graphs.append(self.graph)
+        self.result: object = None
+
+    def statement(self, stmt: ast.stmt) -> None:
+        if isinstance(stmt, ast.Return):
+            self.result = self.eval(stmt.value) if stmt.value is not None else None
+        else:
+            super().statement(stmt)
+
+
+def _decorator_target(func: ast.FunctionDef, path: Path, imports: Dict[str, str]) -> Optional[Target]:
+    for decorator in func.decorator_list:
+        if not isinstance(decorator, ast.Call) or _qualname(decorator.func, imports) not in _REGISTER:
+            continue
+        try:
+            values = [ast.literal_eval(a) for a in decorator.args]
+            kwargs = {k.arg: ast.literal_eval(k.value) for k in decorator.keywords}
+        except ValueError:
+            return None
+        kwargs.update(zip(("category", "filename", "tags", "passes", "engine"), values))
+        return Target(
+            kwargs["category"], path.name, func.name, kwargs["filename"],
+            tuple(kwargs.get("tags", ())), tuple(kwargs.get("passes", ())), kwargs.get("engine", ""),
+        )
+    return None
+
+
+def extract_source(
+    source: str, path: Path, category: str, fragments: Optional[Dict[str, FragmentDef]] = None
+) -> ScriptGraphs:
+    """解析一个脚本的源码，返回其中各图表函数的图。
+
+    :param fragments: 片段库（见 `library`），缺省时解析 `fragments/` 目录。
+    """
+    if fragments is None:
+        fragments = library()
+    result = ScriptGraphs(path, category)
+    try:
+        tree = ast.parse(source, filename=str(path))
+    except SyntaxError as e:
+        result.error = f"SyntaxError: {e}"
+        return result
+    imports = _imports(tree)
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        target = _decorator_target(node, path, imports)
+        if target is None:
+            continue
+        params = [a.arg for a in node.args.posonlyargs + node.args.args + node.args.kwonlyargs]
+        evaluator = _FunctionEvaluator(target, imports, params, fragments)
+        evaluator.block(node.body)
+        result.add(target, evaluator.graphs)
+    return result
+
+
+def extract(path: Path, category: str, fragments: Optional[Dict[str, FragmentDef]] = None) -> ScriptGraphs:
+    """解析一个脚本文件。"""
+    return extract_source(Path(path).read_text(encoding="utf-8"), Path(path), category, fragments)
+
+
+def _encode(script: ScriptGraphs, stat: os.stat_result, fragments: Dict[str, FragmentDef]) -> dict:
+    used = {name for t in script.targets for name in script.uses[t.name] if name in fragments}
+    return {
+        "signature": [stat.st_mtime_ns, stat.st_size],
+        "error": script.error,
+        # 用到的片段所在源文件的签名，片段修改后脚本需要重新解析
+        "fragments": {name: _signature(fragments[name].path) for name in sorted(used)},
+        "targets": [
+            {
+                "func": t.func,
+                "filename": t.filename,
+                "tags": list(t.tags),
+                "passes": list(t.passes),
+                "engine": t.engine,
+                "stats": script.stats[t.name],
+                "uses": script.uses[t.name],
+            }
+            for t in script.targets
+        ],
+    }
+
+
+def _decode(entry: dict, path: Path, category: str, graph_file: Path) -> ScriptGraphs:
+    script = ScriptGraphs(path, category, error=entry["error"], graph_file=graph_file)
+    for item in entry["targets"]:
+        target = Target(
+            category, path.name, item["func"], item["filename"], tuple(item["tags"]), tuple(item["passes"]), item["engine"]
+        )
+        script.targets.append(target)
+        script.stats[target.name] = item["stats"]
+        script.uses[target.name] = item["uses"]
+    return script
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class Index:
+    """全部脚本的静态解析结果，按脚本修改时间与大小增量更新。
+
+    缓存目录中的 `index.json` 只记录各脚本的签名、图表与统计数字，
+    各脚本的图另存为 `<分类>/<脚本名>.json`，用到时才读取，因此脚本
+    都未修改时更新索引只需读一个小文件并 stat 各脚本。
+
+    :param path: 索引缓存目录；为 None 时不读写缓存。
+    """
+
+    def __init__(self, path: Optional[Path] = DEFAULT_INDEX):
+        self.path = Path(path) if path is not None else None
+        self.scripts: Dict[str, ScriptGraphs] = {}
+        self.parsed = 0
+        self._entries: Dict[str, dict] = {}
+        self._changed: List[str] = []
+        self._removed: List[str] = []
+        if self.path is not None:
+            try:
+                data = json.loads((self.path / "index.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == INDEX_VERSION:
+                self._entries = data["scripts"]
+
+    def _graph_file(self, key: str) -> Optional[Path]:
+        return self.path / f"{key[:-3]}.json" if self.path is not None else None
+
+    def update(self, categories: Iterable[str] = registry.CATEGORIES) -> List[ScriptGraphs]:
+        """解析有变化的脚本，返回给定分类下全部脚本的结果（按分类、脚本名排序）。"""
+        categories = list(categories)
+        scripts = []
+        seen = set()
+        fragments = library()
+        signatures = {name: _signature(item.path) for name, item in fragments.items()}
+        for category in categories:
+            for path in sorted((ROOT / category).glob("*.py")):
+                key = f"{category}/{path.name}"
+                seen.add(key)
+                stat = path.stat()
+                entry = self._entries.get(key)
+                if (
+                    entry is not None
+                    and entry["signature"] == [stat.st_mtime_ns, stat.st_size]
+                    and all(signatures.get(name) == sig for name, sig in entry["fragments"].items())
+                ):
+                    script = self.scripts.get(key) or _decode(entry, path, category, self._graph_file(key))
+                else:
+                    script = extract(path, category, fragments)
+                    self._entries[key] = _encode(script, stat, fragments)
+                    self._changed.append(key)
+                    self.parsed += 1
+                self.scripts[key] = script
+                scripts.append(script)
+        for key in [k for k in self._entries if k.split("/")[0] in categories and k not in seen]:
+            del self._entries[key]
+            self.scripts.pop(key, None)
+            self._removed.append(key)
+        return scripts
+
+    def save(self) -> None:
+        if self.path is None or not (self._changed or self._removed):
+            return
+        for key in self._changed:
+            _write_atomic(self._graph_file(key), self.scripts[key].dump())
+        for key in self._removed:
+            self._graph_file(key).unlink(missing_ok=True)
+        data = json.dumps({"version": INDEX_VERSION, "scripts": self._entries}, ensure_ascii=False)
+        _write_atomic(self.path / "index.json", data)
+        self._changed, self._removed = [], []
+
+
+def index(categories: Iterable[str] = registry.CATEGORIES, path: Optional[Path] = DEFAULT_INDEX) -> List[ScriptGraphs]:
+    """增量更新索引缓存并返回全部脚本的解析结果。"""
+    idx = Index(path)
+    scripts = idx.update(list(categories))
+    idx.save()
+    return scripts
+
+
+def statistics(graphs: Sequence[Graph]) -> Dict[str, int]:
+    """节点、集群、连线、带标签连线数与最大集群嵌套深度。"""
+    stats = Counter()
+    for graph in graphs:
+        stats["nodes"] += len(graph.nodes)
+        stats["clusters"] += len(graph.clusters)
+        stats["edges"] += len(graph.edges)
+        stats["labelled"] += sum(1 for e in graph.edges if e.label)
+        for cluster in graph.clusters.values():
+            depth, parent = 1, cluster.parent
+            while parent is not None:
+                depth, parent = depth + 1, graph.clusters[parent].parent
+            stats["depth"] = max(stats["depth"], depth)
+    return dict(stats)
+
+
+def search(graphs: Sequence[Graph], text: str) -> List[str]:
+    """返回标签包含 text 的节点、集群与连线的描述。"""
+    hits = []
+    for graph in graphs:
+        for cluster in graph.clusters.values():
+            if text in cluster.label:
+                hits.append(f"集群 {cluster.label}（第 {cluster.line} 行）")
+        for node in graph.nodes.values():
+            if text in node.label:
+                hits.append(f"节点 {node.label} [{node.kind.rsplit('.', 1)[-1]}]（第 {node.line} 行）")
+        for edge in graph.edges:
+            if text in edge.label:
+                tail, head = graph.nodes[edge.tail].label, graph.nodes[edge.head].label
+                hits.append(f"连线 {tail} -> {head}：{edge.label}（第 {edge.line} 行）")
+    return hits
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("targets", nargs="*", help="分类、脚本名、输出文件名或标签；为空时选择全部")
+    parser.add_argument(
+        "-c", "--category", action="append", choices=registry.CATEGORIES, help="只在指定分类中选择，可重复指定"
+    )
+    parser.add_argument("--find", metavar="TEXT", help="搜索标签包含 TEXT 的节点、集群与连线")
+    parser.add_argument("--lint", action="store_true", help="对解析出的图做结构校验，有错误时以失败退出")
+    parser.add_argument("--json", type=Path, metavar="FILE", help="把解析出的图写入 JSON 文件")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX, help="索引缓存目录")
+    parser.add_argument("--no-index", action="store_true", help="不读写索引缓存，重新解析全部脚本")
+
+
+def run(args: argparse.Namespace) -> int:
+    """`graph` 子命令：列出各图表的规模，或按 --find / --lint / --json 处理。"""
+    start = time.perf_counter()
+    idx = Index(None if args.no_index else args.index)
+    scripts = idx.update(args.category or registry.CATEGORIES)
+    idx.save()
+    elapsed = time.perf_counter() - start
+    scripts_of = {t.name: s for s in scripts for t in s.targets}
+    targets = registry.select([t for s in scripts for t in s.targets], args.targets)
+    failed = 0
+    for script in scripts:
+        if script.error:
+            failed += 1
+            print(f"{'FAIL':<6} {script.category}/{script.path.name}\n       {script.error}")
+    for target in targets:
+        script = scripts_of[target.name]
+        if args.find:
+            for hit in search(script.graphs(target), args.find):
+                print(f"{target.name}: {hit}")
+            continue
+        errors, warnings = [], []
+        if args.lint:
+            for graph in script.graphs(target) or [Graph("", target.filename)]:
+                e, w = lint(graph)
+                errors += e
+                warnings += w
+            failed += bool(errors)
+        if not args.lint or errors or warnings:
+            stats = script.stats[target.name]
+            print(
+                f"{stats.get('nodes', 0):5d} 节点 {stats.get('edges', 0):5d} 连线 "
+                f"{stats.get('clusters', 0):4d} 集群 {stats.get('depth', 0):2d} 层  {target.name}"
+            )
+            for message in errors + warnings:
+                print(f"       {message}")
+    if args.json:
+        data = {t.name: [g.to_dict() for g in scripts_of[t.name].graphs(t)] for t in targets}
+        args.json.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"共 {len(targets)} 张，重新解析 {idx.parsed} 个脚本（{elapsed * 1000:.1f} ms）")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    # 无需 diagrams 与 Graphviz：python3 -m diagramkit.static [分类/脚本...]
+    parser = argparse.ArgumentParser(prog="diagramkit.static", description="静态解析图表脚本的图结构")
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
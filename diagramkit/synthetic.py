@@ -0,0 +1,377 @@
+"""参数化的合成大图，用于测量 Graphviz 布局随规模的变化。
+
+图的形状模仿 `data_intensive_system` 和各公司技术栈：若干顶层集群作为
+“层”，层内按给定深度继续嵌套子集群，节点放在最内层集群中；边大多从
+一层指向下一层，少部分留在同一集群内，目标节点按 Zipf 分布挑选，
+形成少数高入度的枢纽节点（网关、Kafka、主库之类）。图完全通过脚本
+使用的 `Diagram`/`Cluster`/`Edge` API 构建。
+
+`sweep` 在独立子进程中依次渲染不同规模的图，记录布局耗时与 dot 的
+峰值内存，拟合耗时随节点数增长的幂次，并找出布局超过给定时长的规模。
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from diagrams import Cluster, Diagram, Edge
+from diagrams.onprem.compute import Server
+from diagrams.onprem.database import PostgreSQL
+from diagrams.onprem.inmemory import Redis
+from diagrams.onprem.monitoring import Prometheus
+from diagrams.onprem.network import Nginx
+from diagrams.onprem.queue import Kafka
+
+from diagramkit import trace
+from diagramkit.graph import Cluster as GraphCluster
+from diagramkit.graph import Edge as GraphEdge
+from diagramkit.graph import Graph, Node, stable_id
+from diagramkit.registry import ROOT
+from diagramkit.render import install, render_graph
+
+DEFAULT_SIZES = (50, 100, 200, 500, 1000, 2000, 5000)
+
+_PALETTE = (Server, Server, Server, PostgreSQL, Redis, Kafka, Nginx, Prometheus)
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    """合成图的参数。
+
+    :param nodes: 节点数。
+    :param depth: 集群嵌套深度，1 表示只有顶层集群，0 表示没有集群。
+    :param branching: 每个集群的子集群数。
+    :param cluster_size: 每个最内层集群的平均节点数。
+    :param fan_out: 每个节点的平均出度（泊松分布）。
+    :param skew: 目标节点 Zipf 分布的指数，越大入度越集中在少数枢纽上。
+    :param locality: 边留在同一最内层集群内的比例，其余指向下一层。
+    :param labelled: 带标签的边的比例。
+    :param direction: 图的方向。
+    :param seed: 随机种子，相同参数总是得到相同的图。
+    """
+
+    nodes: int = 200
+    depth: int = 2
+    branching: int = 3
+    cluster_size: int = 6
+    fan_out: float = 1.5
+    skew: float = 1.1
+    locality: float = 0.25
+    labelled: float = 0.3
+    direction: str = "LR"
+    seed: int = 0
+
+
+@dataclass
+class _Cluster:
+    label: str
+    children: List["_Cluster"]
+    nodes: List[int]
+
+
+@dataclass
+class GraphPlan:
+    """与 diagrams 无关的图结构：集群树、节点所在层和边列表。"""
+
+    spec: GraphSpec
+    roots: List[_Cluster]
+    loose: List[int]
+    edges: List[tuple]
+
+    @property
+    def clusters(self) -> int:
+        stack, count = list(self.roots), 0
+        while stack:
+            cluster = stack.pop()
+            count += 1
+            stack.extend(cluster.children)
+        return count
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    limit, k, p = math.exp(-mean), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def plan(spec: GraphSpec) -> GraphPlan:
+    """按 spec 生成图结构。"""
+    rng = random.Random(spec.seed)
+    if spec.depth <= 0:
+        leaves_needed = 0
+        layers = 1
+    else:
+        leaves_needed = max(1, math.ceil(spec.nodes / spec.cluster_size))
+        layers = max(1, math.ceil(leaves_needed / spec.branching ** (spec.depth - 1)))
+
+    leaves: List[_Cluster] = []
+    leaf_layer: List[int] = []
+
+    def grow(label: str, level: int, layer: int) -> _Cluster:
+        cluster = _Cluster(label, [], [])
+        if level == spec.depth:
+            leaves.append(cluster)
+            leaf_layer.append(layer)
+        else:
+            for i in range(spec.branching):
+                if len(leaves) >= leaves_needed:
+                    break
+                cluster.children.append(grow(f"{label}.{i + 1}", level + 1, layer))
+        return cluster
+
+    roots = []
+    for layer in range(layers if spec.depth > 0 else 0):
+        if len(leaves) >= leaves_needed:
+            break
+        roots.append(grow(f"层 {layer + 1}", 1, layer))
+
+    # 节点依次放进最内层集群；没有集群时全部作为散点，归为同一层
+    layer_of: List[int] = []
+    home: List[Optional[_Cluster]] = []
+    for node in range(spec.nodes):
+        if leaves:
+            index = node * len(leaves) // spec.nodes
+            leaves[index].nodes.append(node)
+            layer_of.append(leaf_layer[index])
+            home.append(leaves[index])
+        else:
+            layer_of.append(0)
+            home.append(None)
+    loose = [] if leaves else list(range(spec.nodes))
+
+    by_layer: Dict[int, List[int]] = {}
+    for node, layer in enumerate(layer_of):
+        by_layer.setdefault(layer, []).append(node)
+    # 每层预先算好累积权重，挑选目标节点是 O(log n)
+    cumulative = {
+        layer: list(itertools.accumulate(1 / (rank + 1) ** spec.skew for rank in range(len(members))))
+        for layer, members in by_layer.items()
+    }
+    last_layer = max(by_layer)
+
+    edges = []
+    for node in range(spec.nodes):
+        for _ in range(_poisson(rng, spec.fan_out)):
+            cluster = home[node]
+            if cluster is not None and len(cluster.nodes) > 1 and rng.random() < spec.locality:
+                target = rng.choice(cluster.nodes)
+            else:
+                layer = layer_of[node] + 1 if layer_of[node] < last_layer else layer_of[node]
+                target = rng.choices(by_layer[layer], cum_weights=cumulative[layer])[0]
+            if target == node:
+                continue
+            label = f"调用 {len(edges) + 1}" if rng.random() < spec.labelled else None
+            edges.append((node, target, label))
+    return GraphPlan(spec, roots, loose, edges)
+
+
+def create_synthetic_diagram(spec: GraphSpec, filename: str, outformat: Sequence[str] = ("svg",)) -> GraphPlan:
+    """用 diagrams API 构建并渲染 spec 描述的图，返回其结构。"""
+    graph = plan(spec)
+    created = {}
+
+    def add(node: int) -> None:
+        kind = _PALETTE[node % len(_PALETTE)]
+        created[node] = kind(f"{kind.__name__} {node + 1}")
+
+    def enter(cluster: _Cluster) -> None:
+        with Cluster(cluster.label):
+            for node in cluster.nodes:
+                add(node)
+            for child in cluster.children:
+                enter(child)
+
+    title = f"合成图 {spec.nodes} 节点"
+    with Diagram(title, filename=filename, show=False, outformat=list(outformat), direction=spec.direction):
+        for node in graph.loose:
+            add(node)
+        for cluster in graph.roots:
+            enter(cluster)
+        for tail, head, label in graph.edges:
+            created[tail] >> (Edge(label=label) if label else Edge()) >> created[head]
+    return graph
+
+
+def synthetic_graph(spec: GraphSpec) -> Tuple[Graph, GraphPlan]:
+    """不经 diagrams 对象，直接构建与 `create_synthetic_diagram` 相同的中间表示。"""
+    kinds = [f"{kind.__module__}.{kind.__name__}" for kind in _PALETTE]
+    structure = plan(spec)
+    graph = Graph(f"合成图 {spec.nodes} 节点", "synthetic", spec.direction)
+    counter: Counter = Counter()
+    created: Dict[int, str] = {}
+
+    def add(node: int, cluster: Optional[str], path: List[str]) -> None:
+        kind = kinds[node % len(kinds)]
+        label = f"{kind.rsplit('.', 1)[1]} {node + 1}"
+        created[node] = graph.add_node(Node(stable_id(counter, "n", path, label), label, kind, cluster)).id
+
+    def enter(cluster: _Cluster, parent: Optional[str], path: List[str]) -> None:
+        clusterid = stable_id(counter, "cluster", path, cluster.label)
+        inner = path + [cluster.label]
+        for node in cluster.nodes:
+            add(node, clusterid, inner)
+        for child in cluster.children:
+            enter(child, clusterid, inner)
+        graph.add_cluster(GraphCluster(clusterid, cluster.label, parent))
+
+    for node in structure.loose:
+        add(node, None, [])
+    for cluster in structure.roots:
+        enter(cluster, None, [])
+    for tail, head, label in structure.edges:
+        attrs = {"label": label, "dir": "forward"} if label else {"dir": "forward"}
+        graph.add_edge(GraphEdge(created[tail], created[head], attrs))
+    return graph, structure
+
+
+def measure(spec: GraphSpec, formats: Sequence[str] = ("svg",), direct: bool = False) -> dict:
+    """在当前进程中构建并渲染一张合成图，返回规模与各阶段耗时、内存。
+
+    direct 为真时不经 diagrams 对象，由中间表示直接生成 DOT。
+    """
+    install(tracing=True)
+    tracer = trace.active()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        if direct:
+            with trace.span("construct"):
+                ir, graph = synthetic_graph(spec)
+            render_graph(ir, str(Path(tmp) / "synthetic"), formats)
+        else:
+            graph = create_synthetic_diagram(spec, str(Path(tmp) / "synthetic"), formats)
+        total = time.perf_counter() - start
+    spans = tracer.drain()
+
+    def phase(prefix: str) -> float:
+        return sum(s["wall"] for s in spans if s["name"].startswith(prefix))
+
+    layout_rss = max((s["peak_rss_kb"] for s in spans if s["name"] == "layout"), default=0)
+    return {
+        "nodes": spec.nodes,
+        "edges": len(graph.edges),
+        "clusters": graph.clusters,
+        "construct_s": phase("construct") / 1e6,
+        "serialize_s": phase("serialize") / 1e6,
+        "layout_s": phase("layout") / 1e6,
+        "render_s": phase("render:") / 1e6,
+        "total_s": total,
+        "dot_rss_mb": layout_rss / 1024,
+        "python_rss_mb": max((s["peak_rss_kb"] for s in spans if s["name"] == "construct"), default=0) / 1024,
+    }
+
+
+def _measure_in_child(spec: GraphSpec, formats: Sequence[str], timeout: float, direct: bool = False) -> Optional[dict]:
+    """在子进程中测量，超时返回 None。子进程自成进程组，超时时连同 dot 一起终止。"""
+    cmd = [sys.executable, "-m", "diagramkit.synthetic", json.dumps(asdict(spec)), *formats]
+    if direct:
+        cmd.append("--direct")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, cwd=ROOT, start_new_session=True)
+    try:
+        out, _ = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.communicate()
+        return None
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return json.loads(out)
+
+
+def scaling_exponent(rows: Sequence[dict], key: str = "layout_s") -> Optional[float]:
+    """对 log(耗时) ~ log(节点数) 做最小二乘，返回斜率（耗时约为 n 的几次方）。"""
+    points = [(math.log(r["nodes"]), math.log(r[key])) for r in rows if r and r[key] > 0]
+    if len(points) < 2:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    var = sum((x - mx) ** 2 for x, _ in points)
+    return sum((x - mx) * (y - my) for x, y in points) / var if var else None
+
+
+def sweep(
+    spec: GraphSpec,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    formats: Sequence[str] = ("svg",),
+    repeat: int = 1,
+    timeout: float = 300,
+    direct: bool = False,
+) -> List[dict]:
+    """按 sizes 逐个测量（每个规模取 repeat 次中布局最快的一次），逐行打印。
+
+    某个规模超时后不再尝试更大的规模，结果中该规模记为 timeout。
+    """
+    rows = []
+    print(
+        f"{'nodes':>7} {'edges':>7} {'clusters':>8} {'build s':>8} {'layout s':>9} {'render s':>9} "
+        f"{'dot MB':>8} {'py MB':>7}"
+    )
+    for size in sizes:
+        sized = replace(spec, nodes=size)
+        runs = [_measure_in_child(sized, formats, timeout, direct) for _ in range(repeat)]
+        if any(r is None for r in runs):
+            rows.append({"nodes": size, "timeout": timeout})
+            print(f"{size:7d} {'':7} {'':8} {'':8} {'timeout':>9}  (> {timeout:.0f}s)", flush=True)
+            break
+        best = min(runs, key=lambda r: r["layout_s"])
+        rows.append(best)
+        print(
+            f"{best['nodes']:7d} {best['edges']:7d} {best['clusters']:8d} "
+            f"{best['construct_s'] + best['serialize_s']:8.2f} {best['layout_s']:9.2f} "
+            f"{best['render_s']:9.2f} {best['dot_rss_mb']:8.1f} {best['python_rss_mb']:7.1f}",
+            flush=True,
+        )
+    return rows
+
+
+def chart(rows: Sequence[dict], key: str, unit: str, width: int = 50) -> str:
+    """以节点数为纵轴、key 为横向条形（对数刻度）的文本图。"""
+    values = [r[key] for r in rows if key in r and r[key] > 0]
+    if not values:
+        return ""
+    low, high = math.log10(min(values)), math.log10(max(values))
+    span = (high - low) or 1
+    lines = [f"{key}（{unit}，对数刻度）"]
+    for row in rows:
+        if "timeout" in row:
+            lines.append(f"{row['nodes']:7d} | {'>' * width} timeout")
+        elif row[key] > 0:
+            bar = 1 + round((math.log10(row[key]) - low) / span * (width - 1))
+            lines.append(f"{row['nodes']:7d} | {'#' * bar} {row[key]:.2f}")
+    return "\n".join(lines) + "\n"
+
+
+def impractical_size(rows: Sequence[dict], limit: float) -> Optional[int]:
+    """第一个布局耗时超过 limit 秒（或超时）的规模。"""
+    for row in rows:
+        if "timeout" in row or row["layout_s"] > limit:
+            return row["nodes"]
+    return None
+
+
+def _child_main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m diagramkit.synthetic")
+    parser.add_argument("spec", help="GraphSpec 的 JSON")
+    parser.add_argument("formats", nargs="*", default=["svg"])
+    parser.add_argument("--direct", action="store_true")
+    args = parser.parse_args(argv)
+    result = measure(GraphSpec(**json.loads(args.spec)), args.formats, args.direct)
+    json.dump(result, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_child_main(sys.argv[1:]))
@@ -0,0 +1,246 @@
+"""连线集合上的可达性与环路分析。
+
+有向图先按强连通分量缩成无环图，每个分量的可达集合用 Python 整数做
+位集：按拓扑序逆序把后继的位集按位或起来，整张图只需 O(E) 次位运算。
+仍然成环的分量内用 Eades–Lin–Smyth 启发式选出反馈连线，另外按 dot 的
+做法分层。本模块只依赖标准库，供布局前的改写（`diagramkit.passes`）
+与分块布局（`diagramkit.split`）使用。
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+Pair = Tuple[Hashable, Hashable]
+
+
+def successors(pairs: Iterable[Pair]) -> Dict[Hashable, List[Hashable]]:
+    """邻接表；只作为终点出现的节点也有一个空列表。"""
+    succ: Dict[Hashable, List[Hashable]] = {}
+    for tail, head in pairs:
+        succ.setdefault(tail, []).append(head)
+        succ.setdefault(head, [])
+    return succ
+
+
+def strongly_connected(succ: Dict[Hashable, Sequence[Hashable]]) -> List[List[Hashable]]:
+    """Tarjan 算法（非递归），返回各强连通分量，次序为缩点图的逆拓扑序。"""
+    index: Dict[Hashable, int] = {}
+    low: Dict[Hashable, int] = {}
+    stack: List[Hashable] = []
+    on_stack = set()
+    components = []
+    for root in succ:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                index[node] = low[node] = len(index)
+                stack.append(node)
+                on_stack.add(node)
+            children = succ[node]
+            while i < len(children) and children[i] in index:
+                child = children[i]
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+                i += 1
+            if i < len(children):
+                work.append((node, i + 1))
+                work.append((children[i], 0))
+                continue
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return components
+
+
+def redundant(pairs: Sequence[Pair]) -> List[int]:
+    """返回可由其他路径推出的连线的下标，即传递约简中可以去掉的连线。
+
+    只比较不同强连通分量之间的连线：u -> v 可去掉，当且仅当 u 所在
+    分量经由另一个后继分量也能到达 v 所在分量。同时去掉全部这些连线
+    不改变任何两点间的可达性；环内的连线与平行的重复连线都保留。
+    """
+    succ = successors(pairs)
+    components = strongly_connected(succ)
+    component = {node: i for i, members in enumerate(components) for node in members}
+    heads: List[set] = [set() for _ in components]
+    for tail, head in pairs:
+        a, b = component[tail], component[head]
+        if a != b:
+            heads[a].add(b)
+    # Tarjan 按逆拓扑序给出分量，后继分量的下标总是更小
+    reach = [0] * len(components)
+    via = [0] * len(components)
+    for c in range(len(components)):
+        for h in heads[c]:
+            via[c] |= reach[h]
+            reach[c] |= reach[h] | (1 << h)
+    result = []
+    for i, (tail, head) in enumerate(pairs):
+        a, b = component[tail], component[head]
+        if a != b and via[a] >> b & 1:
+            result.append(i)
+    return result
+
+
+def witness(pairs: Sequence[Pair], skip: int) -> Optional[List[Hashable]]:
+    """不经过第 skip 条连线、从其起点到终点的一条最短路径，用于报告。"""
+    tail, head = pairs[skip]
+    succ: Dict[Hashable, List[Hashable]] = {}
+    for i, (a, b) in enumerate(pairs):
+        if i != skip:
+            succ.setdefault(a, []).append(b)
+    parent: Dict[Hashable, Hashable] = {tail: tail}
+    queue = deque([tail])
+    while queue:
+        node = queue.popleft()
+        for child in succ.get(node, ()):
+            if child in parent:
+                continue
+            parent[child] = node
+            if child == head:
+                path = [head]
+                while path[-1] != tail:
+                    path.append(parent[path[-1]])
+                return path[::-1]
+            queue.append(child)
+    return None
+
+
+def _arrangement(nodes: Sequence[Hashable], pairs: Sequence[Pair]) -> Dict[Hashable, int]:
+    """Eades–Lin–Smyth 启发式：给强连通分量内的节点排一个线性次序，
+    使逆着次序的连线尽量少。同分时按节点在 nodes 中的次序取。"""
+    out_deg = dict.fromkeys(nodes, 0)
+    in_deg = dict.fromkeys(nodes, 0)
+    succ: Dict[Hashable, List[Hashable]] = {node: [] for node in nodes}
+    pred: Dict[Hashable, List[Hashable]] = {node: [] for node in nodes}
+    for tail, head in pairs:
+        out_deg[tail] += 1
+        in_deg[head] += 1
+        succ[tail].append(head)
+        pred[head].append(tail)
+    remaining = dict.fromkeys(nodes)
+    left: List[Hashable] = []
+    right: List[Hashable] = []
+
+    def remove(node: Hashable) -> None:
+        del remaining[node]
+        for head in succ[node]:
+            if head in remaining:
+                in_deg[head] -= 1
+        for tail in pred[node]:
+            if tail in remaining:
+                out_deg[tail] -= 1
+
+    while remaining:
+        changed = True
+        while changed:
+            changed = False
+            for node in list(remaining):
+                if node not in remaining:
+                    continue
+                if out_deg[node] == 0:
+                    right.append(node)
+                    remove(node)
+                    changed = True
+                elif in_deg[node] == 0:
+                    left.append(node)
+                    remove(node)
+                    changed = True
+        if remaining:
+            node = max(remaining, key=lambda n: out_deg[n] - in_deg[n])
+            left.append(node)
+            remove(node)
+    order = left + right[::-1]
+    return {node: i for i, node in enumerate(order)}
+
+
+def feedback(pairs: Sequence[Pair], preferred: Iterable[int] = ()) -> List[int]:
+    """返回一组反馈连线的下标：去掉（或不让它们参与分层）之后图中不再有环。
+
+    preferred 中在环上的连线（例如标签写明是反馈的）优先入选；其余的
+    在每个仍然成环的强连通分量内用 Eades–Lin–Smyth 启发式选出。自环
+    不计入。
+    """
+    components = strongly_connected(successors(pairs))
+    component = {node: i for i, members in enumerate(components) for node in members}
+    chosen = {k for k in preferred if pairs[k][0] != pairs[k][1] and component[pairs[k][0]] == component[pairs[k][1]]}
+    rest = [k for k, (tail, head) in enumerate(pairs) if k not in chosen and tail != head]
+    first = {}
+    for tail, head in pairs:
+        first.setdefault(tail, len(first))
+        first.setdefault(head, len(first))
+    for members in strongly_connected(successors(pairs[k] for k in rest)):
+        if len(members) < 2:
+            continue
+        inside = set(members)
+        internal = [k for k in rest if pairs[k][0] in inside and pairs[k][1] in inside]
+        order = _arrangement(sorted(members, key=first.get), [pairs[k] for k in internal])
+        chosen.update(k for k in internal if order[pairs[k][0]] > order[pairs[k][1]])
+    return sorted(chosen)
+
+
+def layers(pairs: Sequence[Pair], order: Sequence[Hashable] = ()) -> Dict[Hashable, int]:
+    """像 dot 一样分层：按节点的声明次序深度优先反转回边，再按最长路径
+    给每个节点分层。order 中没有连线的节点在第 0 层。
+
+    :param order: 节点的声明次序；不在其中的节点排在后面。
+    """
+    succ = successors(pairs)
+    for node in order:
+        succ.setdefault(node, [])
+    state: Dict[Hashable, int] = {}
+    acyclic: Dict[Hashable, List[Hashable]] = {node: [] for node in succ}
+    for root in [*(node for node in order if node in succ), *succ]:
+        if root in state:
+            continue
+        state[root] = 1
+        work = [(root, iter(succ[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if state.get(child) == 1:
+                    # 回边：反转后参与分层
+                    if child != node:
+                        acyclic[child].append(node)
+                    continue
+                acyclic[node].append(child)
+                if child not in state:
+                    state[child] = 1
+                    work.append((child, iter(succ[child])))
+                    break
+            else:
+                state[node] = 2
+                work.pop()
+    in_deg = dict.fromkeys(acyclic, 0)
+    for children in acyclic.values():
+        for child in children:
+            in_deg[child] += 1
+    rank = dict.fromkeys(acyclic, 0)
+    queue = deque(node for node, degree in in_deg.items() if degree == 0)
+    while queue:
+        node = queue.popleft()
+        for child in acyclic[node]:
+            rank[child] = max(rank[child], rank[node] + 1)
+            in_deg[child] -= 1
+            if in_deg[child] == 0:
+                queue.append(child)
+    return rank
+
+
+def ranks(pairs: Sequence[Pair], order: Sequence[Hashable] = ()) -> int:
+    """估计 dot 的分层数（见 `layers`），只计出现在连线中的节点。"""
+    succ = successors(pairs)
+    rank = layers(pairs, [node for node in order if node in succ])
+    return max(rank.values()) + 1 if rank else 0
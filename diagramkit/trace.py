@@ -0,0 +1,165 @@
+"""分阶段的构建计时与 Chrome trace 导出。
+
+一次渲染被拆成若干 span：导入脚本（import）、`with Diagram(...)` 内的建图
+（construct）、DOT 序列化（serialize）、Graphviz 布局（layout）以及每种格式的
+输出（render:<fmt>）。每个 span 记录墙钟时间、CPU 时间和峰值 RSS；Graphviz
+子进程的 CPU 与 RSS 取自该子进程自身的 rusage，Python 阶段的峰值 RSS 是
+当前进程截至该阶段结束时的峰值。
+
+结果可导出为 Chrome/Perfetto 可读的 trace JSON，并生成按耗时排序的文本汇总。
+"""
+
+import contextlib
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+def _maxrss_kb(usage: resource.struct_rusage) -> int:
+    # macOS 的 ru_maxrss 以字节为单位，Linux 以 KB 为单位
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+@dataclass
+class Span:
+    """一个计时区间。start 为 `time.perf_counter_ns()` 的微秒值。"""
+
+    name: str
+    diagram: str
+    start: float
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_rss_kb: int = 0
+    pid: int = field(default_factory=os.getpid)
+    tid: int = field(default_factory=threading.get_ident)
+    child: bool = False
+
+
+class Tracer:
+    """收集当前进程的 span。"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self.diagram = ""
+        self._open: List[Span] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str, diagram: Optional[str] = None) -> Iterator[Span]:
+        span = Span(name, diagram if diagram is not None else self.diagram, time.perf_counter_ns() / 1000)
+        cpu = time.process_time()
+        self._open.append(span)
+        try:
+            yield span
+        finally:
+            self._open.pop()
+            span.wall = time.perf_counter_ns() / 1000 - span.start
+            if not span.child:
+                span.cpu = (time.process_time() - cpu) * 1e6
+                span.peak_rss_kb = _maxrss_kb(resource.getrusage(resource.RUSAGE_SELF))
+            self.spans.append(span)
+
+    def attach_child(self, usage: resource.struct_rusage) -> None:
+        """把子进程的 rusage 记到最内层的 span 上。"""
+        if not self._open:
+            return
+        span = self._open[-1]
+        span.child = True
+        span.cpu += (usage.ru_utime + usage.ru_stime) * 1e6
+        span.peak_rss_kb = max(span.peak_rss_kb, _maxrss_kb(usage))
+
+    def record(self, name: str, start: float, cpu_start: float, diagram: Optional[str] = None) -> Span:
+        """记录一个从 (start, cpu_start) 开始、到现在结束的 span。"""
+        span = Span(name, diagram if diagram is not None else self.diagram, start)
+        span.wall = time.perf_counter_ns() / 1000 - start
+        span.cpu = (time.process_time() - cpu_start) * 1e6
+        span.peak_rss_kb = _maxrss_kb(resource.getrusage(resource.RUSAGE_SELF))
+        self.spans.append(span)
+        return span
+
+    def drain(self) -> List[dict]:
+        """取出并清空已记录的 span（用于从 worker 进程传回）。"""
+        spans = [asdict(s) for s in self.spans]
+        self.spans = []
+        return spans
+
+
+def chrome_trace(spans: Sequence[dict]) -> dict:
+    """生成 Chrome/Perfetto trace（complete event，时间单位为微秒）。"""
+    origin = min((s["start"] for s in spans), default=0)
+    events = []
+    for s in spans:
+        events.append({
+            "name": s["name"],
+            "cat": s["name"].split(":")[0],
+            "ph": "X",
+            "ts": round(s["start"] - origin, 3),
+            "dur": round(s["wall"], 3),
+            "pid": s["pid"],
+            "tid": s["tid"],
+            "args": {
+                "diagram": s["diagram"],
+                "cpu_ms": round(s["cpu"] / 1000, 3),
+                "peak_rss_mb": round(s["peak_rss_kb"] / 1024, 1),
+            },
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summary(spans: Sequence[dict]) -> str:
+    """按阶段汇总并按墙钟时间降序排列的文本报告。"""
+    phases: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    for s in spans:
+        row = phases[s["name"]]
+        row[0] += s["wall"]
+        row[1] += s["cpu"]
+        row[2] = max(row[2], s["peak_rss_kb"])
+    lines = [f"{'phase':<16} {'wall ms':>10} {'cpu ms':>10} {'peak MB':>8}"]
+    for name, (wall, cpu, rss) in sorted(phases.items(), key=lambda item: -item[1][0]):
+        lines.append(f"{name:<16} {wall / 1000:10.1f} {cpu / 1000:10.1f} {rss / 1024:8.1f}")
+    lines.append("")
+    lines.append(f"{'diagram':<56} {'phase':<16} {'wall ms':>10} {'cpu ms':>10} {'peak MB':>8}")
+    for s in sorted(spans, key=lambda s: -s["wall"]):
+        lines.append(
+            f"{s['diagram']:<56} {s['name']:<16} {s['wall'] / 1000:10.1f} "
+            f"{s['cpu'] / 1000:10.1f} {s['peak_rss_kb'] / 1024:8.1f}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def write(spans: Sequence[dict], path: Path) -> Path:
+    """写出 trace JSON 与同名 .txt 汇总，返回汇总文件路径。"""
+    path = Path(path)
+    path.write_text(json.dumps(chrome_trace(spans), ensure_ascii=False), encoding="utf-8")
+    text_path = path.with_suffix(".txt")
+    text_path.write_text(summary(spans), encoding="utf-8")
+    return text_path
+
+
+_active: Optional[Tracer] = None
+
+
+def activate(tracer: Optional[Tracer]) -> None:
+    """设置当前进程使用的 tracer；传入 None 关闭计时。"""
+    global _active
+    _active = tracer
+
+
+def active() -> Optional[Tracer]:
+    return _active
+
+
+@contextlib.contextmanager
+def span(name: str, diagram: Optional[str] = None) -> Iterator[Optional[Span]]:
+    """未启用计时时为空操作的 `Tracer.span`。"""
+    if _active is None:
+        yield None
+    else:
+        with _active.span(name, diagram) as s:
+            yield s
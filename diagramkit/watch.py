@@ -0,0 +1,290 @@
+"""监视图表脚本并即时重新渲染。
+
+常驻进程启动时导入全部脚本并加载好 `diagrams`，之后轮询四个分类目录，
+某个脚本被修改时只重新导入这一个模块，先借助布局缓存渲染一张低分辨率
+PNG 预览并推送到本地的实时刷新页面，再按需渲染正式的输出文件。片段库
+（`fragments/`）中的文件被修改时重新导入它，并重新渲染用到其中片段的
+图表。
+
+实时刷新页面由标准库的 HTTP 服务提供，浏览器通过 Server-Sent Events
+接收更新通知，无需任何额外依赖。
+"""
+
+import html
+import json
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from diagramkit import engines, fragments, passes, registry, static
+from diagramkit.layout import DEFAULT_LAYOUT_CACHE_DIR, LayoutCache
+from diagramkit.registry import FRAGMENT_DIR, ROOT, Target
+from diagramkit.render import graph_overrides, install
+
+DEFAULT_PREVIEW_DIR = ROOT / ".preview"
+DEFAULT_PORT = 8765
+PREVIEW_DPI = 48
+
+_PAGE = """<!doctype html>
+<html lang="zh">
+<meta charset="utf-8">
+<title>diagramkit watch</title>
+<style>
+body { font-family: sans-serif; margin: 1em; }
+figure { margin: 0 0 2em; }
+figcaption { font-weight: bold; margin-bottom: .5em; }
+pre { color: #b00; white-space: pre-wrap; }
+img { max-width: 100%%; border: 1px solid #ddd; }
+</style>
+<p id="status">等待脚本修改……</p>
+<div id="diagrams">%s</div>
+<script>
+function figure(name) {
+  let fig = document.getElementById(name);
+  if (!fig) {
+    fig = document.createElement("figure");
+    fig.id = name;
+    fig.innerHTML = "<figcaption></figcaption><img><pre></pre>";
+    fig.querySelector("figcaption").textContent = name;
+  }
+  document.getElementById("diagrams").prepend(fig);
+  return fig;
+}
+const events = new EventSource("/events");
+events.onmessage = (message) => {
+  const event = JSON.parse(message.data);
+  const fig = figure(event.name);
+  fig.querySelector("pre").textContent = event.error || "";
+  if (event.image) fig.querySelector("img").src = event.image + "?v=" + event.version;
+  document.getElementById("status").textContent = event.status;
+};
+</script>
+</html>
+"""
+
+
+class Snapshot:
+    """按修改时间与大小检测脚本与片段变化的轮询器。"""
+
+    def __init__(self, categories: Iterable[str]):
+        self.categories = list(categories)
+        self.state = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        state = {}
+        directories = [ROOT / category for category in self.categories] + [FRAGMENT_DIR]
+        for directory in directories:
+            for path in directory.glob("*.py"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def changed(self) -> List[Path]:
+        """返回上次调用以来新增或修改过的脚本。"""
+        state = self._scan()
+        changed = [p for p, sig in state.items() if self.state.get(p) != sig]
+        self.state = state
+        return sorted(changed)
+
+
+class LiveReloadServer(ThreadingHTTPServer):
+    """提供预览页面、预览图片和 Server-Sent Events 更新流。"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int, preview_dir: Path):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.preview_dir = preview_dir
+        self.events: List[dict] = []
+        self.latest: Dict[str, dict] = {}
+        self.condition = threading.Condition()
+
+    def publish(self, event: dict) -> None:
+        with self.condition:
+            event["version"] = len(self.events) + 1
+            self.events.append(event)
+            self.latest[event["name"]] = event
+            self.condition.notify_all()
+
+    def wait(self, seen: int, timeout: float = 15) -> List[dict]:
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.events) > seen, timeout=timeout)
+            return self.events[seen:]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: LiveReloadServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/":
+            self._page()
+        elif path == "/events":
+            self._events()
+        elif path.startswith("/preview/"):
+            self._preview(path[len("/preview/"):])
+        else:
+            self.send_error(404)
+
+    def _page(self) -> None:
+        figures = []
+        for name, event in reversed(list(self.server.latest.items())):
+            image = f'<img src="{html.escape(event["image"])}?v={event["version"]}">' if event.get("image") else ""
+            figures.append(
+                f'<figure id="{html.escape(name)}"><figcaption>{html.escape(name)}</figcaption>'
+                f'{image or "<img>"}<pre>{html.escape(event.get("error", ""))}</pre></figure>'
+            )
+        body = (_PAGE % "".join(figures)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _preview(self, relative: str) -> None:
+        root = self.server.preview_dir.resolve()
+        path = (root / relative).resolve()
+        if root not in path.parents or not path.is_file():
+            self.send_error(404)
+            return
+        data = path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _events(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        seen = len(self.server.events)
+        try:
+            while True:
+                events = self.server.wait(seen)
+                seen += len(events)
+                # 没有新事件时发送注释行保持连接
+                payload = "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events) or ": ping\n\n"
+                self.wfile.write(payload.encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def render_preview(target: Target, preview_dir: Path, dpi: int = PREVIEW_DPI) -> Path:
+    """把 target 渲染为低分辨率 PNG 预览，返回预览文件路径。"""
+    output = preview_dir / target.category / target.filename
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with graph_overrides(dpi=str(dpi)):
+        registry.function(target)(filename=str(output), outformat=["png"])
+    return output.with_suffix(".png")
+
+
+def watch(
+    categories: Sequence[str] = registry.CATEGORIES,
+    patterns: Sequence[str] = (),
+    port: Optional[int] = DEFAULT_PORT,
+    formats: Sequence[str] = ("png", "pdf"),
+    preview_only: bool = False,
+    interval: float = 0.2,
+    preview_dir: Path = DEFAULT_PREVIEW_DIR,
+    dpi: int = PREVIEW_DPI,
+) -> None:
+    """监视 categories 中的脚本，修改后只重新导入该脚本并渲染它的图表。
+
+    patterns 非空时只渲染匹配的图表，并在启动时先渲染一遍。port 为 None
+    时不启动实时刷新页面。
+    """
+    install(layouts=LayoutCache(DEFAULT_LAYOUT_CACHE_DIR))
+    server = None
+    if port is not None:
+        server = LiveReloadServer(port, preview_dir)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"预览页面：{server.url}", flush=True)
+    # 先导入全部脚本，之后每次修改只需重新导入一个模块
+    known = registry.discover(categories)
+    initial = registry.select(known, patterns) if patterns else []
+    snapshot = Snapshot(categories)
+    print(f"正在监视 {', '.join(categories)}（Ctrl-C 退出）", flush=True)
+
+    def publish(name: str, status: str, image: Optional[Path] = None, error: str = "") -> None:
+        if server is not None:
+            event = {"name": name, "status": status, "error": error}
+            if image is not None:
+                event["image"] = "/preview/" + image.relative_to(preview_dir).as_posix()
+            server.publish(event)
+
+    def rebuild(targets: Sequence[Target], started: float) -> None:
+        for target in targets:
+            if patterns and not registry.select([target], patterns):
+                continue
+            try:
+                # 与构建时相同，应用图表声明的布局前改写与布局方式
+                with passes.enabled(target.passes), engines.selected(target.engine):
+                    image = render_preview(target, preview_dir, dpi)
+            except Exception:
+                error = traceback.format_exc()
+                print(error, flush=True)
+                publish(target.name, f"{target.name} 渲染失败", error=error)
+                continue
+            elapsed = time.perf_counter() - started
+            print(f"preview {elapsed * 1000:7.0f}ms  {target.name}", flush=True)
+            publish(target.name, f"{target.name} 已更新（{elapsed * 1000:.0f} ms）", image)
+            if not preview_only:
+                try:
+                    with passes.enabled(target.passes), engines.selected(target.engine):
+                        registry.function(target)(filename=str(target.output), outformat=list(formats))
+                except Exception:
+                    print(traceback.format_exc(), flush=True)
+                    continue
+                print(f"output  {(time.perf_counter() - started) * 1000:7.0f}ms  {target.name}", flush=True)
+
+    rebuild(initial, time.perf_counter())
+    try:
+        while True:
+            time.sleep(interval)
+            for path in snapshot.changed():
+                started = time.perf_counter()
+                if path.parent == FRAGMENT_DIR:
+                    try:
+                        names = fragments.reload(path)
+                        current = registry.discover(categories)
+                    except Exception:
+                        error = traceback.format_exc()
+                        print(error, flush=True)
+                        publish(f"fragments/{path.name}", f"{path.name} 导入失败", error=error)
+                        continue
+                    uses = {t.name: s.uses[t.name] for s in static.index(categories) for t in s.targets}
+                    rebuild(fragments.dependents(current, names, uses), started)
+                    continue
+                category = path.parent.name
+                try:
+                    targets = registry.reload_script(path, category)
+                except Exception:
+                    error = traceback.format_exc()
+                    print(error, flush=True)
+                    names = [t.name for t in registry.script_targets(path, category)] or [f"{category}/{path.name}"]
+                    for name in names:
+                        publish(name, f"{path.name} 导入失败", error=error)
+                    continue
+                rebuild(targets, started)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.shutdown()
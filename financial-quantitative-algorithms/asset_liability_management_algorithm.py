@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="asset_liability_management_algorithm", tags=("alm",))
 def create_asset_liability_management_algorithm(filename: str, outformat: str) -> None:
     with Diagram("资产负债管理（ALM）与流动性管理架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("资产负债数据层"):
@@ -97,5 +108,4 @@ def create_asset_liability_management_algorithm(filename: str, outformat: str) -
 
 
 if __name__ == "__main__":
-    create_asset_liability_management_algorithm(filename="asset_liability_management_algorithm", outformat="png")
-    create_asset_liability_management_algorithm(filename="asset_liability_management_algorithm", outformat="pdf")
+    create_asset_liability_management_algorithm(filename="asset_liability_management_algorithm", outformat=["png", "pdf"])
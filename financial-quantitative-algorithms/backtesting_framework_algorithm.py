@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="backtesting_framework_algorithm", tags=("backtest",))
 def create_backtesting_framework_algorithm(filename: str, outformat: str) -> None:
     with Diagram("回测与交易仿真框架架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据与预处理"):
@@ -57,7 +68,6 @@ def create_backtesting_framework_algorithm(filename: str, outformat: str) -> Non
 
 
 if __name__ == "__main__":
-    create_backtesting_framework_algorithm(filename="backtesting_framework_algorithm", outformat="png")
-    create_backtesting_framework_algorithm(filename="backtesting_framework_algorithm", outformat="pdf")
+    create_backtesting_framework_algorithm(filename="backtesting_framework_algorithm", outformat=["png", "pdf"])
 
 
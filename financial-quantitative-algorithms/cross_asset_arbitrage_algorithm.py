@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="cross_asset_arbitrage_algorithm", tags=("crossasset",))
 def create_cross_asset_arbitrage_algorithm(filename: str, outformat: str) -> None:
     with Diagram("跨品种套利与相对价值交易架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("多资产数据层"):
@@ -97,5 +108,4 @@ def create_cross_asset_arbitrage_algorithm(filename: str, outformat: str) -> Non
 
 
 if __name__ == "__main__":
-    create_cross_asset_arbitrage_algorithm(filename="cross_asset_arbitrage_algorithm", outformat="png")
-    create_cross_asset_arbitrage_algorithm(filename="cross_asset_arbitrage_algorithm", outformat="pdf")
+    create_cross_asset_arbitrage_algorithm(filename="cross_asset_arbitrage_algorithm", outformat=["png", "pdf"])
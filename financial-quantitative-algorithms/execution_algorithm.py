@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="execution_algorithm", tags=("execution",))
 def create_execution_algorithm(filename: str, outformat: str) -> None:
     with Diagram("执行算法（交易成本最小化）架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("输入与约束"):
@@ -61,7 +72,6 @@ def create_execution_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_execution_algorithm(filename="execution_algorithm", outformat="png")
-    create_execution_algorithm(filename="execution_algorithm", outformat="pdf")
+    create_execution_algorithm(filename="execution_algorithm", outformat=["png", "pdf"])
 
 
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="fixed_income_curve_algorithm", tags=("fixedincome",))
 def create_fixed_income_curve_algorithm(filename: str, outformat: str) -> None:
     with Diagram("固定收益曲线与期限结构建模架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("市场数据层"):
@@ -100,5 +111,4 @@ def create_fixed_income_curve_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_fixed_income_curve_algorithm(filename="fixed_income_curve_algorithm", outformat="png")
-    create_fixed_income_curve_algorithm(filename="fixed_income_curve_algorithm", outformat="pdf")
+    create_fixed_income_curve_algorithm(filename="fixed_income_curve_algorithm", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="high_frequency_trading_algorithm", tags=("hft",))
 def create_high_frequency_trading_algorithm(filename: str, outformat: str) -> None:
     with Diagram("高频交易与超低延迟系统架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("市场数据层"):
@@ -102,5 +113,4 @@ def create_high_frequency_trading_algorithm(filename: str, outformat: str) -> No
 
 
 if __name__ == "__main__":
-    create_high_frequency_trading_algorithm(filename="high_frequency_trading_algorithm", outformat="png")
-    create_high_frequency_trading_algorithm(filename="high_frequency_trading_algorithm", outformat="pdf")
+    create_high_frequency_trading_algorithm(filename="high_frequency_trading_algorithm", outformat=["png", "pdf"])
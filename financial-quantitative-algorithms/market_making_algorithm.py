@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="market_making_algorithm", tags=("marketmaking",))
 def create_market_making_algorithm(filename: str, outformat: str) -> None:
     with Diagram("做市与流动性提供算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("市场数据与状态"):
@@ -81,5 +92,4 @@ def create_market_making_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_market_making_algorithm(filename="market_making_algorithm", outformat="png")
-    create_market_making_algorithm(filename="market_making_algorithm", outformat="pdf")
+    create_market_making_algorithm(filename="market_making_algorithm", outformat=["png", "pdf"])
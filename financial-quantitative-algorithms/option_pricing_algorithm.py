@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="option_pricing_algorithm", tags=("option",))
 def create_option_pricing_algorithm(filename: str, outformat: str) -> None:
     with Diagram("期权定价与风险管理算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据与输入"):
@@ -226,7 +237,6 @@ def create_option_pricing_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_option_pricing_algorithm(filename="option_pricing_algorithm", outformat="png")
-    create_option_pricing_algorithm(filename="option_pricing_algorithm", outformat="pdf")
+    create_option_pricing_algorithm(filename="option_pricing_algorithm", outformat=["png", "pdf"])
 
 
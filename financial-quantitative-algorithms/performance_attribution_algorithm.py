@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="performance_attribution_algorithm", tags=("attribution",))
 def create_performance_attribution_algorithm(filename: str, outformat: str) -> None:
     with Diagram("收益归因分析（Brinson/Fama-French）架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据输入层"):
@@ -94,5 +105,4 @@ def create_performance_attribution_algorithm(filename: str, outformat: str) -> N
 
 
 if __name__ == "__main__":
-    create_performance_attribution_algorithm(filename="performance_attribution_algorithm", outformat="png")
-    create_performance_attribution_algorithm(filename="performance_attribution_algorithm", outformat="pdf")
+    create_performance_attribution_algorithm(filename="performance_attribution_algorithm", outformat=["png", "pdf"])
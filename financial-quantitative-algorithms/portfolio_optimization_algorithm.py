@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="portfolio_optimization_algorithm", tags=("portfolio",))
 def create_portfolio_optimization_algorithm(filename: str, outformat: str) -> None:
     with Diagram("投资组合优化算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据源层"):
@@ -189,7 +200,6 @@ def create_portfolio_optimization_algorithm(filename: str, outformat: str) -> No
 
 
 if __name__ == "__main__":
-    create_portfolio_optimization_algorithm(filename="portfolio_optimization_algorithm", outformat="png")
-    create_portfolio_optimization_algorithm(filename="portfolio_optimization_algorithm", outformat="pdf")
+    create_portfolio_optimization_algorithm(filename="portfolio_optimization_algorithm", outformat=["png", "pdf"])
 
 
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="quant_trading_algorithm", tags=("quant",))
 def create_quant_trading_algorithm(filename: str, outformat: str) -> None:
     with Diagram("量化交易系统与策略流程架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据层"):
@@ -249,7 +260,6 @@ def create_quant_trading_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_quant_trading_algorithm(filename="quant_trading_algorithm", outformat="png")
-    create_quant_trading_algorithm(filename="quant_trading_algorithm", outformat="pdf")
+    create_quant_trading_algorithm(filename="quant_trading_algorithm", outformat=["png", "pdf"])
 
 
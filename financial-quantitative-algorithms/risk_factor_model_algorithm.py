@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="risk_factor_model_algorithm", tags=("riskfactor",))
 def create_risk_factor_model_algorithm(filename: str, outformat: str) -> None:
     with Diagram("风险因子模型（Barra/自建）架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据源层"):
@@ -87,5 +98,4 @@ def create_risk_factor_model_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_risk_factor_model_algorithm(filename="risk_factor_model_algorithm", outformat="png")
-    create_risk_factor_model_algorithm(filename="risk_factor_model_algorithm", outformat="pdf")
+    create_risk_factor_model_algorithm(filename="risk_factor_model_algorithm", outformat=["png", "pdf"])
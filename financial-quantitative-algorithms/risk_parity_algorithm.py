@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="risk_parity_algorithm", tags=("riskparity",))
 def create_risk_parity_algorithm(filename: str, outformat: str) -> None:
     with Diagram("风险平价与风险预算组合架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("输入与约束"):
@@ -181,7 +192,6 @@ def create_risk_parity_algorithm(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_risk_parity_algorithm(filename="risk_parity_algorithm", outformat="png")
-    create_risk_parity_algorithm(filename="risk_parity_algorithm", outformat="pdf")
+    create_risk_parity_algorithm(filename="risk_parity_algorithm", outformat=["png", "pdf"])
 
 
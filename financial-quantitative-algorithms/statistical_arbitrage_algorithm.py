@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="financial-quantitative-algorithms", filename="statistical_arbitrage_algorithm", tags=("statarb",))
 def create_statistical_arbitrage_algorithm(filename: str, outformat: str) -> None:
     with Diagram("统计套利（配对/协整/多资产）算法架构", filename=filename, show=False, outformat=outformat, direction="TB"):
         with Cluster("数据层"):
@@ -50,7 +61,6 @@ def create_statistical_arbitrage_algorithm(filename: str, outformat: str) -> Non
 
 
 if __name__ == "__main__":
-    create_statistical_arbitrage_algorithm(filename="statistical_arbitrage_algorithm", outformat="png")
-    create_statistical_arbitrage_algorithm(filename="statistical_arbitrage_algorithm", outformat="pdf")
+    create_statistical_arbitrage_algorithm(filename="statistical_arbitrage_algorithm", outformat=["png", "pdf"])
 
 
@@ -0,0 +1,97 @@
+from diagrams import Cluster, Edge
+from diagrams.onprem.compute import Server
+
+from diagramkit import fragment
+
+
+@fragment("kubernetes")
+def kubernetes(prefix: str = "Kubernetes ") -> dict:
+    """Kubernetes 子系统：控制面、工作负载、存储、网络、节点组件、命名空间、
+    自动伸缩、扩展与 Service Mesh，以及它们之间的关键链路。
+
+    :param prefix: 各集群标签的前缀，单独成图时可去掉。
+    """
+    # 控制面
+    with Cluster(f"{prefix}控制面（API/调度/控制器）"):
+        k8s_api = Server("kube-apiserver")
+        scheduler = Server("kube-scheduler")
+        controller = Server("kube-controller-manager")
+        etcd = Server("etcd")
+        k8s_api >> controller
+        k8s_api >> scheduler
+        k8s_api >> etcd
+
+    # 工作负载
+    with Cluster(f"{prefix}工作负载（Pods/Deployments/Jobs）"):
+        pods = Server("Pods")
+        deployments = Server("Deployments")
+        jobs = Server("Jobs")
+        deployments >> pods
+        jobs >> pods
+
+    # 存储
+    with Cluster(f"{prefix}存储（CSI/PV/PVC）"):
+        csi = Server("CSI Driver")
+        pv = Server("PersistentVolume")
+        pvc = Server("PersistentVolumeClaim")
+        pvc >> pv
+        csi >> pv
+
+    # 网络
+    with Cluster(f"{prefix}网络（CNI/Ingress/Service）"):
+        cni = Server("CNI")
+        svc = Server("Service")
+        ingress = Server("Ingress")
+        ingress_ctl = Server("Ingress Controller")
+        ingress_ctl >> ingress
+        cni >> svc
+        ingress >> svc
+
+    # 节点组件
+    with Cluster(f"{prefix}节点组件（kubelet/kube-proxy/CRI）"):
+        kubelet = Server("kubelet")
+        kube_proxy = Server("kube-proxy")
+        cri = Server("CRI (containerd/CRI-O)")
+        kubelet >> cri
+        kube_proxy >> cni
+
+    # 命名空间
+    with Cluster(f"{prefix}命名空间（多租户隔离）"):
+        ns_prod = Server("namespace: prod")
+        ns_dev = Server("namespace: dev")
+
+    # 自动伸缩
+    with Cluster(f"{prefix}自动伸缩（HPA/VPA）"):
+        hpa = Server("HPA")
+        vpa = Server("VPA")
+
+    # 扩展
+    with Cluster(f"{prefix}扩展（Operator/CRD）"):
+        crd = Server("CRD")
+        operator = Server("Operator")
+        operator >> crd
+
+    # Service Mesh
+    with Cluster("Service Mesh（Istio）"):
+        istiod = Server("istiod")
+        sidecar = Server("Envoy Sidecar")
+        istiod >> sidecar
+
+    # 关键链路
+    ingress_ctl >> Edge(label="L7 控制") >> ingress
+    ingress >> Edge(label="L4/L7 路由") >> svc
+    svc >> Edge(label="Pods 负载均衡") >> pods
+    kubelet >> Edge(label="管理 Pod/容器") >> pods
+    hpa >> Edge(label="水平伸缩") >> deployments
+    vpa >> Edge(label="垂直伸缩") >> deployments
+    operator >> Edge(label="编排/自定义逻辑") >> pods
+    crd >> Edge(label="扩展 API") >> k8s_api
+    sidecar >> Edge(label="东西向流量/可观测") >> pods
+
+    # 控制面交互
+    k8s_api >> Edge(label="调度") >> scheduler
+    k8s_api >> Edge(label="协调/控制") >> controller
+    controller >> Edge(label="状态存储") >> etcd
+    scheduler >> Edge(label="分配节点/创建 Pod") >> pods
+
+    return locals()
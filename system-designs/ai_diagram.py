@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="ai_design", tags=("ai",))
 def create_ai_diagram(filename: str, outformat: str) -> None:
     with Diagram("人工智能系统设计图（ML + LLM/RAG/对齐）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("数据层"):
@@ -110,5 +121,4 @@ def create_ai_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_ai_diagram(filename="ai_design", outformat="png")
-    create_ai_diagram(filename="ai_design", outformat="pdf")
+    create_ai_diagram(filename="ai_design", outformat=["png", "pdf"])
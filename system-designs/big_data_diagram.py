@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="big_data_design", tags=("bigdata",))
 def create_big_data_diagram(filename: str, outformat: str) -> None:
     with Diagram("大数据系统设计图（含实时数仓）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("数据接入（实时/批量）"):
@@ -69,5 +80,4 @@ def create_big_data_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_big_data_diagram(filename="big_data_design", outformat="png")
-    create_big_data_diagram(filename="big_data_design", outformat="pdf") 
+    create_big_data_diagram(filename="big_data_design", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="blockchain_system_design", tags=("blockchain",))
 def create_blockchain_system_diagram(filename: str, outformat: str) -> None:
     with Diagram("区块链系统设计图（Blockchain Ecosystem）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("应用层（Application Layer）"):
@@ -267,5 +278,4 @@ def create_blockchain_system_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_blockchain_system_diagram(filename="blockchain_system_design", outformat="png")
-    create_blockchain_system_diagram(filename="blockchain_system_design", outformat="pdf")
+    create_blockchain_system_diagram(filename="blockchain_system_design", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="cloud_computing", tags=("cloud",))
 def create_cloud_diagram(filename: str, outformat: str) -> None:
     with Diagram("云计算架构设计图（含互联/FinOps/合规）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("控制面（Control Plane）"):
@@ -139,5 +150,4 @@ def create_cloud_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_cloud_diagram(filename="cloud_computing", outformat="png")
-    create_cloud_diagram(filename="cloud_computing", outformat="pdf")
+    create_cloud_diagram(filename="cloud_computing", outformat=["png", "pdf"])
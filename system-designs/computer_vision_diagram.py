@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="computer_vision_design", tags=("cv",))
 def create_computer_vision_diagram(filename: str, outformat: str) -> None:
     with Diagram("计算机视觉系统设计图（CV Pipeline）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("数据采集与预处理"):
@@ -162,5 +173,4 @@ def create_computer_vision_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_computer_vision_diagram(filename="computer_vision_design", outformat="png")
-    create_computer_vision_diagram(filename="computer_vision_design", outformat="pdf")
+    create_computer_vision_diagram(filename="computer_vision_design", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="data_mining_design", tags=("datamining",))
 def create_data_mining_diagram(filename: str, outformat: str) -> None:
     with Diagram("数据挖掘系统设计图（含 AutoML/特征治理）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("数据准备"):
@@ -67,5 +78,4 @@ def create_data_mining_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_data_mining_diagram(filename="data_mining_design", outformat="png")
-    create_data_mining_diagram(filename="data_mining_design", outformat="pdf")
+    create_data_mining_diagram(filename="data_mining_design", outformat=["png", "pdf"])
@@ -1,3 +1,6 @@
+import os
+import sys
+
 from diagrams import Diagram
 from diagrams.aws.compute import EC2
 from diagrams.aws.database import RDS
@@ -18,7 +21,15 @@ from diagrams.onprem.monitoring import Grafana
 # from diagrams.onprem.ml import Mlflow
 from diagrams import Edge
 
+try:
+    from diagramkit import diagram, include
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram, include
+
 
+@diagram(category="system-designs", filename="data_intensive_system", tags=("data",))
 def create_data_intensive_diagram(filename: str, outformat: str) -> None:
     with Diagram("数据密集型系统设计", filename=filename, show=False, outformat=outformat, direction="LR"):
         users = Users("Clients")
@@ -82,63 +93,8 @@ def create_data_intensive_diagram(filename: str, outformat: str) -> None:
                 archive_store = Server("Archive Storage")
                 backup_svc >> archive_store
 
-            # Kubernetes 子系统
-            with Cluster("Kubernetes 控制面（API/调度/控制器）"):
-                k8s_api = Server("kube-apiserver")
-                scheduler = Server("kube-scheduler")
-                controller = Server("kube-controller-manager")
-                etcd = Server("etcd")
-                k8s_api >> controller
-                k8s_api >> scheduler
-                k8s_api >> etcd
-
-            with Cluster("Kubernetes 工作负载（Pods/Deployments/Jobs）"):
-                pods = Server("Pods")
-                deployments = Server("Deployments")
-                jobs = Server("Jobs")
-                deployments >> pods
-                jobs >> pods
-
-            with Cluster("Kubernetes 存储（CSI/PV/PVC）"):
-                csi = Server("CSI Driver")
-                pv = Server("PersistentVolume")
-                pvc = Server("PersistentVolumeClaim")
-                pvc >> pv
-                csi >> pv
-
-            with Cluster("Kubernetes 网络（CNI/Ingress/Service）"):
-                cni = Server("CNI")
-                svc = Server("Service")
-                ingress = Server("Ingress")
-                ingress_ctl = Server("Ingress Controller")
-                ingress_ctl >> ingress
-                cni >> svc
-                ingress >> svc
-
-            with Cluster("Kubernetes 节点组件（kubelet/kube-proxy/CRI）"):
-                kubelet = Server("kubelet")
-                kube_proxy = Server("kube-proxy")
-                cri = Server("CRI (containerd/CRI-O)")
-                kubelet >> cri
-                kube_proxy >> cni
-
-            with Cluster("Kubernetes 命名空间（多租户隔离）"):
-                ns_prod = Server("namespace: prod")
-                ns_dev = Server("namespace: dev")
-
-            with Cluster("Kubernetes 自动伸缩（HPA/VPA）"):
-                hpa = Server("HPA")
-                vpa = Server("VPA")
-
-            with Cluster("Kubernetes 扩展（Operator/CRD）"):
-                crd = Server("CRD")
-                operator = Server("Operator")
-                operator >> crd
-
-            with Cluster("Service Mesh（Istio）"):
-                istiod = Server("istiod")
-                sidecar = Server("Envoy Sidecar")
-                istiod >> sidecar
+            # Kubernetes 子系统（见 fragments/kubernetes.py）
+            k8s = include("kubernetes")
 
         # 次区域 / 容灾区域
         with Cluster("Region B（容灾区域）"):
@@ -174,32 +130,17 @@ def create_data_intensive_diagram(filename: str, outformat: str) -> None:
         feature_store >> Edge(label="Features") >> serving_api
         serving_api >> Edge(label="Responses") >> users
 
-        # K8s 关联路径
-        users >> Edge(label="HTTP") >> ingress
-        ingress_ctl >> Edge(label="L7 控制") >> ingress
-        ingress >> Edge(label="L4/L7 路由") >> svc
-        svc >> Edge(label="Pods 负载均衡") >> pods
-        pods >> Edge(label="调用") >> app
-        pods >> Edge(label="流式/批处理") >> stream_proc
-        pods >> Edge(label="写入") >> db_primary
-        pods >> Edge(label="缓存") >> cache
-        pods >> Edge(label="索引") >> search
-        pods >> Edge(label="PVC 绑定") >> pvc
-        kubelet >> Edge(label="管理 Pod/容器") >> pods
-        hpa >> Edge(label="水平伸缩") >> deployments
-        vpa >> Edge(label="垂直伸缩") >> deployments
-        operator >> Edge(label="编排/自定义逻辑") >> pods
-        crd >> Edge(label="扩展 API") >> k8s_api
-        sidecar >> Edge(label="东西向流量/可观测") >> pods
-        ns_prod >> Edge(label="资源/策略") >> pods
-        ns_dev >> Edge(label="资源/策略") >> pods
-        k8s_api >> Edge(label="心跳/状态") >> kubelet
-
-        # Kubernetes 控制面交互
-        k8s_api >> Edge(label="调度") >> scheduler
-        k8s_api >> Edge(label="协调/控制") >> controller
-        controller >> Edge(label="状态存储") >> etcd
-        scheduler >> Edge(label="分配节点/创建 Pod") >> pods
+        # K8s 关联路径（Kubernetes 内部链路在片段中）
+        users >> Edge(label="HTTP") >> k8s["ingress"]
+        k8s["pods"] >> Edge(label="调用") >> app
+        k8s["pods"] >> Edge(label="流式/批处理") >> stream_proc
+        k8s["pods"] >> Edge(label="写入") >> db_primary
+        k8s["pods"] >> Edge(label="缓存") >> cache
+        k8s["pods"] >> Edge(label="索引") >> search
+        k8s["pods"] >> Edge(label="PVC 绑定") >> k8s["pvc"]
+        k8s["ns_prod"] >> Edge(label="资源/策略") >> k8s["pods"]
+        k8s["ns_dev"] >> Edge(label="资源/策略") >> k8s["pods"]
+        k8s["k8s_api"] >> Edge(label="心跳/状态") >> k8s["kubelet"]
 
         # 容灾复制
         db_primary >> Edge(label="异步复制") >> db_dr
@@ -208,6 +149,6 @@ def create_data_intensive_diagram(filename: str, outformat: str) -> None:
         app >> Edge(label="蓝绿/热备") >> app_b
 
 
-# Generate PNG and PDF only for data-intensive diagram
-create_data_intensive_diagram(filename="data_intensive_system", outformat="png")
-create_data_intensive_diagram(filename="data_intensive_system", outformat="pdf")
\ No newline at end of file
+if __name__ == "__main__":
+    # Generate PNG and PDF only for data-intensive diagram
+    create_data_intensive_diagram(filename="data_intensive_system", outformat=["png", "pdf"])
\ No newline at end of file
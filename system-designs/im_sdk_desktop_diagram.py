@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="im_sdk_desktop", tags=("imsdk-desktop",))
 def create_im_sdk_desktop(filename: str, outformat: str) -> None:
     with Diagram("IM SDK（桌面端）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("App（桌面端）"):
@@ -64,5 +75,4 @@ def create_im_sdk_desktop(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_im_sdk_desktop(filename="im_sdk_desktop", outformat="png")
-    create_im_sdk_desktop(filename="im_sdk_desktop", outformat="pdf")
+    create_im_sdk_desktop(filename="im_sdk_desktop", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="im_sdk_design", tags=("imsdk",))
 def create_im_sdk_diagram(filename: str, outformat: str) -> None:
     with Diagram("IM 系统 SDK 设计图（细化）", filename=filename, show=False, outformat=outformat, direction="LR"):
         # 应用集成层
@@ -180,5 +191,4 @@ def create_im_sdk_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_im_sdk_diagram(filename="im_sdk_design", outformat="png")
-    create_im_sdk_diagram(filename="im_sdk_design", outformat="pdf")
+    create_im_sdk_diagram(filename="im_sdk_design", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="im_sdk_web", tags=("imsdk-web",))
 def create_im_sdk_web(filename: str, outformat: str) -> None:
     with Diagram("IM SDK（Web）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("Web App（浏览器）"):
@@ -57,5 +68,4 @@ def create_im_sdk_web(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_im_sdk_web(filename="im_sdk_web", outformat="png")
-    create_im_sdk_web(filename="im_sdk_web", outformat="pdf")
+    create_im_sdk_web(filename="im_sdk_web", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="iot_system_design", tags=("iot",))
 def create_iot_system_diagram(filename: str, outformat: str) -> None:
     with Diagram("物联网系统设计图（IoT Ecosystem）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("设备层（Device Layer）"):
@@ -225,5 +236,4 @@ def create_iot_system_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_iot_system_diagram(filename="iot_system_design", outformat="png")
-    create_iot_system_diagram(filename="iot_system_design", outformat="pdf")
+    create_iot_system_diagram(filename="iot_system_design", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="nlp_design", tags=("nlp",))
 def create_nlp_diagram(filename: str, outformat: str) -> None:
     with Diagram("自然语言处理系统设计图（含多语言/对话/IR/QA/RAG/分析）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("数据管道"):
@@ -130,5 +141,4 @@ def create_nlp_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_nlp_diagram(filename="nlp_design", outformat="png")
-    create_nlp_diagram(filename="nlp_design", outformat="pdf")
+    create_nlp_diagram(filename="nlp_design", outformat=["png", "pdf"])
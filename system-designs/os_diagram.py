@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="os_design", tags=("os",))
 def create_os_design_diagram(filename: str, outformat: str) -> None:
     with Diagram("操作系统设计图（细化）", filename=filename, show=False, outformat=outformat, direction="LR"):
         # 用户空间
@@ -146,5 +157,4 @@ def create_os_design_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_os_design_diagram(filename="os_design", outformat="png")
-    create_os_design_diagram(filename="os_design", outformat="pdf")
+    create_os_design_diagram(filename="os_design", outformat=["png", "pdf"])
@@ -1,7 +1,18 @@
+import os
+import sys
+
 from diagrams import Diagram, Cluster, Edge
 from diagrams.onprem.compute import Server
 
+try:
+    from diagramkit import diagram
+except ModuleNotFoundError:
+    # 直接运行脚本（python3 xxx.py）时仓库根目录不在 sys.path 上
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from diagramkit import diagram
+
 
+@diagram(category="system-designs", filename="software_engineering", tags=("se",))
 def create_software_engineering_diagram(filename: str, outformat: str) -> None:
     with Diagram("软件工程体系设计图（含质量门禁与SRE）", filename=filename, show=False, outformat=outformat, direction="LR"):
         with Cluster("需求与规划"):
@@ -122,5 +133,4 @@ def create_software_engineering_diagram(filename: str, outformat: str) -> None:
 
 
 if __name__ == "__main__":
-    create_software_engineering_diagram(filename="software_engineering", outformat="png")
-    create_software_engineering_diagram(filename="software_engineering", outformat="pdf")
+    create_software_engineering_diagram(filename="software_engineering", outformat=["png", "pdf"])
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from diagramkit.bench import Sample, compare, t_quantile, welch_interval
+
+
+def test_welch_interval_matches_reference():
+    # m1=11, m2=14, 方差均为 1，Welch–Satterthwaite 自由度为 4，t(0.975, 4)=2.776
+    low, high = welch_interval([10, 11, 12], [13, 14, 15])
+    half = 2.776 * math.sqrt(2 / 3)
+    assert low == pytest.approx(3 - half)
+    assert high == pytest.approx(3 + half)
+
+
+def test_welch_interval_is_antisymmetric():
+    a, b = [5.0, 7.0, 6.5, 6.1], [6.0, 9.5, 8.0]
+    low, high = welch_interval(a, b)
+    assert welch_interval(b, a) == pytest.approx((-high, -low))
+
+
+def test_welch_interval_edge_cases():
+    assert welch_interval([1.0], [1.0, 2.0]) is None
+    assert welch_interval([2.0, 2.0], [3.0, 3.0]) == (1.0, 1.0)
+
+
+def test_t_quantile_falls_back_to_normal():
+    assert t_quantile(0.5) == math.inf
+    assert t_quantile(4.9) == 2.776
+    assert t_quantile(1000) == 1.96
+
+
+def _samples(layouts):
+    return [Sample("a", "c", i, ms, 0.0, ms, 0) for i, ms in enumerate(layouts)]
+
+
+def test_compare_flags_only_significant_regressions():
+    slower = compare(_samples([100, 101, 99, 100]), _samples([130, 131, 129, 130]))
+    assert {c.metric for c in slower if c.significant} == {"layout_ms", "total_ms"}
+    noisy = compare(_samples([100, 60, 140, 100]), _samples([130, 80, 180, 130]))
+    assert not any(c.significant for c in noisy)
+    small = compare(_samples([100, 101, 99, 100]), _samples([105, 106, 104, 105]))
+    assert not any(c.significant for c in small)
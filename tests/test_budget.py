@@ -0,0 +1,62 @@
+import subprocess
+
+import pytest
+
+from diagramkit import budget, render, split
+
+SOURCE = (
+    "digraph G {\n"
+    '\tgraph [label="预算" rankdir=LR splines=ortho]\n'
+    "\tsubgraph cluster_a {\n"
+    "\t\ta1\n"
+    "\t\ta2\n"
+    "\t}\n"
+    "\tsubgraph cluster_b {\n"
+    "\t\tb1\n"
+    "\t}\n"
+    "\ta1 -> a2 [label=x]\n"
+    "\ta2 -> b1\n"
+    "}\n"
+)
+
+
+def test_degrade_stacks_the_steps():
+    assert budget.degrade(SOURCE, 0) == SOURCE
+    first = budget.degrade(SOURCE, 1)
+    assert "mclimit=0.2" in first and "splines=ortho" in first
+    assert "splines=line" in budget.degrade(SOURCE, 2)
+    last = budget.degrade(SOURCE, 3)
+    assert "xlabel=x" in last and "label=x" not in last.replace("xlabel=x", "")
+
+
+@pytest.fixture
+def timeouts(monkeypatch):
+    # 布局得到无法回填的结果，之后的每一次 Graphviz 调用都超时
+    seen = []
+
+    def run_graphviz(cmd, source, timeout=None):
+        seen.append(timeout)
+        if "-Tjson0" in cmd and split.active() is None:
+            return b"{}"
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    monkeypatch.setattr(render, "run_graphviz", run_graphviz)
+    return seen
+
+
+def test_fallback_render_stays_within_budget(tmp_path, timeouts):
+    with budget.limited(2.5):
+        with pytest.raises(budget.LayoutBudgetExceeded):
+            render.render_within_budget(SOURCE, str(tmp_path / "out"), ["png"])
+    assert timeouts == [2.5, 2.5]
+    assert not list(tmp_path.iterdir())
+
+
+def test_split_layout_stays_within_budget(tmp_path, timeouts):
+    # 节点足够多才会分块
+    big = SOURCE.replace("\t\ta2\n", "".join(f"\t\ta{i}\n" for i in range(2, split.MIN_NODES + 1)))
+    with budget.limited(2.5), split.enabled(jobs=2) as notes:
+        assert render.render_split(big, str(tmp_path / "out"), ["png"]) is None
+    # 第一块超时后其余的块可能还没开始
+    assert timeouts and set(timeouts) == {2.5}
+    assert notes == ["分块布局超过 2.5s 预算，改为全局布局"]
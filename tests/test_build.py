@@ -0,0 +1,38 @@
+import sys
+
+from diagramkit import build, registry, trace
+
+SCRIPT = '''from diagramkit import diagram
+
+
+@diagram(category="system-designs", filename="trace_probe_a")
+def create_a(filename, outformat):
+    pass
+
+
+@diagram(category="system-designs", filename="trace_probe_b")
+def create_b(filename, outformat):
+    pass
+'''
+
+
+def test_worker_traces_do_not_repeat_parent_imports(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "ROOT", tmp_path)
+    monkeypatch.setattr(registry, "_targets", dict(registry._targets))
+    monkeypatch.setattr(registry, "_functions", dict(registry._functions))
+    (tmp_path / "system-designs").mkdir()
+    path = tmp_path / "system-designs" / "trace_probe.py"
+    path.write_text(SCRIPT, encoding="utf-8")
+    tracer = trace.Tracer()
+    trace.activate(tracer)
+    try:
+        # 与 cmd_build 相同：父进程先在启用 trace 的情况下导入脚本，再交给进程池
+        registry.load_script(path, "system-designs")
+        results = build.build(registry.script_targets(path, "system-designs"), jobs=2, keep_going=True, tracing=True)
+        spans = tracer.drain() + [s for r in results for s in r.spans]
+    finally:
+        trace.activate(None)
+        sys.modules.pop(registry._module_name("system-designs", path), None)
+    assert all(r.ok for r in results)
+    assert [s["name"] for s in spans].count("import") == 1
+    assert [s["name"] for s in spans].count("diagram") == 2
@@ -0,0 +1,60 @@
+import os
+
+from diagramkit.cache import ArtifactCache, DirectoryCache, canonical_dot
+
+A = "0123456789abcdef0123456789abcdef"
+B = "fedcba9876543210fedcba9876543210"
+
+
+def test_canonical_dot_numbers_random_ids_in_order():
+    source = f'digraph {{\n\t{A} [label=x]\n\t"{B}" [label=y]\n\t{A} -> "{B}"\n}}\n'
+    assert canonical_dot(source) == "digraph {\n\tn0 [label=x]\n\tn1 [label=y]\n\tn0 -> n1\n}\n"
+
+
+def test_key_ignores_random_ids_but_not_structure(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    one = cache.key(f"digraph {{\n\t{A} -> {B}\n}}\n", ["png"])
+    assert one == cache.key(f"digraph {{\n\t{B} -> {A}\n}}\n", ["png"])
+    assert one != cache.key(f"digraph {{\n\t{A} -> {A}\n}}\n", ["png"])
+
+
+def test_key_depends_on_formats_and_engine(tmp_path):
+    cache = ArtifactCache(tmp_path)
+    source = "digraph {\n\ta -> b\n}\n"
+    keys = {
+        cache.key(source, ["png"]),
+        cache.key(source, ["png", "pdf"]),
+        cache.key(source, ["pdf", "png"]),
+        cache.key(source, ["png"], engine="neato"),
+    }
+    assert len(keys) == 4
+
+
+def test_fetch_copies_stored_outputs(tmp_path):
+    cache = ArtifactCache(tmp_path / "cache")
+    png = tmp_path / "a.png"
+    png.write_bytes(b"png bytes")
+    cache.store("ab" * 32, [str(png)])
+    png.unlink()
+    assert cache.fetch("ab" * 32, [str(png)])
+    assert png.read_bytes() == b"png bytes"
+    assert not cache.fetch("cd" * 32, [str(png)])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_forced_cache_always_misses(tmp_path):
+    png = tmp_path / "a.png"
+    png.write_bytes(b"x")
+    ArtifactCache(tmp_path / "cache").store("ab" * 32, [str(png)])
+    assert not ArtifactCache(tmp_path / "cache", force=True).fetch("ab" * 32, [str(png)])
+
+
+def test_evict_drops_least_recently_used(tmp_path):
+    cache = DirectoryCache(tmp_path, max_bytes=15)
+    source = tmp_path / "data"
+    source.write_bytes(b"0123456789")
+    for i, key in enumerate(("aa" * 32, "bb" * 32)):
+        cache.store_files(key, {"f": source})
+        os.utime(cache.lookup(key), (i, i))
+    assert cache.lookup("aa" * 32) is None
+    assert cache.lookup("bb" * 32) is not None
@@ -0,0 +1,50 @@
+import pytest
+
+from diagramkit import registry, render, static
+from diagramkit.compiler import compile_dot
+
+# 有嵌套集群与连线标签的技术栈图、带 connect() 表格的图、算法流程图与系统设计图
+TARGETS = [
+    "company-tech-stacks/adobe_tech_stack",
+    "company-tech-stacks/doordash_tech_stack",
+    "financial-quantitative-algorithms/option_pricing_algorithm",
+    "system-designs/data_intensive_system",
+]
+
+
+@pytest.fixture(scope="module")
+def targets():
+    found = {t.name: t for t in registry.discover()}
+    scripts = {f"{s.category}/{s.path.name}": s for s in static.index()}
+    return [(found[name], scripts[f"{found[name].category}/{found[name].script}"]) for name in TARGETS]
+
+
+def _via_diagrams(target, tmp_path, monkeypatch):
+    # 经 diagrams 对象建图、由 install() 的渲染入口序列化，只截下交给 Graphviz 的源码
+    sources = []
+    monkeypatch.setattr(render, "render_source", lambda source, filename, formats, engine="dot": sources.append(source) or [])
+    func = registry.function(target)
+    render.install()
+    try:
+        func(filename=str(tmp_path / target.filename), outformat=["png", "pdf"])
+    finally:
+        render.uninstall()
+    return sources
+
+
+@pytest.mark.parametrize("index", range(len(TARGETS)), ids=TARGETS)
+def test_compile_dot_matches_diagrams(targets, index, tmp_path, monkeypatch):
+    target, script = targets[index]
+    graphs = script.graphs(target)
+    assert graphs and not any(g.unresolved for g in graphs)
+    assert [compile_dot(g) for g in graphs] == _via_diagrams(target, tmp_path, monkeypatch)
+    assert not list(tmp_path.iterdir())
+
+
+def test_graph_overrides_apply_to_both_paths(targets, tmp_path, monkeypatch):
+    target, script = targets[0]
+    with render.graph_overrides(dpi="72"):
+        expected = _via_diagrams(target, tmp_path, monkeypatch)
+        actual = [compile_dot(g, render._overrides) for g in script.graphs(target)]
+    assert actual == expected
+    assert "dpi=72" in actual[0]
@@ -0,0 +1,55 @@
+import re
+import shutil
+
+import pytest
+
+from diagramkit import coprocess
+from diagramkit.render import render_bytes, run_graphviz
+
+# cairo 1.16 之前不认 SOURCE_DATE_EPOCH，PDF 中的创建时间随渲染时刻变化
+_CREATION_DATE = re.compile(rb"/CreationDate \(D:\d+Z?\)")
+
+SOURCE = 'digraph G {\n\tgraph [label="往返"]\n\ta [label="甲"]\n\tb\n\ta -> b [label=x]\n}\n'
+
+
+def test_streaming_formats():
+    assert coprocess.streaming(["dot", "-Tjson0"])
+    assert coprocess.streaming(["neato", "-n2", "-Tpng:cairo"])
+    assert not coprocess.streaming(["neato", "-n2", "-Tpdf"])
+    assert not coprocess.streaming(["dot", "-Tpng", "-Tsvg"])
+    assert not coprocess.streaming(["dot", "-Tpng", "-oout.png"])
+
+
+def test_paged_formats_are_refused_before_starting_graphviz():
+    with pytest.raises(coprocess.CoprocessError):
+        coprocess.Coprocess(["neato", "-n2", "-Tpdf"])
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="需要 Graphviz")
+@pytest.mark.parametrize("fmt", ["png", "pdf"])
+def test_round_trip_matches_one_shot(fmt):
+    expected = render_bytes(SOURCE, [fmt])[fmt]
+    pool = coprocess.GraphvizPool(timeout=30)
+    coprocess.activate(pool)
+    try:
+        # 第二张图验证前一次请求残留的哨兵输出被正确丢弃
+        first = render_bytes(SOURCE, [fmt])[fmt]
+        second = render_bytes(SOURCE, [fmt])[fmt]
+        commands = pool.commands()
+    finally:
+        coprocess.activate(None)
+    assert {_CREATION_DATE.sub(b"", data) for data in (first, second, expected)} == {_CREATION_DATE.sub(b"", expected)}
+    assert ("dot", "-Tjson0") in commands
+    assert (("neato", "-n2", f"-T{fmt}") in commands) == (fmt in coprocess.STREAMING_FORMATS)
+    assert pool.served == len(commands) * 2
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="需要 Graphviz")
+def test_coprocess_output_is_framed_per_graph():
+    worker = coprocess.Coprocess(["dot", "-Tsvg"], timeout=30)
+    try:
+        outputs = [worker.run(SOURCE.replace("甲", label)) for label in ("一", "二", "三")]
+    finally:
+        worker.close()
+    for label, data in zip(("一", "二", "三"), outputs):
+        assert data == run_graphviz(["dot", "-Tsvg"], SOURCE.replace("甲", label))
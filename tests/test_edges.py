@@ -0,0 +1,113 @@
+import io
+
+import pytest
+from diagrams import Diagram, Edge, setdiagram
+from diagrams.generic.blank import Blank
+
+from diagramkit import edges
+
+
+@pytest.fixture
+def diagram(tmp_path):
+    # 只进入图的上下文、不退出，免得 __exit__ 调用 Graphviz 渲染
+    d = Diagram("连线", filename=str(tmp_path / "edges"), show=False)
+    d.__enter__()
+    try:
+        yield d
+    finally:
+        setdiagram(None)
+
+
+@pytest.fixture
+def nodes(diagram):
+    return {name: Blank(name) for name in ("api", "db", "cache")}
+
+
+def _added(diagram, call):
+    before = len(diagram.dot.body)
+    call()
+    return diagram.dot.body[before:]
+
+
+def test_rows_fill_defaults_for_tuples():
+    assert edges.rows([("a", "b"), ["a", "c", "读"], ("b", "c", "", "dashed")]) == [
+        ("a", "b", "", ""),
+        ("a", "c", "读", ""),
+        ("b", "c", "", "dashed"),
+    ]
+
+
+def test_rows_reject_bad_rows():
+    with pytest.raises(ValueError, match="第 2 行应有 2 到 4 列"):
+        edges.rows([("a", "b"), ("a",)])
+    with pytest.raises(ValueError, match="第 1 行应有 2 到 4 列"):
+        edges.rows(["ab"])
+    with pytest.raises(ValueError, match="缺少 dst 列"):
+        edges.rows(io.StringIO("src,label\na,x\n"))
+
+
+def test_rows_read_csv_files_and_paths(tmp_path):
+    text = "src, dst, label\napi, db, 写入\napi, cache,\n"
+    expected = [("api", "db", "写入", ""), ("api", "cache", "", "")]
+    assert edges.rows(io.StringIO(text)) == expected
+    path = tmp_path / "edges.csv"
+    path.write_text(text, encoding="utf-8")
+    assert edges.rows(path) == expected
+    assert edges.rows(str(path)) == expected
+
+
+def test_rows_read_structured_arrays():
+    np = pytest.importorskip("numpy")
+    table = np.array([("api", "db", "写入"), ("api", "cache", "")], dtype=[("src", "U8"), ("dst", "U8"), ("label", "U8")])
+    assert edges.rows(table) == [("api", "db", "写入", ""), ("api", "cache", "", "")]
+    # 定长字节串字段按 UTF-8 解码
+    raw = np.array([(b"api", b"db")], dtype=[("src", "S8"), ("dst", "S8")])
+    assert edges.rows(raw) == [("api", "db", "", "")]
+
+
+def test_connect_matches_chained_edges(diagram, nodes):
+    api, db, cache = nodes["api"], nodes["db"], nodes["cache"]
+
+    def chained():
+        api >> Edge(label="写入") >> db
+        api >> Edge(style="dashed") >> cache
+        db >> cache
+
+    expected = _added(diagram, chained)
+    table = [(api, db, "写入"), ("api", "cache", "", "dashed"), ("db", "cache")]
+    assert _added(diagram, lambda: edges.connect(table, nodes)) == expected
+
+
+def test_connect_drops_duplicate_rows(diagram, nodes):
+    table = [("api", "db", "写入"), ("api", "db", "写入"), ("api", "db", "读取"), ("api", "db", "写入")]
+    before = len(diagram.dot.body)
+    assert edges.connect(table, nodes) == 2
+    lines = diagram.dot.body[before:]
+    assert len(lines) == 2 and "写入" in lines[0] and "读取" in lines[1]
+
+
+def test_connect_reports_every_problem_and_adds_nothing(diagram, nodes, tmp_path):
+    other = Diagram("别的图", filename=str(tmp_path / "other"), show=False)
+    setdiagram(other)
+    stranger = Blank("stranger")
+    setdiagram(diagram)
+    table = [("api", "db"), ("api", "missing"), (stranger, "db"), ("db", "cache", 1)]
+    before = list(diagram.dot.body)
+    with pytest.raises(ValueError) as info:
+        edges.connect(table, nodes)
+    message = str(info.value)
+    assert "第 2 行：找不到节点 'missing'" in message
+    assert "第 3 行：节点 'stranger' 不属于当前图" in message
+    assert "第 4 行：label 与 style 必须是字符串" in message
+    assert diagram.dot.body == before
+
+
+def test_connect_caps_the_problem_list(diagram, nodes):
+    table = [("api", f"n{i}") for i in range(edges.MAX_PROBLEMS + 5)]
+    with pytest.raises(ValueError, match=f"共 {edges.MAX_PROBLEMS + 5} 处"):
+        edges.connect(table, nodes)
+
+
+def test_connect_needs_a_diagram():
+    with pytest.raises(RuntimeError, match="with Diagram"):
+        edges.connect([("a", "b")])
@@ -0,0 +1,50 @@
+import pytest
+
+from diagramkit import engines, registry
+from diagramkit.registry import Target
+
+
+def test_geometry_counts_crossings_area_and_length():
+    layout = {
+        "bb": "0,0,144,72",
+        "edges": [
+            {"tail": 0, "head": 1, "pos": "0,0 144,72"},
+            {"tail": 2, "head": 3, "pos": "s,0,72 144,0"},
+            # 与第一条共用端点，不计交叉
+            {"tail": 0, "head": 3, "pos": "e,144,0 0,0"},
+            {"tail": 4, "head": 5},
+        ],
+    }
+    measured = engines.geometry(layout)
+    assert measured["area"] == 2.0
+    assert measured["crossings"] == 1
+    assert measured["length"] == pytest.approx((160.99689 * 2 + 144) / 3 / 72)
+
+
+def test_score_is_one_for_the_baseline():
+    baseline = {"time": 0.2, "area": 2.0, "crossings": 0, "length": 1.5}
+    assert engines.score(baseline, baseline) == pytest.approx(1.0)
+    assert engines.score({**baseline, "area": 4.0}, baseline) == pytest.approx(1.0 + engines.WEIGHTS["area"])
+
+
+DECORATED = {
+    "plain": '@diagram(category="c", filename="x")\n',
+    "trailing comma": '@diagram(\n    category="c",\n    filename="x",\n)\n',
+    "paren on its own line": '@diagram(category="c", filename="x", tags=("甲",)\n)\n',
+    "existing": '@diagram(category="c", engine="osage", filename="x")\n',
+    "empty": "@diagram()\n",
+}
+
+
+@pytest.mark.parametrize("case", DECORATED)
+def test_record_writes_a_valid_engine_keyword(tmp_path, monkeypatch, case):
+    monkeypatch.setattr(registry, "ROOT", tmp_path)
+    (tmp_path / "c").mkdir()
+    script = tmp_path / "c" / "x.py"
+    script.write_text(f"{DECORATED[case]}def create(filename, outformat):\n    pass\n", encoding="utf-8")
+    target = Target("c", "x.py", "create", "x")
+    assert engines.record(target, "dot:spline")
+    namespace = {"diagram": lambda **kwargs: (lambda func: kwargs)}
+    exec(script.read_text(encoding="utf-8"), namespace)
+    assert namespace["create"]["engine"] == "dot:spline"
+    assert not engines.record(target, "dot:spline")
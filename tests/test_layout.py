@@ -0,0 +1,76 @@
+from diagramkit.layout import LayoutCache, apply_layout, layout_dot, statements
+
+SOURCE = (
+    "digraph G {\n"
+    "\tgraph [rankdir=LR]\n"
+    "\tsubgraph cluster_a {\n"
+    "\t\tgraph [label=A]\n"
+    '\t\ta [label="甲"]\n'
+    "\t\tb\n"
+    "\t}\n"
+    "\tc\n"
+    "\ta -> b [label=x]\n"
+    "\ta -> b\n"
+    "\tb -> c\n"
+    "}\n"
+)
+
+# dot -Tjson0 的输出（坐标取整，省略与回填无关的字段）
+LAYOUT = {
+    "bb": "0,0,251,83",
+    "objects": [
+        {"_gvid": 0, "name": "cluster_a", "bb": "0,0,168,83", "lp": "84,70", "nodes": [1, 2]},
+        {"_gvid": 1, "name": "a", "pos": "35,29", "width": "0.75", "height": "0.5"},
+        {"_gvid": 2, "name": "b", "pos": "133,29", "width": "0.75", "height": "0.5"},
+        {"_gvid": 3, "name": "c", "pos": "224,29", "width": "0.75", "height": "0.5"},
+    ],
+    "edges": [
+        {"_gvid": 0, "tail": 1, "head": 2, "pos": "e,106,27 62,27 80,26 95,26", "lp": "84,35"},
+        {"_gvid": 1, "tail": 1, "head": 2, "pos": "e,111,39 58,38 80,44 100,42"},
+        {"_gvid": 2, "tail": 2, "head": 3, "pos": "e,197,29 160,29 178,29 186,29"},
+    ],
+}
+
+
+def test_layout_dot_strips_paint_only_attributes():
+    painted = 'digraph {\n\ta [color=red fontcolor="#fff" label="color=red" dpi=300]\n}\n'
+    plain = 'digraph {\n\ta [label="color=red"]\n}\n'
+    assert layout_dot(painted) == layout_dot(plain.replace("[", "[color=blue "))
+    assert 'label="color=red"' in layout_dot(painted)
+
+
+def test_style_and_penwidth_stay_in_the_key(tmp_path):
+    cache = LayoutCache(tmp_path)
+    plain = "digraph {\n\ta -> b [color=blue]\n}\n"
+    assert cache.key(plain) == cache.key("digraph {\n\ta -> b [color=red]\n}\n")
+    assert cache.key(plain) != cache.key("digraph {\n\ta -> b [style=invis]\n}\n")
+    assert cache.key(plain) != cache.key("digraph {\n\ta -> b [penwidth=4]\n}\n")
+    assert cache.key(plain) != cache.key(plain, engine="neato")
+
+
+def test_statements_keep_multiline_labels_together():
+    source = 'digraph {\n\ta [label="one\ntwo"]\n\tb\n}'
+    assert list(statements(source)) == ["digraph {", '\ta [label="one\ntwo"]', "\tb", "}"]
+
+
+def test_apply_layout_fills_in_positions():
+    assert apply_layout(SOURCE, LAYOUT) == (
+        "digraph G {\n"
+        '\tgraph [rankdir=LR bb="0,0,251,83"]\n'
+        "\tsubgraph cluster_a {\n"
+        '\t\tgraph [label=A bb="0,0,168,83" lp="84,70"]\n'
+        '\t\ta [label="甲" pos="35,29" width="0.75" height="0.5"]\n'
+        '\t\tb [pos="133,29" width="0.75" height="0.5"]\n'
+        "\t}\n"
+        '\tc [pos="224,29" width="0.75" height="0.5"]\n'
+        '\ta -> b [label=x pos="e,106,27 62,27 80,26 95,26" lp="84,35"]\n'
+        '\ta -> b [pos="e,111,39 58,38 80,44 100,42"]\n'
+        '\tb -> c [pos="e,197,29 160,29 178,29 186,29"]\n'
+        "}\n"
+    )
+
+
+def test_apply_layout_rejects_mismatched_graphs():
+    assert apply_layout(SOURCE.replace("\tc\n", "\tc\n\td\n"), LAYOUT) is None
+    assert apply_layout(SOURCE.replace("\tb -> c\n", "\tb -> c\n\tb -> c\n"), LAYOUT) is None
+    assert apply_layout(SOURCE.replace("\tb -> c\n", ""), LAYOUT) is None
@@ -0,0 +1,55 @@
+import sys
+
+import pytest
+from diagrams import Diagram, Node, setdiagram
+
+from diagramkit import lazy
+
+MODULE = "diagrams.alibabacloud.storage"
+
+
+@pytest.fixture
+def provider():
+    saved = sys.modules.pop(MODULE, None)
+    lazy.install()
+    try:
+        from diagrams.alibabacloud.storage import ObjectStorageService
+
+        yield sys.modules[MODULE], ObjectStorageService
+    finally:
+        lazy.uninstall()
+        sys.modules.pop(MODULE, None)
+        if saved is not None:
+            sys.modules[MODULE] = saved
+
+
+def test_import_does_not_load_the_module(provider):
+    module, cls = provider
+    assert module._real is None
+    assert issubclass(cls, Node)
+    assert cls.__name__ == "ObjectStorageService"
+    assert module._real is None
+
+
+def test_class_attributes_resolve_the_real_class(provider):
+    module, cls = provider
+    assert cls._provider == "alibabacloud"
+    assert cls._icon == "object-storage-service.png"
+    assert module._real is not None
+
+
+def test_instances_are_real_and_pass_isinstance(provider):
+    module, cls = provider
+    setdiagram(Diagram("lazy", show=False))
+    try:
+        node = cls("oss")
+    finally:
+        setdiagram(None)
+    assert type(node) is module._real.ObjectStorageService
+    assert isinstance(node, cls)
+    assert issubclass(type(node), cls)
+
+
+def test_unknown_names_fail_at_import(provider):
+    with pytest.raises(ImportError):
+        from diagrams.alibabacloud.storage import NoSuchNode  # noqa: F401
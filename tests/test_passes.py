@@ -0,0 +1,49 @@
+import re
+
+from diagramkit import passes
+
+
+def _graph(*body):
+    return "digraph G {\n" + "".join(f"\t{line}\n" for line in body) + "}\n"
+
+
+def test_bundle_merges_same_label_edges_through_one_junction():
+    source = _graph("h", "a", "b", "c", *(f'h -> {n} [label="同步" color=red]' for n in "abc"))
+    result, notes = passes.bundle(source)
+    junctions = set(re.findall(r'"?(junction_[0-9a-f]+)"? \[', result))
+    assert len(junctions) == 1
+    assert result.count("同步") == 1
+    assert notes[0].startswith("1 组共 3 条")
+
+
+def test_bundle_junction_ids_include_the_grouping_attributes():
+    body = [f'h -> {n} [label="同步" color=red]' for n in "abc"]
+    body += [f'h -> {n} [label="同步" color=blue]' for n in "def"]
+    result, _ = passes.bundle(_graph(*body))
+    junctions = set(re.findall(r'"?(junction_[0-9a-f]+)"? \[', result))
+    assert len(junctions) == 2
+    assert result.count("同步") == 2
+
+
+def test_bundle_leaves_small_groups_alone():
+    source = _graph('h -> a [label="同步"]', 'h -> b [label="同步"]')
+    assert passes.bundle(source) == (source, [])
+
+
+LABELLED = _graph('graph [label="标题" rankdir=LR]', 'a -> b [label="写入"]', 'b -> c [label="读取\nx"]', 'c -> a [label="写入"]', "a -> c")
+
+
+def test_xlabel_and_tooltip_move_every_label():
+    for name in ("xlabel", "tooltip"):
+        result, notes = passes.run(LABELLED, [name])
+        assert "label=" not in result.replace(f"{name}=", "").replace('graph [label="标题"', "")
+        assert result.count(f'{name}="写入"') == 2
+        assert notes[0].startswith(f"{name}: 3 条连线的标签（2 种）")
+
+
+def test_legend_numbers_labels_in_first_seen_order():
+    result, _ = passes.legend(LABELLED)
+    assert '\tgraph [label="标题\n\n1. 写入\\l2. 读取 x\\l" rankdir=LR]\n' in result
+    assert '\ta -> b [xlabel=1 tooltip="写入"]\n' in result
+    assert '\tc -> a [xlabel=1 tooltip="写入"]\n' in result
+    assert passes.legend(_graph("a -> b")) == (_graph("a -> b"), [])
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from diagramkit import static
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = [
+    "commercial-algorithms/a_b_testing_algorithm.py",
+    "company-tech-stacks/doordash_tech_stack.py",
+    "financial-quantitative-algorithms/option_pricing_algorithm.py",
+    "system-designs/diagram.py",
+]
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_script_imports_without_pythonpath(script):
+    # 与 `cd 分类 && python3 脚本.py` 相同：仓库根目录不在 sys.path 上
+    path = ROOT / script
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    code = f"import runpy; runpy.run_path({path.name!r}); import diagramkit; print(diagramkit.__file__)"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=path.parent, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert Path(proc.stdout.strip()).parent.parent == ROOT
+
+
+def test_static_index_sees_imports_inside_try():
+    found = {f"{t.category}/{t.script}" for s in static.index() for t in s.targets}
+    assert set(SCRIPTS) <= found
@@ -0,0 +1,76 @@
+import json
+import shutil
+
+import pytest
+
+from diagramkit import split
+from diagramkit.layout import apply_layout
+from diagramkit.render import run_graphviz
+
+SOURCE = (
+    "digraph G {\n"
+    '\tgraph [label="分块" rankdir=LR splines=ortho]\n'
+    "\tnode [shape=box]\n"
+    "\tsubgraph cluster_a {\n"
+    "\t\tgraph [label=A]\n"
+    "\t\ta1\n"
+    "\t\ta2\n"
+    "\t}\n"
+    "\tsubgraph cluster_b {\n"
+    "\t\tb1\n"
+    "\t\tsubgraph cluster_b2 {\n"
+    "\t\t\tb2\n"
+    "\t\t}\n"
+    "\t}\n"
+    "\tc\n"
+    "\ta1 -> a2\n"
+    "\ta2 -> b1 [label=x]\n"
+    "\tb1 -> b2\n"
+    "\tc -> a1\n"
+    "}\n"
+)
+
+
+def test_blocks_split_top_level_clusters_and_loose_nodes():
+    header, parts, between = split.blocks(SOURCE)
+    assert header == ["digraph G {", '\tgraph [label="分块" rankdir=LR splines=ortho]', "\tnode [shape=box]"]
+    assert [(b.name, b.nodes) for b in parts] == [("cluster_a", {"a1", "a2"}), ("cluster_b", {"b1", "b2"}), ("", {"c"})]
+    assert [b.edges for b in parts] == [["\ta1 -> a2"], ["\tb1 -> b2"], []]
+    assert between == [("a2", "b1"), ("c", "a1")]
+
+
+def test_arrange_places_layers_along_the_direction():
+    sizes = [(100.0, 50.0), (40.0, 30.0), (60.0, 20.0)]
+    gap = split.BLOCK_GAP
+    # TB：第 0 层在上方，同一层的两块左右排开并居中
+    assert split._arrange(sizes, [0, 1, 1], "TB") == [
+        ((40 + gap + 60 - 100) / 2, 30 + gap),
+        (0.0, 0.0),
+        (40 + gap, 5.0),
+    ]
+    # LR：第 0 层在左侧，同一层的两块自上而下排开
+    assert split._arrange(sizes, [0, 1, 1], "LR") == [
+        (0.0, (30 + gap + 20 - 50) / 2),
+        (100 + gap + 10, 20 + gap),
+        (100 + gap, 0.0),
+    ]
+
+
+def test_small_or_spline_graphs_are_not_split():
+    def layout(dot):
+        raise AssertionError("不应布局")
+
+    assert split.compose(SOURCE, layout) is None
+    assert split.compose(SOURCE.replace("splines=ortho", "splines=spline"), layout, min_nodes=0) is None
+    assert split.compose("digraph G {\n\tgraph [splines=ortho]\n\ta -> b\n}\n", layout, min_nodes=0) is None
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="需要 Graphviz")
+def test_compose_gives_every_node_a_position():
+    placed, notes = split.compose(SOURCE, lambda dot: run_graphviz(["dot", "-Tjson0"], dot), jobs=2, min_nodes=0)
+    assert notes[0].startswith("分 3 块并行布局")
+    laid = json.loads(run_graphviz(["neato", "-n2", "-Tjson0"], placed))
+    names = {obj["name"]: obj for obj in laid["objects"]}
+    assert all("pos" in names[n] for n in ("a1", "a2", "b1", "b2", "c"))
+    assert len(laid["edges"]) == 4
+    assert apply_layout(SOURCE, laid) is not None
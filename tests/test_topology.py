@@ -0,0 +1,59 @@
+from diagramkit import topology
+
+
+def test_redundant_finds_shortcuts():
+    pairs = [("a", "b"), ("b", "c"), ("a", "c"), ("c", "d"), ("a", "d")]
+    assert topology.redundant(pairs) == [2, 4]
+    assert topology.witness(pairs, 4) == ["a", "c", "d"]
+
+
+def test_redundant_keeps_cycles_and_parallel_edges():
+    assert topology.redundant([("a", "b"), ("b", "a"), ("a", "b")]) == []
+    assert topology.redundant([("a", "b"), ("a", "b"), ("b", "c")]) == []
+
+
+def test_redundant_goes_through_cycles():
+    # a -> c 可经过环 b <-> d 推出，环内的连线保留
+    pairs = [("a", "b"), ("b", "d"), ("d", "b"), ("d", "c"), ("a", "c")]
+    assert topology.redundant(pairs) == [4]
+    assert topology.witness(pairs, 4) == ["a", "b", "d", "c"]
+
+
+def test_removing_all_redundant_edges_keeps_reachability():
+    pairs = [(i, j) for i in range(6) for j in range(i + 1, 6)]
+    kept = [pair for k, pair in enumerate(pairs) if k not in set(topology.redundant(pairs))]
+    assert kept == [(i, i + 1) for i in range(5)]
+    assert topology.witness(kept, 0) is None
+
+
+def test_feedback_breaks_every_cycle():
+    pairs = [("a", "b"), ("b", "c"), ("c", "a"), ("c", "d"), ("d", "c"), ("d", "d")]
+    found = topology.feedback(pairs)
+    assert len(found) == 2
+    rest = [pair for k, pair in enumerate(pairs) if k not in found and pair[0] != pair[1]]
+    assert all(len(c) == 1 for c in topology.strongly_connected(topology.successors(rest)))
+
+
+def test_feedback_prefers_marked_edges_on_cycles():
+    pairs = [("a", "b"), ("b", "c"), ("c", "a")]
+    assert topology.feedback(pairs) == [2]
+    assert topology.feedback(pairs, preferred=[1]) == [1]
+    # 标记的连线拆不完的环照常用启发式补选
+    assert topology.feedback([*pairs, ("a", "c")], preferred=[1]) == [1, 2]
+    # 不在环上的连线即使被标记也不入选
+    assert topology.feedback([("a", "b"), ("b", "c")], preferred=[0]) == []
+
+
+def test_layers_use_longest_paths():
+    pairs = [("a", "b"), ("b", "c"), ("a", "c"), ("d", "c")]
+    assert topology.layers(pairs, ["a", "b", "c", "d", "e"]) == {"a": 0, "b": 1, "c": 2, "d": 0, "e": 0}
+    assert topology.ranks(pairs, ["a", "b", "c", "d", "e"]) == 3
+
+
+def test_layers_reverse_back_edges_in_declaration_order():
+    # 从 a 出发深度优先，c -> a 是回边，反转后 a 仍在第 0 层
+    pairs = [("a", "b"), ("b", "c"), ("c", "a")]
+    assert topology.layers(pairs, ["a", "b", "c"]) == {"a": 0, "b": 1, "c": 2}
+    # 声明次序从 b 开始时，a -> b 成为回边
+    assert topology.layers(pairs, ["b", "c", "a"]) == {"b": 0, "c": 1, "a": 2}
+    assert topology.ranks([("a", "a")]) == 1